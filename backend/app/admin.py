@@ -12,13 +12,23 @@ sys.path.append(parent_directory)
 
 import json
 
-from flask import Blueprint, request, jsonify
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    request,
+    jsonify,
+    stream_with_context,
+)
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func, or_, select
+from language_models.registry import get_model_footprints
 
 try:
     from models import (
         db,
         User,
+        UserClass,
         CourseEnrolment,
         Course,
         CourseArchive,
@@ -30,6 +40,7 @@ except ImportError:
     from .models import (
         db,
         User,
+        UserClass,
         CourseEnrolment,
         Course,
         CourseArchive,
@@ -39,16 +50,159 @@ except ImportError:
     )
 
 try:
-    from course import deleteCourseEnrolment
+    from course import removeEnrolments
 except ImportError:
-    from .course import deleteCourseEnrolment
+    from .course import removeEnrolments
+
+try:
+    from course_cache import get_course_cache_stats
+except ImportError:
+    from .course_cache import get_course_cache_stats
+
+try:
+    from db_pool import get_pool_stats
+except ImportError:
+    from .db_pool import get_pool_stats
 
 admin = Blueprint("admin", __name__)
 
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 1000
+
+
+def get_page_arguments():
+    """
+    Reads the paging arguments of an admin list request.
+
+    Query Parameters:
+    - after (int, optional): The key of the last row of the previous page.
+    - limit (int, optional): The number of rows per page, ADMIN_PAGE_SIZE by default.
+    - format (str, optional): "ndjson" to stream every matching row instead of a page.
+
+    Returns:
+    - A tuple of the key to continue after (None for the first page), the page size and
+      whether to stream the rows.
+
+    Raises:
+    - ValueError: If an argument is invalid.
+    """
+    after = request.args.get("after")
+    if after is not None:
+        try:
+            after = int(after)
+        except ValueError:
+            raise ValueError("after must be an integer.")
+    try:
+        limit = int(request.args.get("limit", current_app.config["ADMIN_PAGE_SIZE"]))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    output = request.args.get("format", "json")
+    if output not in ("json", "ndjson"):
+        raise ValueError('format must be "json" or "ndjson".')
+    return after, limit, output == "ndjson"
+
+
+def get_rows_after(query, key_column, after, limit):
+    """
+    Fetches one page of a query, keyset paginated on a unique column.
+
+    Args:
+    - query (Select): The query, selecting only the columns the page needs.
+    - key_column (Column): The unique column the rows are ordered by.
+    - after (int or None): Only return rows whose key is greater than this.
+    - limit (int): The maximum number of rows.
+
+    Returns:
+    - A list of rows in key order.
+    """
+    if after is not None:
+        query = query.where(key_column > after)
+    return db.session.execute(query.order_by(key_column).limit(limit)).all()
+
+
+def list_rows(name, query, key_column, to_dicts):
+    """
+    Answers an admin list request with one keyset page of a query, or with every matching
+    row as newline delimited JSON for exports. Exports are read in pages too, so neither
+    mode holds the whole table in memory.
+
+    Args:
+    - name (str): The key the page is returned under, e.g. "users".
+    - query (Select): The filtered query, selecting only the columns the list needs.
+    - key_column (Column): The unique column the rows are paginated on.
+    - to_dicts (function): Turns a list of rows into the list of dicts returned.
+
+    Returns:
+    - A JSON response with the page under name and the "nextCursor" to pass as after for
+      the next page (null on the last page), or a streamed application/x-ndjson response
+      with one dict per line. A 400 response is returned for invalid paging arguments.
+    """
+    try:
+        after, limit, stream = get_page_arguments()
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    key = key_column.key
+    if stream:
+
+        def generate(after):
+            while True:
+                rows = get_rows_after(query, key_column, after, limit)
+                for item in to_dicts(rows):
+                    yield json.dumps(item) + "\n"
+                if len(rows) < limit:
+                    return
+                after = getattr(rows[-1], key)
+
+        return (
+            Response(
+                stream_with_context(generate(after)),
+                mimetype="application/x-ndjson",
+            ),
+            200,
+        )
+
+    # One extra row tells whether there is another page
+    rows = get_rows_after(query, key_column, after, limit + 1)
+    next_cursor = getattr(rows[limit - 1], key) if len(rows) > limit else None
+    return jsonify({name: to_dicts(rows[:limit]), "nextCursor": next_cursor}), 200
+
+
+def get_user_dicts(rows):
+    """
+    Turns user rows into the dicts of the user list, reading every role of the page in
+    one query.
+    """
+    roles = {row.zID: [] for row in rows}
+    if roles:
+        for zID, role in db.session.execute(
+            select(UserClass.user, UserClass.role)
+            .where(UserClass.user.in_(list(roles)))
+            .order_by(UserClass.user, UserClass.role)
+        ):
+            roles[zID].append(role)
+    return [
+        {
+            "zID": row.zID,
+            "firstName": row.firstname,
+            "lastName": row.lastname,
+            "email": row.email,
+            "userType": roles[row.zID],
+        }
+        for row in rows
+    ]
+
 
 def return_all_users():
     """
-    Fetches and returns information about all users in the database.
+    Fetches a page of the users in the database, see list_rows.
+
+    Query Parameters:
+    - role (str, optional): Only list users holding this role, e.g. "student".
+    - search (str, optional): Only list users whose name or email contains this.
+    - after, limit and format: See get_page_arguments.
 
     Returns:
     - A JSON response containing a list of dictionaries, where each dictionary represents a
@@ -58,7 +212,7 @@ def return_all_users():
         - "firstName": The user's first name.
         - "lastName": The user's last name.
         - "email": The user's email address.
-        - "userType": A list of user roles derived from the metadata.
+        - "userType": The user's roles in alphabetical order, read from tblUserClass.
 
     Example:
     {
@@ -78,29 +232,40 @@ def return_all_users():
                 "userType": ["student"]
             },
             # ... additional user entries ...
-        ]
+        ],
+        "nextCursor": 7654321
     }
     """
-    user_list = db.session.query(User).all()
-    user_list_dict = []
-    for user in user_list:
-        metadata = json.loads(user.metadataJson)
-        roles = list(metadata["class"].keys())
-
-        user_info_dict = {
-            "zID": user.zID,
-            "firstName": user.firstname,
-            "lastName": user.lastname,
-            "email": user.email,
-            "userType": roles,
-        }
-        user_list_dict.append(user_info_dict)
-    return jsonify({"users": user_list_dict})
+    query = select(User.zID, User.firstname, User.lastname, User.email)
+    role = request.args.get("role")
+    if role:
+        query = query.where(
+            select(UserClass.user)
+            .where(UserClass.user == User.zID, UserClass.role == role)
+            .exists()
+        )
+    search = request.args.get("search")
+    if search:
+        query = query.where(
+            or_(
+                User.firstname.contains(search, autoescape=True),
+                User.lastname.contains(search, autoescape=True),
+                User.email.contains(search, autoescape=True),
+            )
+        )
+    return list_rows("users", query, User.zID, get_user_dicts)
 
 
 def return_all_courses():
     """
-    Fetches and returns information about all courses in the database.
+    Fetches a page of the courses in the database, see list_rows.
+
+    Query Parameters:
+    - courseCode (str, optional): Only list courses whose code starts with this.
+    - yearDate (int, optional): Only list courses of this year.
+    - term (str, optional): Only list courses of this term.
+    - school (str, optional): Only list courses of this school.
+    - after, limit and format: See get_page_arguments.
 
     Returns:
     - A JSON response containing a list of dictionaries, where each dictionary represents
@@ -130,26 +295,54 @@ def return_all_courses():
                 "school": "School of Computer Science and Engineering"
             },
             # ... additional course entries ...
-        ]
+        ],
+        "nextCursor": null
     }
     """
-    course_list = db.session.query(Course).all()
-    course_list_dict = []
-    for course in course_list:
-        course_info_dict = {
-            "courseCode": course.courseCode,
-            "courseName": course.courseName,
-            "yearDate": course.yearDate,
-            "term": course.term,
-            "school": course.school,
-        }
-        course_list_dict.append(course_info_dict)
-    return jsonify({"courses": course_list_dict})
+    query = select(
+        Course.ID,
+        Course.courseCode,
+        Course.courseName,
+        Course.yearDate,
+        Course.term,
+        Course.school,
+    )
+    course_code = request.args.get("courseCode")
+    if course_code:
+        query = query.where(Course.courseCode.startswith(course_code, autoescape=True))
+    year_date = request.args.get("yearDate")
+    if year_date:
+        if not year_date.isdigit():
+            return jsonify({"error": "yearDate must be an integer."}), 400
+        query = query.where(Course.yearDate == int(year_date))
+    for argument, column in (("term", Course.term), ("school", Course.school)):
+        value = request.args.get(argument)
+        if value:
+            query = query.where(column == value)
+
+    def get_course_dicts(rows):
+        return [
+            {
+                "courseCode": row.courseCode,
+                "courseName": row.courseName,
+                "yearDate": row.yearDate,
+                "term": row.term,
+                "school": row.school,
+            }
+            for row in rows
+        ]
+
+    return list_rows("courses", query, Course.ID, get_course_dicts)
 
 
 def return_all_projects():
     """
-    Fetches and returns information about all projects in the database.
+    Fetches a page of the projects in the database, see list_rows.
+
+    Query Parameters:
+    - search (str, optional): Only list projects whose name or client contains this.
+    - creator (int, optional): Only list projects created by this zID.
+    - after, limit and format: See get_page_arguments.
 
     Returns:
     - A JSON response containing a list of dictionaries, where each dictionary represents a
@@ -173,25 +366,39 @@ def return_all_projects():
                 "client": "XYZ Company"
             },
             # ... additional project entries ...
-        ]
+        ],
+        "nextCursor": null
     }
     """
-    project_list = db.session.query(Project).all()
-    project_list_dict = []
-    for project in project_list:
-        project_info_dict = {
-            "id": project.ID,
-            "projectName": project.projectName,
-            "client": project.client,
-        }
-        project_list_dict.append(project_info_dict)
-    return jsonify({"projects": project_list_dict})
+    query = select(Project.ID, Project.projectName, Project.client)
+    search = request.args.get("search")
+    if search:
+        query = query.where(
+            or_(
+                Project.projectName.contains(search, autoescape=True),
+                Project.client.contains(search, autoescape=True),
+            )
+        )
+    creator = request.args.get("creator")
+    if creator:
+        if not creator.isdigit():
+            return jsonify({"error": "creator must be an integer."}), 400
+        query = query.where(Project.creatorZId == int(creator))
+
+    def get_project_dicts(rows):
+        return [
+            {"id": row.ID, "projectName": row.projectName, "client": row.client}
+            for row in rows
+        ]
+
+    return list_rows("projects", query, Project.ID, get_project_dicts)
 
 
 def user_type_count():
     """
     Counts the number of users in different roles and returns a dictionary with the count
-    for each user type.
+    for each user type. The roles are counted with one GROUP BY over tblUserClass, which is
+    answered from its role_type index without reading tblUser or any metadataJson.
 
     Returns:
     - A dictionary containing the count of users for each user type:
@@ -210,35 +417,72 @@ def user_type_count():
         "admin": 5
     }
     """
-    user_list = db.session.query(User).all()
-    student_count = 0
-    casual_academic_count = 0
-    academic_count = 0
-    course_admin_count = 0
-    admin_count = 0
-    for user in user_list:
-        metadata = json.loads(user.metadataJson)
-        roles = list(metadata["class"].keys())
-
-        if "student" in roles:
-            student_count += 1
-        if "academic" in roles:
-            if metadata["class"]["academic"]["type"] == "academic":
-                academic_count += 1
-            elif metadata["class"]["academic"]["type"] == "casual academic":
-                casual_academic_count += 1
-            else:
-                course_admin_count += 1
-        if "admin" in roles:
-            admin_count += 1
-
-    return {
-        "student": student_count,
-        "casualAcademic": casual_academic_count,
-        "academic": academic_count,
-        "courseAdmin": course_admin_count,
-        "admin": admin_count,
+    counts = {
+        "student": 0,
+        "casualAcademic": 0,
+        "academic": 0,
+        "courseAdmin": 0,
+        "admin": 0,
     }
+    for role, role_type, count in db.session.execute(
+        select(UserClass.role, UserClass.roleType, func.count())
+        .where(UserClass.role.in_(["student", "academic", "admin"]))
+        .group_by(UserClass.role, UserClass.roleType)
+    ):
+        if role != "academic":
+            counts[role] += count
+        elif role_type == "academic":
+            counts["academic"] += count
+        elif role_type == "casual academic":
+            counts["casualAcademic"] += count
+        else:
+            counts["courseAdmin"] += count
+    return counts
+
+
+def school_counts():
+    """
+    Counts the course offerings of every school, and the projects attached to them, with
+    one GROUP BY each.
+
+    Returns:
+    - A list with a dictionary per school, in school order:
+        - "school": The school.
+        - "courseCount": Number of course offerings of the school.
+        - "projectCount": Number of projects attached to a course of the school.
+
+    Example:
+    [
+        {
+            "school": "School of Computer Science and Engineering",
+            "courseCount": 12,
+            "projectCount": 20
+        }
+    ]
+    """
+    course_counts = dict(
+        db.session.execute(
+            select(Course.school, func.count()).group_by(Course.school)
+        ).all()
+    )
+    project_counts = dict(
+        db.session.execute(
+            select(Course.school, func.count(Project.ID))
+            .join(Course, Project.course == Course.ID)
+            .group_by(Course.school)
+        ).all()
+    )
+    return [
+        {
+            "school": school,
+            "courseCount": course_counts.get(school, 0),
+            "projectCount": project_counts.get(school, 0),
+        }
+        for school in sorted(
+            set(course_counts) | set(project_counts),
+            key=lambda school: (school is None, school or ""),
+        )
+    ]
 
 
 def get_project_count():
@@ -269,23 +513,83 @@ def get_course_count():
     return course_count
 
 
-def delete_course_cascade(course_code, year_date, term):
+def get_dry_run(data):
     """
-    Deletes a course and its related data in a cascading manner from the database.
+    Reads the "dryRun" flag of a delete request.
+
+    Args:
+    - data (dict): The request's JSON payload.
+
+    Returns:
+    - True if dryRun is true, False if it is false or left out.
+
+    Raises:
+    - ValueError: If dryRun is not a JSON boolean, e.g. the string "false".
+    """
+    dry_run = data.get("dryRun", False)
+    if not isinstance(dry_run, bool):
+        raise ValueError("dryRun must be a boolean.")
+    return dry_run
+
+
+def get_cascade_response(message, affected, dry_run):
+    """
+    Builds the response of a cascading delete.
+
+    Args:
+    - message (str): The success message of a real delete.
+    - affected (dict): The number of rows affected in each table.
+    - dry_run (bool): Whether nothing was deleted.
+
+    Returns:
+    - A JSON response with the affected row counts, and the success message unless this was
+      a dry run.
+    """
+    if dry_run:
+        return jsonify({"dryRun": True, "affected": affected}), 200
+    return jsonify({"message": message, "affected": affected}), 200
+
+
+def count_rows(query):
+    """
+    Counts the rows matched by a select without loading them.
+    """
+    return db.session.execute(
+        select(func.count()).select_from(query.subquery())
+    ).scalar()
+
+
+def delete_course_cascade(course_code, year_date, term, dry_run=False):
+    """
+    Deletes a course and its related data in a cascading manner from the database, in one
+    transaction: every enrolment is removed with a single DELETE ... WHERE IN and a single
+    metadata write per enrolled user, then the archive and the course itself. Projects
+    attached to the course are kept and detached from it.
 
     Args:
     - course_code (str): The code identifying the course to be deleted.
     - year_date (int): The year associated with the course to be deleted.
     - term (str): The term (e.g., "Spring", "Fall") in which the course is offered to be
       deleted.
+    - dry_run (bool): Only count the rows that would be affected.
 
     Returns:
-    - A JSON response with a success message if the course is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the course is
+      successfully deleted, or only the counts on a dry run.
       If the course is not found, a JSON response with an error message and a 404 status
       code is returned.
 
     Example:
-    Successfully deleted course
+    {
+        "message": "Successfully deleted course",
+        "affected": {
+            "courses": 1,
+            "courseArchives": 2,
+            "enrolments": 500,
+            "users": 500,
+            "detachedProjects": 0
+        }
+    }
     """
     course = Course.query.filter_by(
         courseCode=course_code, yearDate=year_date, term=term
@@ -293,113 +597,202 @@ def delete_course_cascade(course_code, year_date, term):
     if not (course):
         return jsonify({"error": "Course not found."}), 404
     course_id = course.ID
-    course_enrolment_in_course = CourseEnrolment.query.filter_by(course=course_id).all()
-    for course_enrolment in course_enrolment_in_course:
-        zid = course_enrolment.user
-        role = course_enrolment.courseRole
-        deleteCourseEnrolment(zid, course_id, role)
-    CourseArchive.query.filter_by(courseID=course_id).delete()
-    Course.query.filter_by(ID=course_id).delete()
+    enrolments = CourseEnrolment.query.filter_by(course=course_id).all()
+    project_ids = list(
+        db.session.execute(
+            select(Project.ID).where(Project.course == course_id)
+        ).scalars()
+    )
+    affected = {
+        "courses": 1,
+        "courseArchives": count_rows(
+            select(CourseArchive.ID).where(CourseArchive.courseID == course_id)
+        ),
+        "enrolments": len(enrolments),
+        "users": len({enrolment.user for enrolment in enrolments}),
+        "detachedProjects": len(project_ids),
+    }
+    if dry_run:
+        return get_cascade_response(None, affected, dry_run)
+
+    # Unenrol everyone at once, in the same transaction as the course deletion
+    removeEnrolments(enrolments)
+    if project_ids:
+        # Only the course of the projects changes, so their recommendation index entries stay
+        Project.query.filter(Project.ID.in_(project_ids)).execution_options(
+            project_ids=()
+        ).update({Project.course: None}, synchronize_session=False)
+    # Name the course code so only its cached responses and model entry are dropped
+    CourseArchive.query.filter_by(courseID=course_id).execution_options(
+        course_codes=(course.courseCode,)
+    ).delete()
+    Course.query.filter_by(ID=course_id).execution_options(
+        course_codes=(course.courseCode,)
+    ).delete()
 
     db.session.commit()
 
-    return jsonify({"message": "Successfully deleted course"}), 200
+    return get_cascade_response("Successfully deleted course", affected, dry_run)
 
 
-def delete_group_cascade(group_id):
+def delete_group_cascade(group_id, dry_run=False):
     """
     Deletes a group and its related data in a cascading manner from the database.
 
     Args:
     - group_id (int): The unique identifier of the group to be deleted.
+    - dry_run (bool): Only count the rows that would be affected.
 
     Returns:
-    - A JSON response with a success message if the group is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the group is
+      successfully deleted, or only the counts on a dry run.
       If the group is not found, a JSON response with an error message and a 404 status
       code is returned.
 
     Example:
-    Successfully deleted group
+    {
+        "message": "Successfully deleted group",
+        "affected": {"groups": 1, "groupMembers": 4}
+    }
     """
     group = Group.query.filter_by(ID=group_id).first()
     if not (group):
         return jsonify({"error": "Group not found."}), 404
+    affected = {
+        "groups": 1,
+        "groupMembers": count_rows(
+            select(GroupMember.ID).where(GroupMember.groupID == group_id)
+        ),
+    }
+    if dry_run:
+        return get_cascade_response(None, affected, dry_run)
+
     GroupMember.query.filter_by(groupID=group_id).delete()
     Group.query.filter_by(ID=group_id).delete()
     db.session.commit()
 
-    return jsonify({"message": "Successfully deleted group"}), 200
+    return get_cascade_response("Successfully deleted group", affected, dry_run)
 
 
-def delete_project_cascade(id):
+def delete_project_cascade(id, dry_run=False):
     """
-    Deletes a project and its related data in a cascading manner from the database.
+    Deletes a project and its related data in a cascading manner from the database, with
+    one DELETE per table for all of its groups and their members, in one transaction.
 
     Args:
     - id (int): The unique identifier of the project to be deleted.
+    - dry_run (bool): Only count the rows that would be affected.
 
     Returns:
-    - A JSON response with a success message if the project is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the project is
+      successfully deleted, or only the counts on a dry run.
       If the project is not found, a JSON response with an error message and a 404 status
       code is returned.
 
     Example:
-    Successfully deleted project
+    {
+        "message": "Successfully deleted project",
+        "affected": {"projects": 1, "groups": 3, "groupMembers": 11}
+    }
     """
     project = Project.query.filter_by(ID=id).first()
     if not (project):
         return jsonify({"error": "Project not found."}), 404
-    project_groups = Group.query.filter_by(project=id).all()
-    for group in project_groups:
-        group_id = group.ID
-        delete_group_cascade(group_id)
-
-    Project.query.filter_by(ID=id).delete()
+    group_ids = list(
+        db.session.execute(select(Group.ID).where(Group.project == project.ID)).scalars()
+    )
+    affected = {
+        "projects": 1,
+        "groups": len(group_ids),
+        "groupMembers": count_rows(
+            select(GroupMember.ID).where(GroupMember.groupID.in_(group_ids))
+        )
+        if group_ids
+        else 0,
+    }
+    if dry_run:
+        return get_cascade_response(None, affected, dry_run)
+
+    if group_ids:
+        GroupMember.query.filter(GroupMember.groupID.in_(group_ids)).delete(
+            synchronize_session=False
+        )
+        Group.query.filter(Group.ID.in_(group_ids)).delete(synchronize_session=False)
+    # Name the project so only its entry in the recommendation index is dropped
+    Project.query.filter_by(ID=project.ID).execution_options(
+        project_ids=(project.ID,)
+    ).delete()
 
     db.session.commit()
-    return jsonify({"message": "Successfully deleted project"}), 200
+    return get_cascade_response("Successfully deleted project", affected, dry_run)
 
 
-def delete_user_cascade(zid):
+def delete_user_cascade(zid, dry_run=False):
     """
-    Deletes a user and its related data in a cascading manner from the database.
+    Deletes a user and its related data in a cascading manner from the database, with one
+    DELETE per table in one transaction. Their roles, profile vectors and scrape jobs go
+    with the user row through ON DELETE CASCADE.
 
     Args:
     - zid (str): The unique identifier (zID) of the user to be deleted.
+    - dry_run (bool): Only count the rows that would be affected.
 
     Returns:
-    - A JSON response with a success message if the user is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the user is
+      successfully deleted, or only the counts on a dry run.
       If the user is not found, a JSON response with an error message and a 404 status
       code is returned.
 
     Example:
-    Successfully deleted user
+    {
+        "message": "Successfully deleted user",
+        "affected": {"users": 1, "groupMembers": 2, "enrolments": 12}
+    }
     """
 
     user = User.query.filter_by(zID=zid).first()
     if not (user):
         return jsonify({"error": "User not found."}), 404
+    affected = {
+        "users": 1,
+        "groupMembers": count_rows(
+            select(GroupMember.ID).where(GroupMember.student == user.zID)
+        ),
+        "enrolments": count_rows(
+            select(CourseEnrolment.ID).where(CourseEnrolment.user == user.zID)
+        ),
+    }
+    if dry_run:
+        return get_cascade_response(None, affected, dry_run)
+
     GroupMember.query.filter_by(student=zid).delete()
     CourseEnrolment.query.filter_by(user=zid).delete()
-    User.query.filter_by(zID=zid).delete()
+    # Name the zID so only its student model entry is dropped
+    User.query.filter_by(zID=zid).execution_options(student_ids=(int(zid),)).delete()
 
     db.session.commit()
-    return jsonify({"message": "Successfully deleted user"}), 200
+    return get_cascade_response("Successfully deleted user", affected, dry_run)
 
 
 @admin.route("/admin/all-users", methods=["GET"])
 @jwt_required()
 def get_user_list():
     """
-    Retrieve a list of all users in the system.
+    Retrieve a page of the users in the system.
 
     Requires a valid JWT token for authentication.
 
     Endpoint:
     GET /admin/all-users
 
+    Query Parameters:
+    - role, search: Optional filters, see return_all_users.
+    - after (int, optional): The nextCursor of the previous page.
+    - limit (int, optional): The number of users per page.
+    - format (str, optional): "ndjson" to stream every matching user for an export.
+
     Returns:
-    - A JSON response containing information about all users, including their zID,
+    - A JSON response containing a page of users, including their zID,
     first name, last name,
       email, and user roles.
 
@@ -421,28 +814,36 @@ def get_user_list():
                 "userType": ["student"]
             },
             # ... additional user entries ...
-        ]
+        ],
+        "nextCursor": 7654321
     }
 
     Response Codes:
     - 200 OK: Successful retrieval of user list.
+    - 400 Bad Request: Invalid filter or paging arguments.
     """
-    return return_all_users(), 200
+    return return_all_users()
 
 
 @admin.route("/admin/all-courses", methods=["GET"])
 @jwt_required()
 def get_course_list():
     """
-    Retrieve a list of all courses in the system.
+    Retrieve a page of the courses in the system.
 
     Requires a valid JWT token for authentication.
 
     Endpoint:
     GET /admin/all-courses
 
+    Query Parameters:
+    - courseCode, yearDate, term, school: Optional filters, see return_all_courses.
+    - after (int, optional): The nextCursor of the previous page.
+    - limit (int, optional): The number of courses per page.
+    - format (str, optional): "ndjson" to stream every matching course for an export.
+
     Returns:
-    - A JSON response containing information about all courses, including their
+    - A JSON response containing a page of courses, including their
     course code, course name,
       year, term, and school.
 
@@ -464,28 +865,36 @@ def get_course_list():
                     "school": "School of Computer Science and Engineering"
                 },
                 # ... additional course entries ...
-            ]
+            ],
+            "nextCursor": null
         }
 
     Response Codes:
     - 200 OK: Successful retrieval of course list.
+    - 400 Bad Request: Invalid filter or paging arguments.
     """
-    return return_all_courses(), 200
+    return return_all_courses()
 
 
 @admin.route("/admin/all-projects", methods=["GET"])
 @jwt_required()
 def get_project_list():
     """
-    Retrieve a list of all projects in the system.
+    Retrieve a page of the projects in the system.
 
     Requires a valid JWT token for authentication.
 
     Endpoint:
     GET /admin/all-projects
 
+    Query Parameters:
+    - search, creator: Optional filters, see return_all_projects.
+    - after (int, optional): The nextCursor of the previous page.
+    - limit (int, optional): The number of projects per page.
+    - format (str, optional): "ndjson" to stream every matching project for an export.
+
     Returns:
-    - A JSON response containing information about all projects, including their
+    - A JSON response containing a page of projects, including their
     project ID, project name,
       and client.
 
@@ -503,13 +912,15 @@ def get_project_list():
                 "client": "XYZ Company"
             },
             # ... additional project entries ...
-        ]
+        ],
+        "nextCursor": null
     }
 
     Response Codes:
     - 200 OK: Successful retrieval of project list.
+    - 400 Bad Request: Invalid filter or paging arguments.
     """
-    return return_all_projects(), 200
+    return return_all_projects()
 
 
 @admin.route("/admin/dashboard", methods=["GET"])
@@ -529,6 +940,7 @@ def admin_stats():
         course admin, admin).
         - "courseCount": The total count of courses in the system.
         - "projectCount": The total count of projects in the system.
+        - "schoolCount": The course and project counts of every school.
 
     Example:
     {
@@ -541,7 +953,14 @@ def admin_stats():
                 "admin": 5
             },
             "courseCount": 15,
-            "projectCount": 25
+            "projectCount": 25,
+            "schoolCount": [
+                {
+                    "school": "School of Computer Science and Engineering",
+                    "courseCount": 12,
+                    "projectCount": 20
+                }
+            ]
         }
     }
 
@@ -559,6 +978,7 @@ def admin_stats():
                     "userCount": user_count_stat,
                     "courseCount": course_count,
                     "projectCount": project_count,
+                    "schoolCount": school_counts(),
                 }
             }
         ),
@@ -581,11 +1001,16 @@ def delete_course():
     {
         "courseCode": "COMP1511",
         "yearDate": 2023,
-        "term": "T3"
+        "term": "T3",
+        "dryRun": false
     }
 
+    Set "dryRun" to true to only report the number of rows the deletion would affect. It
+    must be a JSON boolean.
+
     Returns:
-    - A JSON response with a success message if the course is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the course is
+      successfully deleted, or only the counts on a dry run.
       If the course is not found, a JSON response with an error message and a 404
       status code is returned.
 
@@ -594,13 +1019,18 @@ def delete_course():
 
     Response Codes:
     - 200 OK: Successful deletion of the course.
+    - 400 Bad Request: dryRun is not a boolean.
     - 404 Not Found: Course not found.
     """
     data = request.get_json()
     course_code = data["courseCode"]
     year_date = data["yearDate"]
     term = data["term"]
-    return delete_course_cascade(course_code, year_date, term)
+    try:
+        dry_run = get_dry_run(data)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return delete_course_cascade(course_code, year_date, term, dry_run)
 
 
 @admin.route("/admin/group/delete", methods=["DELETE"])
@@ -616,11 +1046,16 @@ def delete_group():
 
     Request JSON Payload:
     {
-        "groupID": 1
+        "groupID": 1,
+        "dryRun": false
     }
 
+    Set "dryRun" to true to only report the number of rows the deletion would affect. It
+    must be a JSON boolean.
+
     Returns:
-    - A JSON response with a success message if the group is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the group is
+      successfully deleted, or only the counts on a dry run.
       If the group is not found, a JSON response with an error message and a
       404 status code is returned.
 
@@ -629,11 +1064,16 @@ def delete_group():
 
     Response Codes:
     - 200 OK: Successful deletion of the group.
+    - 400 Bad Request: dryRun is not a boolean.
     - 404 Not Found: Group not found.
     """
     data = request.get_json()
     group_id = data["groupID"]
-    return delete_group_cascade(group_id)
+    try:
+        dry_run = get_dry_run(data)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return delete_group_cascade(group_id, dry_run)
 
 
 @admin.route("/admin/project/delete", methods=["DELETE"])
@@ -649,11 +1089,16 @@ def delete_project():
 
     Request JSON Payload:
     {
-        "ID": 1
+        "ID": 1,
+        "dryRun": false
     }
 
+    Set "dryRun" to true to only report the number of rows the deletion would affect. It
+    must be a JSON boolean.
+
     Returns:
-    - A JSON response with a success message if the project is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the project is
+      successfully deleted, or only the counts on a dry run.
       If the project is not found, a JSON response with an error message and a 404
       status code is returned.
 
@@ -662,11 +1107,16 @@ def delete_project():
 
     Response Codes:
     - 200 OK: Successful deletion of the project.
+    - 400 Bad Request: dryRun is not a boolean.
     - 404 Not Found: Project not found.
     """
     data = request.get_json()
     project_id = data["ID"]
-    return delete_project_cascade(project_id)
+    try:
+        dry_run = get_dry_run(data)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return delete_project_cascade(project_id, dry_run)
 
 
 @admin.route("/admin/user/delete", methods=["DELETE"])
@@ -682,11 +1132,16 @@ def delete_user():
 
     Request JSON Payload:
     {
-        "zID": "z1234567"
+        "zID": "z1234567",
+        "dryRun": false
     }
 
+    Set "dryRun" to true to only report the number of rows the deletion would affect. It
+    must be a JSON boolean.
+
     Returns:
-    - A JSON response with a success message if the user is successfully deleted.
+    - A JSON response with a success message and the affected row counts if the user is
+      successfully deleted, or only the counts on a dry run.
       If the user is not found, a JSON response with an error message and a 404
       status code is returned.
 
@@ -695,8 +1150,123 @@ def delete_user():
 
     Response Codes:
     - 200 OK: Successful deletion of the user.
+    - 400 Bad Request: dryRun is not a boolean.
     - 404 Not Found: User not found.
     """
     data = request.get_json()
     zid = data["zID"]
-    return delete_user_cascade(zid)
+    try:
+        dry_run = get_dry_run(data)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return delete_user_cascade(zid, dry_run)
+
+
+@admin.route("/admin/nlp-models", methods=["GET"])
+@jwt_required()
+def get_nlp_models():
+    """
+    Retrieve the NLP models loaded by this server process and what loading them cost.
+
+    Requires a valid JWT token for authentication.
+
+    Endpoint:
+    GET /admin/nlp-models
+
+    Returns:
+    - A JSON response mapping each loaded model to its load time, the resident memory the
+    load added and, for spaCy pipelines, the size of the word vector table.
+
+    Example:
+    {
+        "models": {
+            "spacy/en_core_web_lg": {
+                "loadSeconds": 4.812,
+                "residentBytesAdded": 812421120,
+                "vectorBytes": 600000000
+            }
+        }
+    }
+
+    Response Codes:
+    - 200 OK: Successful retrieval of the loaded models.
+    """
+    return jsonify({"models": get_model_footprints()}), 200
+
+
+@admin.route("/admin/course-cache", methods=["GET"])
+@jwt_required()
+def get_course_cache():
+    """
+    Retrieve the counters of the course detail response cache of this server process.
+
+    Requires a valid JWT token for authentication.
+
+    Endpoint:
+    GET /admin/course-cache
+
+    Returns:
+    - A JSON response with the number of cached responses, the cache capacity and TTL in
+    seconds, and the hits, misses, LRU evictions, TTL expirations and invalidations since
+    the server started.
+
+    Example:
+    {
+        "cache": {
+            "entries": 42,
+            "size": 512,
+            "ttl": 600,
+            "hits": 1210,
+            "misses": 97,
+            "hitRate": 0.9258,
+            "evictions": 0,
+            "expirations": 31,
+            "invalidations": 24
+        }
+    }
+
+    Response Codes:
+    - 200 OK: Successful retrieval of the cache counters.
+    """
+    return jsonify({"cache": get_course_cache_stats()}), 200
+
+
+@admin.route("/admin/database-pool", methods=["GET"])
+@jwt_required()
+def get_database_pool():
+    """
+    Retrieve the state and counters of the database connection pool of this server
+    process.
+
+    Requires a valid JWT token for authentication.
+
+    Endpoint:
+    GET /admin/database-pool
+
+    Returns:
+    - A JSON response with the database driver, the pool size, the connections idle in the
+    pool, checked out and opened on top of its size, and the checkouts, seconds spent
+    waiting for a connection, checkout timeouts and dead connections replaced since the
+    server started.
+
+    Example:
+    {
+        "pool": {
+            "driver": "mysqlconnector",
+            "size": 10,
+            "idle": 3,
+            "checkedOut": 7,
+            "overflow": 0,
+            "checkouts": 5230,
+            "waitSeconds": 1.204,
+            "maxWaitSeconds": 0.412,
+            "averageWaitSeconds": 0.0002,
+            "timeouts": 0,
+            "invalidated": 2
+        }
+    }
+
+    Response Codes:
+    - 200 OK: Successful retrieval of the pool counters.
+    """
+    return jsonify({"pool": get_pool_stats(db.engine)}), 200
@@ -1,38 +1,11 @@
 try:
-    from models import db
+    from __init__ import create_app
 except:
-    from .models import db
+    from .__init__ import create_app
 
-try:
-    from __init__ import app
-except:
-    from .__init__ import app
-
-try:
-    from user_profile import user_profile
-except:
-    from .user_profile import user_profile
-
-try:
-    from course import course
-except:
-    from .course import course
-
-try:
-    from projects import projects
-except:
-    from .projects import projects
-
-try:
-    from admin import admin
-except:
-    from .admin import admin
-
-db.init_app(app)
-app.register_blueprint(user_profile)
-app.register_blueprint(course)
-app.register_blueprint(projects)
-app.register_blueprint(admin)
+# Runs the profile named by APP_PROFILE, e.g. "APP_PROFILE=scraper python3 app.py" for a
+# process that only runs the scrape jobs. See PROFILES in __init__.py.
+app = create_app()
 
 if __name__ == '__main__':
-    app.run('localhost', 6969)
\ No newline at end of file
+    app.run('localhost', app.config["APP_PORT"])
@@ -0,0 +1,366 @@
+'''
+This file imports a scraped course catalog CSV, e.g.
+webscraping/comp_courses_with_skills_and_topics.csv, into tblCourse.
+
+The whole file is validated and normalised with pandas first: every row gets either the
+column values it is written with or the reason it is rejected. Valid rows are then upserted
+on (courseCode, yearDate, term), the unique_course_revision key, CHUNK_SIZE rows per
+INSERT ... ON DUPLICATE KEY UPDATE, so reloading a catalog updates the offerings it already
+holds instead of duplicating or skipping them. A chunk the database rejects is retried row
+by row so only the offending rows fail. Rejected rows are written to an error report.
+
+The import writes tblCourse directly, so tblCourseTerm is rewritten here for the courses it
+touches, and the course codes are recorded in tblModelChange: running servers drop their
+cached responses of those courses and re-read them into their course recommendation model,
+see model_changes.py.
+
+Run "python3 catalog.py <csv>" in backend/app to import a catalog by hand.
+'''
+
+import argparse
+import ast
+import json
+import os
+
+import pandas as pd
+from sqlalchemy import create_engine, select, tuple_
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import DBAPIError
+
+try:
+    from models import Course
+except ImportError:
+    from .models import Course
+try:
+    from term_weights import get_weights, refresh_course_terms
+except ImportError:
+    from .term_weights import get_weights, refresh_course_terms
+try:
+    from model_changes import record_changes
+except ImportError:
+    from .model_changes import record_changes
+
+CHUNK_SIZE = 500
+
+DEFAULT_SCHOOL = "School of Computer Science and Engineering"
+
+# Columns of the scraped CSV the courses are built from
+CATALOG_COLUMNS = [
+    "Course Code",
+    "Course Name",
+    "Course Description",
+    "Skills",
+    "Knowledge",
+    "topics",
+    "Year",
+    "Term",
+    "Date Scraped",
+]
+
+# Key of unique_course_revision
+COURSE_KEY = ["courseCode", "yearDate", "term"]
+
+# Columns rewritten when an offering is already in tblCourse
+UPDATED_COLUMNS = [
+    "courseName",
+    "courseDescription",
+    "courseSkills",
+    "courseKnowledge",
+    "topics",
+    "revision",
+    "school",
+]
+
+REPORT_COLUMNS = ["row", "courseCode", "yearDate", "term", "error"]
+
+
+def parse_literal(value):
+    '''
+    Parses a JSON value, or the Python literal the scraper wrote instead, e.g.
+    "{'python': 3}".
+
+    Parameters:
+    - value (str): The cell.
+
+    Returns:
+    The parsed value, or None if the cell is neither.
+    '''
+    try:
+        return json.loads(value)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def normalise_weights(value):
+    '''
+    Normalises a skills or knowledge cell to a JSON object of numeric weights.
+
+    Parameters:
+    - value (str): The cell.
+
+    Returns:
+    str or None: The JSON object, or None if the cell is not an object.
+    '''
+    data = parse_literal(value)
+    if not isinstance(data, dict):
+        return None
+    return json.dumps(get_weights(data))
+
+
+def normalise_topics(value):
+    '''
+    Normalises a topics cell to a JSON list.
+
+    Parameters:
+    - value (str): The cell.
+
+    Returns:
+    str or None: The JSON list, or None if the cell is not a list.
+    '''
+    data = parse_literal(value)
+    if not isinstance(data, list):
+        return None
+    return json.dumps(data)
+
+
+def normalise_catalog(df, school=DEFAULT_SCHOOL):
+    '''
+    Validates and normalises a catalog.
+
+    Parameters:
+    - df (DataFrame): The catalog as read from its CSV, every cell a string.
+    - school (str): The school the courses belong to.
+
+    Returns:
+    DataFrame: The tblCourse columns of every row, and an "error" column holding the first
+    reason a row is rejected, empty for valid rows.
+    '''
+    missing = [column for column in CATALOG_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Catalog is missing the columns: {', '.join(missing)}")
+
+    df = df[CATALOG_COLUMNS].fillna("").astype(str)
+    topics = df["topics"].str.strip()
+    topics = topics.mask(topics.isin(["", "No Information about Topics"]), "[]")
+    courses = pd.DataFrame(
+        {
+            "courseCode": df["Course Code"].str.strip().str.upper(),
+            "courseName": df["Course Name"].str.strip(),
+            "courseDescription": df["Course Description"].str.strip(),
+            "courseSkills": df["Skills"].map(normalise_weights),
+            "courseKnowledge": df["Knowledge"].map(normalise_weights),
+            "topics": topics.map(normalise_topics),
+            "yearDate": pd.to_numeric(df["Year"].str.strip(), errors="coerce"),
+            "term": df["Term"].str.strip().str.upper(),
+            "revision": pd.to_datetime(df["Date Scraped"].str.strip(), errors="coerce"),
+            "school": school,
+        },
+        index=df.index,
+    )
+
+    error = pd.Series("", index=df.index)
+    checks = [
+        (~courses["courseCode"].str.fullmatch(r"[A-Z]{4}\d{4}"), "Invalid course code"),
+        (courses["yearDate"].isna() | (courses["yearDate"] % 1 != 0), "Invalid year"),
+        (courses["term"] == "", "Missing term"),
+        (courses["term"].str.len() > 25, "Term is too long"),
+        (courses["courseName"] == "", "Missing course name"),
+        (courses["courseName"].str.len() > 255, "Course name is too long"),
+        (courses["courseSkills"].isna(), "Skills are not a JSON object"),
+        (courses["courseKnowledge"].isna(), "Knowledge is not a JSON object"),
+        (courses["topics"].isna(), "Topics are not a JSON list"),
+    ]
+    for failed, message in checks:
+        error = error.mask(failed & (error == ""), message)
+    # A later row of the same offering wins, as it would have with one upsert per row
+    valid = courses[error == ""]
+    superseded = valid.index[valid.duplicated(COURSE_KEY, keep="last")]
+    error[superseded] = "Superseded by a later row of the same offering"
+
+    courses["error"] = error
+    return courses
+
+
+def get_course_records(courses):
+    '''
+    Turns normalised catalog rows into the parameters of the upsert.
+
+    Parameters:
+    - courses (DataFrame): Valid rows of normalise_catalog.
+
+    Returns:
+    list: A dict of tblCourse columns per row.
+    '''
+    records = courses.drop(columns="error").astype(object)
+    records["yearDate"] = records["yearDate"].astype(int)
+    records["revision"] = records["revision"].map(
+        lambda revision: None if pd.isna(revision) else revision.to_pydatetime()
+    )
+    return records.to_dict("records")
+
+
+def upsert_courses(connection, records):
+    '''
+    Inserts course offerings, updating those already in tblCourse, rewrites their skill
+    and knowledge weights and records their course codes for the running servers.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - records (list): A dict of tblCourse columns per offering.
+    '''
+    statement = insert(Course.__table__)
+    statement = statement.on_duplicate_key_update(
+        {column: statement.inserted[column] for column in UPDATED_COLUMNS}
+    )
+    connection.execute(statement, records)
+
+    keys = [tuple(record[column] for column in COURSE_KEY) for record in records]
+    course_ids = connection.execute(
+        select(Course.ID).where(
+            tuple_(Course.courseCode, Course.yearDate, Course.term).in_(keys)
+        )
+    ).scalars()
+    refresh_course_terms(connection, course_ids)
+    course_codes = [record["courseCode"] for record in records]
+    record_changes(connection, {"course": course_codes, "courseCache": course_codes})
+
+
+def load_catalog(engine, courses, chunk_size=CHUNK_SIZE):
+    '''
+    Upserts the valid rows of a normalised catalog in chunks, one transaction per chunk.
+
+    Parameters:
+    - engine (Engine): The database engine.
+    - courses (DataFrame): The result of normalise_catalog, updated with the database
+    error of every row that could not be written.
+    - chunk_size (int): The number of rows per statement.
+
+    Returns:
+    int: The number of rows written.
+    '''
+    valid = courses.index[courses["error"] == ""]
+    loaded = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = courses.loc[valid[start : start + chunk_size]]
+        records = get_course_records(chunk)
+        try:
+            with engine.begin() as connection:
+                upsert_courses(connection, records)
+            loaded += len(records)
+            continue
+        except DBAPIError:
+            pass
+
+        # Find the rows the database rejects, and write the rest
+        for index, record in zip(chunk.index, records):
+            try:
+                with engine.begin() as connection:
+                    upsert_courses(connection, [record])
+                loaded += 1
+            except DBAPIError as error:
+                courses.loc[index, "error"] = str(error.orig).strip()
+    return loaded
+
+
+def get_error_report(courses):
+    '''
+    Lists the rejected rows of a catalog.
+
+    Parameters:
+    - courses (DataFrame): The result of normalise_catalog.
+
+    Returns:
+    DataFrame: The 1-based data row number, key and error of every rejected row.
+    '''
+    rejected = courses[courses["error"] != ""]
+    report = rejected[COURSE_KEY + ["error"]].copy()
+    report.insert(0, "row", rejected.index + 1)
+    return report[REPORT_COLUMNS]
+
+
+def import_catalog(
+    engine, path, school=DEFAULT_SCHOOL, chunk_size=CHUNK_SIZE, report_path=None
+):
+    '''
+    Imports a catalog CSV into tblCourse.
+
+    Parameters:
+    - engine (Engine): The database engine.
+    - path (str): The catalog CSV.
+    - school (str): The school the courses belong to, which must be in tblSchool.
+    - chunk_size (int): The number of rows per statement.
+    - report_path (str, optional): Where to write the CSV report of the rejected rows.
+
+    Returns:
+    dict: The number of "rows" read, "loaded" and "rejected".
+    '''
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    courses = normalise_catalog(df, school)
+    loaded = load_catalog(engine, courses, chunk_size)
+    report = get_error_report(courses)
+    if report_path is not None:
+        report.to_csv(report_path, index=False)
+    return {"rows": len(courses), "loaded": loaded, "rejected": len(report)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import a scraped course catalog CSV into tblCourse."
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "..",
+            "webscraping",
+            "comp_courses_with_skills_and_topics.csv",
+        ),
+        help="The catalog CSV, defaults to the COMP catalog.",
+    )
+    parser.add_argument(
+        "--database-uri",
+        help="SQLAlchemy URI of the database, defaults to DATABASE_URI or the one the server uses.",
+    )
+    parser.add_argument(
+        "--school", default=DEFAULT_SCHOOL, help="The school the courses belong to."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="The number of rows per statement.",
+    )
+    parser.add_argument(
+        "--errors",
+        default="catalog_errors.csv",
+        help="Where to write the report of the rejected rows.",
+    )
+    args = parser.parse_args()
+
+    database_uri = args.database_uri
+    if database_uri is None:
+        try:
+            from __init__ import get_database_uri
+        except ImportError:
+            from .__init__ import get_database_uri
+        database_uri = get_database_uri()
+    engine = create_engine(database_uri)
+
+    summary = import_catalog(
+        engine, args.path, args.school, args.chunk_size, args.errors
+    )
+    print(
+        f"Read {summary['rows']} rows, loaded {summary['loaded']}, "
+        f"rejected {summary['rejected']}"
+    )
+    if summary["rejected"]:
+        print(f"Rejected rows are listed in {args.errors}")
+
+
+if __name__ == "__main__":
+    main()
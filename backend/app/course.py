@@ -7,26 +7,39 @@ import ast
 import sys
 import os
 from datetime import datetime
-import threading
 import json
 
 from flask import Blueprint, request, jsonify, current_app, Flask, session
-from recommendations.recommend_courses import get_recommended_courses
+from recommendations.recommend_courses import (
+    course_model,
+    load_course_model,
+    upsert_course_document,
+    remove_course_document,
+    recommend_from_course_model,
+)
+from lazy_imports import lazy_import
+from sqlalchemy import desc, func, inspect, select
+from flask_jwt_extended import jwt_required, get_jwt_identity
 try:
-    from webscraping.scrape_single_course import get_single_course_information
+    from models import db, User, CourseEnrolment, Course, CourseArchive
 except ImportError:
-    from ..webscraping.scrape_single_course import get_single_course_information
-
+    from .models import db, User, CourseEnrolment, Course, CourseArchive
 try:
-    from webscraping.pdf_scraping import *
+    from jobs import enqueue_job, register_job_task
 except ImportError:
-    from ..webscraping.pdf_scraping import *
-from sqlalchemy import desc
-from flask_jwt_extended import jwt_required, get_jwt_identity
+    from .jobs import enqueue_job, register_job_task
 try:
-    from models import db, User, CourseEnrolment, Course, CourseArchive
+    from course_cache import get_course_cache_key, get_cached_course, cache_course
 except ImportError:
-    from .models import db, User, CourseEnrolment, Course, CourseArchive
+    from .course_cache import get_course_cache_key, get_cached_course, cache_course
+try:
+    from term_weights import get_course_terms
+except ImportError:
+    from .term_weights import get_course_terms
+try:
+    from model_changes import share_model_writes, pull_model_changes
+except ImportError:
+    from .model_changes import share_model_writes, pull_model_changes
 
 current_directory = os.getcwd()
 # Get the parent directory
@@ -35,6 +48,123 @@ sys.path.append(parent_directory)
 
 course = Blueprint("course", __name__)
 
+# Imported by the first scrape, see lazy_imports
+scrape_single_course = lazy_import("webscraping.scrape_single_course")
+pdf_scraping = lazy_import("webscraping.pdf_scraping")
+
+
+def get_written_course_codes(target, updated):
+    """
+    Get the course codes a written course affects in the course recommendation model.
+
+    Args:
+    - target (Course): The created, edited or deleted course.
+    - updated (bool): Whether the course was edited.
+
+    Returns:
+    - list: The course's code, and its old code if an edit changed it.
+    """
+    course_codes = [target.courseCode]
+    if updated:
+        course_codes.extend(inspect(target).attrs.courseCode.history.deleted)
+    return course_codes
+
+
+# Flag created, edited, scraped and deleted courses once their transaction commits. A bulk
+# write names the course codes it touches through the "course_codes" execution option.
+# Courses written by other processes, e.g. scraped by a scraper, are flagged on refresh.
+course_model.track_writes(Course, get_written_course_codes, "course_codes")
+share_model_writes(course_model, str)
+
+
+def get_latest_courses(course_codes=None):
+    """
+    Get the latest offering of every course code in a single query.
+
+    The offerings of each code are ranked with ROW_NUMBER() by year, then term, newest
+    first (the lowest ID wins a tie), and only the first of each is returned.
+
+    Args:
+    - course_codes (iterable, optional): Only fetch these course codes.
+
+    Returns:
+    - dict: Maps each course code to its latest Course row, ordered by when the course code
+    first appeared in the catalog.
+    """
+    ranked = select(
+        Course.ID,
+        func.row_number()
+        .over(
+            partition_by=Course.courseCode,
+            order_by=(desc(Course.yearDate), desc(Course.term), Course.ID),
+        )
+        .label("offeringRank"),
+        func.min(Course.ID).over(partition_by=Course.courseCode).label("firstID"),
+    )
+    if course_codes is not None:
+        course_codes = list(course_codes)
+        if not course_codes:
+            return {}
+        ranked = ranked.where(Course.courseCode.in_(course_codes))
+    ranked = ranked.subquery()
+
+    latest_courses = db.session.execute(
+        select(Course)
+        .join(ranked, Course.ID == ranked.c.ID)
+        .where(ranked.c.offeringRank == 1)
+        .order_by(ranked.c.firstID)
+    ).scalars()
+    return {course.courseCode: course for course in latest_courses}
+
+
+def get_latest_course_offerings():
+    """
+    Get the skills and knowledge of the latest offering of every course.
+
+    Returns:
+    - list: A dict per course code with "name", "skills" and "knowledge" fields, ordered by
+    when the course code first appeared in the catalog.
+    """
+    latest_courses = get_latest_courses()
+    course_terms = get_course_terms(course.ID for course in latest_courses.values())
+    offerings = []
+    for course_code, latest_course in latest_courses.items():
+        weights = course_terms.get(latest_course.ID, {"skills": {}, "knowledge": {}})
+        offerings.append(
+            {
+                "name": course_code,
+                "skills": weights["skills"],
+                "knowledge": weights["knowledge"],
+            }
+        )
+    return offerings
+
+
+def refresh_course_model():
+    """
+    Bring the course recommendation model in line with tblCourse.
+
+    The model is built from the whole catalog the first time it is needed. After that only
+    courses flagged by create, edit, scrape or delete, in this process or another, are
+    re-read.
+    """
+    pull_model_changes()
+    if not course_model.is_loaded():
+        course_model.take_dirty()
+        load_course_model(get_latest_course_offerings())
+        return
+
+    dirty_codes = course_model.take_dirty()
+    latest_courses = get_latest_courses(dirty_codes)
+    course_terms = get_course_terms(course.ID for course in latest_courses.values())
+    for course_code in dirty_codes:
+        latest_offering = latest_courses.get(course_code)
+        if not latest_offering:
+            remove_course_document(course_code)
+            continue
+        weights = course_terms.get(latest_offering.ID, {"skills": {}, "knowledge": {}})
+        upsert_course_document(course_code, weights["skills"], weights["knowledge"])
+
 
 def publicProfileDisplay(zID):
     """
@@ -189,6 +319,180 @@ def getCourseList(zid, role):
         user_course_list_dict.append(course_info_dict)
     return json.dumps({"courses": user_course_list_dict})
 
+def get_enrolment_weights(enrolments):
+    """
+    Add up the skills and knowledge of the courses in a list of enrolments, per user and
+    role, loading the weights of every course involved with one query.
+
+    Args:
+    - enrolments (list): (zid, course_id, role) tuples.
+
+    Returns:
+    - A dict mapping (zid, role) to the summed (skills, knowledge) weights. Enrolments in
+    courses without any weight are left out.
+    """
+    course_terms = get_course_terms({course_id for _, course_id, _ in enrolments})
+
+    weights = {}
+    for zid, course_id, role in enrolments:
+        if course_id not in course_terms:
+            continue
+        skills, knowledge = weights.setdefault((int(zid), role), ({}, {}))
+        for skill, weight in course_terms[course_id]["skills"].items():
+            skills[skill] = skills.get(skill, 0) + weight
+        for knowledge_term, weight in course_terms[course_id]["knowledge"].items():
+            knowledge[knowledge_term] = knowledge.get(knowledge_term, 0) + weight
+    return weights
+
+
+def apply_enrolment_weights(enrolments, sign):
+    """
+    Add the skills and knowledge of newly enrolled courses to their users' profiles, or
+    remove those of dropped courses, rewriting each user's metadataJson once.
+
+    Args:
+    - enrolments (list): (zid, course_id, role) tuples.
+    - sign (int): 1 to add the course weights, -1 to remove them. Terms whose weight drops
+    to 0 or below are removed from the profile.
+
+    Returns:
+    - None
+
+    Response Codes:
+    - No direct response; the caller commits the session.
+    """
+    weights = get_enrolment_weights(enrolments)
+    if not weights:
+        return
+    users = User.query.filter(User.zID.in_({zid for zid, _ in weights})).all()
+    metadata_by_user = {user.zID: json.loads(user.metadataJson) for user in users}
+
+    for (zid, role), (skills, knowledge) in weights.items():
+        if zid not in metadata_by_user:
+            continue
+        role_data = metadata_by_user[zid]["class"][role]
+        for field, delta in (("skills", skills), ("knowledge", knowledge)):
+            profile_weights = role_data.get(field)
+            if not isinstance(profile_weights, dict):
+                profile_weights = role_data[field] = {}
+            for term, weight in delta.items():
+                if sign > 0:
+                    profile_weights[term] = profile_weights.get(term, 0) + weight
+                elif term in profile_weights:
+                    profile_weights[term] = profile_weights[term] - weight
+                    if profile_weights[term] <= 0:
+                        profile_weights.pop(term, None)
+
+    for user in users:
+        user.metadataJson = json.dumps(metadata_by_user[user.zID])
+
+
+def addCourseEnrolments(zid, course_ids, role):
+    """
+    Enrol a user in several courses with the specified role in one transaction, adding the
+    courses' skills and knowledge to the user's profile with a single metadata write.
+
+    Args:
+    - zid (str): The zID (unique identifier) of the user.
+    - course_ids (list): The IDs of the courses to be enrolled in. Courses the user is
+    already enrolled in with this role, and IDs of courses that do not exist, are skipped.
+    - role (str): The role in the courses for the user (e.g., "student", "academic").
+
+    Returns:
+    - list: The IDs of the courses the user was enrolled in.
+
+    Response Codes:
+    - No direct response; the function updates the database.
+    """
+    course_ids = list(dict.fromkeys(int(course_id) for course_id in course_ids))
+    if not course_ids:
+        return []
+    existing_ids = set(
+        db.session.execute(select(Course.ID).where(Course.ID.in_(course_ids))).scalars()
+    )
+    enrolled_ids = set(
+        db.session.execute(
+            select(CourseEnrolment.course).where(
+                CourseEnrolment.user == zid,
+                CourseEnrolment.courseRole == role,
+                CourseEnrolment.course.in_(course_ids),
+            )
+        ).scalars()
+    )
+    new_ids = [
+        course_id
+        for course_id in course_ids
+        if course_id in existing_ids and course_id not in enrolled_ids
+    ]
+
+    db.session.add_all(
+        CourseEnrolment(user=zid, course=course_id, courseRole=role)
+        for course_id in new_ids
+    )
+    apply_enrolment_weights([(zid, course_id, role) for course_id in new_ids], 1)
+    db.session.commit()
+    return new_ids
+
+
+def removeEnrolments(enrolments):
+    """
+    Delete course enrolment rows and remove their courses' skills and knowledge from their
+    users' profiles, rewriting each user's metadata once.
+
+    Args:
+    - enrolments (list): The CourseEnrolment rows to delete.
+
+    Returns:
+    - None
+
+    Response Codes:
+    - No direct response; the caller commits the session.
+    """
+    if not enrolments:
+        return
+    CourseEnrolment.query.filter(
+        CourseEnrolment.ID.in_([enrolment.ID for enrolment in enrolments])
+    ).delete(synchronize_session=False)
+    apply_enrolment_weights(
+        [
+            (enrolment.user, enrolment.course, enrolment.courseRole)
+            for enrolment in enrolments
+        ],
+        -1,
+    )
+
+
+def deleteCourseEnrolments(zid, course_ids, role):
+    """
+    Delete a user's enrolments in several courses with the specified role in one
+    transaction, removing the courses' skills and knowledge from the user's profile with a
+    single metadata write.
+
+    Args:
+    - zid (str): The zID (unique identifier) of the user.
+    - course_ids (list): The IDs of the courses to be unenrolled from. Courses the user is
+    not enrolled in are skipped.
+    - role (str): The role in the courses for the user (e.g., "student", "academic").
+
+    Returns:
+    - list: The IDs of the courses the user was unenrolled from.
+
+    Response Codes:
+    - No direct response; the function updates the database.
+    """
+    course_ids = list(dict.fromkeys(int(course_id) for course_id in course_ids))
+    if not course_ids:
+        return []
+    enrolments = CourseEnrolment.query.filter(
+        CourseEnrolment.user == zid,
+        CourseEnrolment.courseRole == role,
+        CourseEnrolment.course.in_(course_ids),
+    ).all()
+    removeEnrolments(enrolments)
+    db.session.commit()
+    return list(dict.fromkeys(enrolment.course for enrolment in enrolments))
+
+
 def addCourseEnrolment(zid, course_id, role):
     """
     Add a user's enrollment in a course with the specified role.
@@ -204,33 +508,7 @@ def addCourseEnrolment(zid, course_id, role):
     Response Codes:
     - No direct response; the function updates the database.
     """
-
-    new_course_enrolment = CourseEnrolment(user=zid, course=course_id, courseRole=role)
-    db.session.add(new_course_enrolment)
-
-
-    user = User.query.filter_by(zID=zid).first()
-    enrolling_course = Course.query.filter_by(ID=course_id).first()
-    metadata = json.loads(user.metadataJson)
-
-    user_skills = metadata["class"][role]["skills"]
-    course_skills = json.loads(enrolling_course.courseSkills)
-    for skill, weight in course_skills.items():
-        if skill in list(user_skills.keys()):
-            user_skills[skill] = user_skills[skill] + weight
-        else:
-            user_skills[skill] = weight
-
-    user_knowledge = metadata["class"][role]["knowledge"]
-    course_knowledge = json.loads(enrolling_course.courseKnowledge)
-    for knowledge, weight in course_knowledge.items():
-        if knowledge in list(user_knowledge.keys()):
-            user_knowledge[knowledge] = user_knowledge[knowledge] + weight
-        else:
-            user_knowledge[knowledge] = weight
-
-    user.metadataJson = json.dumps(metadata)
-    db.session.commit()
+    addCourseEnrolments(zid, [course_id], role)
 
 
 def deleteCourseEnrolment(zid, course_id, role):
@@ -248,35 +526,7 @@ def deleteCourseEnrolment(zid, course_id, role):
     Response Codes:
     - No direct response; the function updates the database.
     """
-    CourseEnrolment.query.filter_by(user=zid, course=course_id, courseRole=role).delete()
-
-    remove_course = Course.query.filter_by(ID=course_id).first()
-    user = User.query.filter_by(zID=zid).first()
-    metadata = json.loads(user.metadataJson)
-
-    user_skills = metadata["class"][role]["skills"]
-    course_skills = json.loads(remove_course.courseSkills)
-    for skill, weight in course_skills.items():
-        if skill in user_skills.keys():
-            user_skills[skill] = user_skills[skill] - weight
-            if user_skills[skill] <= 0:
-                user_skills.pop(skill, None)
-        else:
-            user_skills[skill] = weight
-
-    user_knowledge = metadata["class"][role]["knowledge"]
-    course_knowledge = json.loads(remove_course.courseKnowledge)
-    for knowledge, weight in course_knowledge.items():
-        if knowledge in user_knowledge.keys():
-            user_knowledge[knowledge] = user_knowledge[knowledge] - weight
-            if user_knowledge[knowledge] <= 0:
-                user_knowledge.pop(knowledge, None)
-        else:
-            user_knowledge[knowledge] = weight
-
-    user.metadataJson = json.dumps(metadata)
-    db.session.commit()
-
+    deleteCourseEnrolments(zid, [course_id], role)
 
 
 def getRecommendedCourses(zid):
@@ -306,52 +556,21 @@ def getRecommendedCourses(zid):
         for term in set(user_skills) | set(user_knowledge)
     }
 
-    all_courses = []
-    courses = Course.query.all()
-    for recc_course in courses:
-        course_code = recc_course.courseCode
-        course_set = {d["name"] for d in all_courses}
-        if course_code in course_set or course_code in completed_courses:
-            continue
-        courses = (
-            Course.query.filter_by(courseCode=course_code)
-            .order_by(desc(Course.yearDate), desc(Course.term))
-            .all()
-        )
-        lattest_course = courses[0]
-        course_skills = json.loads(lattest_course.courseSkills)
-        course_knowledge = json.loads(lattest_course.courseKnowledge)
-        all_courses.append(
-            {
-                "name": course_code,
-                "knowledge": course_knowledge,
-                "skills": course_skills,
-            }
-        )
-    if len(all_courses) == 0:
-        return {"courses": []}, 200
-    recommended_courses = get_recommended_courses(
-        user_skills_and_knowledge, all_courses
+    refresh_course_model()
+    recommended_courses = recommend_from_course_model(
+        user_skills_and_knowledge, k=10, exclude_codes=completed_courses
     )
 
     if len(recommended_courses) == 0:
         return {"courses": []}, 200
 
-    course_code_recommended = [
-        item[0] for item in recommended_courses if item[0] not in completed_courses
-    ]
-
-    top_recommended_courses = course_code_recommended[:10]
+    top_recommended_courses = [item[0] for item in recommended_courses]
+    latest_courses = get_latest_courses(top_recommended_courses)
 
     recommended_courses_info = []
 
     for recc_course in top_recommended_courses:
-        course_all_info = (
-            Course.query.filter_by(courseCode=recc_course)
-            .order_by(desc(Course.yearDate), desc(Course.term))
-            .all()
-        )
-        course_all_info = course_all_info[0]
+        course_all_info = latest_courses[recc_course]
         course_required_info = {
             "name": course_all_info.courseName,
             "code": course_all_info.courseCode,
@@ -400,7 +619,7 @@ def webscrapeUsingURL(url):
     Returns:
     - dict: A dictionary containing information about the course obtained through web scraping.
 """
-    return get_single_course_information(url)
+    return scrape_single_course.get_single_course_information(url)
 
 
 def getID(zID):
@@ -508,11 +727,15 @@ def get_course_code(courseCode):
         role = "academic"
     else:
         role = "student"
-    course = (
-        Course.query.filter_by(courseCode=courseCode)
-        .order_by(desc(Course.yearDate), desc(Course.term))
-        .first()
-    )
+
+    cache_key = get_course_cache_key(courseCode)
+    data = get_cached_course(cache_key)
+    if data is not None:
+        return jsonify(data), 200
+
+    # Course codes are stored upper-case, so look the code up upper-cased rather than rely
+    # on the collation of the column, and take the only row returned
+    course = next(iter(get_latest_courses([courseCode.upper()]).values()), None)
     if not course:
         return jsonify({"error": "Course not found."}), 404
     archived = CourseArchive.query.filter_by(courseID=course.ID).all()
@@ -544,6 +767,7 @@ def get_course_code(courseCode):
         "availableYearTerms": availableYearTerm,
     }
 
+    cache_course(cache_key, data)
     return jsonify(data), 200
 
 
@@ -581,6 +805,12 @@ def get_course_term(courseCode, year, term):
         role = "academic"
     else:
         role = "student"
+
+    cache_key = get_course_cache_key(courseCode, year, term)
+    data = get_cached_course(cache_key)
+    if data is not None:
+        return jsonify(data), 200
+
     course = Course.query.filter_by(
         courseCode=courseCode, yearDate=year, term=term
     ).first()
@@ -617,6 +847,7 @@ def get_course_term(courseCode, year, term):
         "availableYearTerms": availableYearTerm,
     }
 
+    cache_course(cache_key, data)
     return jsonify(data), 200
 
 
@@ -658,6 +889,11 @@ def get_course_version(courseCode, year, term, version):
 
 
     version = int(version)
+    cache_key = get_course_cache_key(courseCode, year, term, version)
+    data = get_cached_course(cache_key)
+    if data is not None:
+        return jsonify(data), 200
+
     # get course info archive
     course = Course.query.filter_by(
         courseCode=courseCode, yearDate=year, term=term
@@ -721,6 +957,7 @@ def get_course_version(courseCode, year, term, version):
             "availableYearTerms": availableYearTerm,
         }
 
+    cache_course(cache_key, data)
     return jsonify(data), 200
 
 
@@ -1149,16 +1386,29 @@ def updateCourseInformationURL():
     - None (Arguments are extracted from the JSON payload in the request).
 
     Returns:
-    - JSON response indicating that the course web scraping is in progress.
+    - JSON response indicating that the course web scraping is in progress, with the job
+    to follow through GET /jobs/<jobID>.
 
     Response Codes:
-    - 200 OK: Course web scraping initiated successfully.
+    - 200 OK: Course web scraping queued, or already queued for this URL.
     - 400 Bad Request: Invalid UNSW course outline URL.
     - 401 Unauthorized: Invalid token.
+    - 429 Too Many Requests: The user already has too many updates in progress.
+    - 503 Service Unavailable: The scraping queue is full.
 
     Response JSON:
     {
-      "message": "Course web scraping in progress."
+      "message": "Course web scraping in progress.",
+      "duplicate": false,
+      "jobID": 12,
+      "jobType": "url",
+      "status": "queued",
+      "progress": 0,
+      "attempts": 0,
+      "error": null,
+      "createdAt": "2024-02-19T10:01:02",
+      "startedAt": null,
+      "finishedAt": null
     }
     """
     current_user_id = get_jwt_identity()
@@ -1184,35 +1434,28 @@ def updateCourseInformationURL():
     if "unsw.edu.au/course-outlines/course-outline#" not in url:
         return jsonify({"error": "Invalid UNSW course outline url"}), 400
 
-    # Use threading to perform URL scraping concurrently
-    scraping_thread = threading.Thread(
-        target=process_course_update_url,
-        args=(
-            current_app._get_current_object(),
-            user,
-            url,
-        ),
-    )
-    scraping_thread.start()
-
-    # Respond to the client immediately with a 200 status code
-    return jsonify({"message": "Course web scraping in progress."}), 200
+    # Queue the scrape for the job workers and respond to the client immediately
+    return enqueue_job("url", url, user.zID, "Course web scraping in progress.")
 
 
-def process_course_update_url(app, user, url):
+def process_course_update_url(app, user, url, report_progress=None):
     """
     Process the update of course information using a provided UNSW course outline URL.
+    Runs as the task of "url" scrape jobs.
 
     Args:
     - app (Flask app): The Flask application context.
     - user (User): The User object representing the academic initiating the update.
     - url (str): The UNSW course outline URL.
+    - report_progress (callable, optional): Called with the percentage of the job done.
 
     Returns:
     - None
     """
     with app.app_context():
         course_info = webscrapeUsingURL(url)
+        if report_progress:
+            report_progress(80)
         existing_course = Course.query.filter_by(
             courseCode=course_info["course"],
             yearDate=course_info["course_year"],
@@ -1292,9 +1535,10 @@ def updateCourseInformationPDF():
     - Flask JSON response: Indicates the initiation of the update process.
 
     Side Effects:
-    - Initiates a background thread to process the PDF and update the course information.
+    - Queues a scrape job to process the PDF and update the course information.
     - Verifies the user's role and authentication.
-    - Responds to the client immediately with a 200 status code.
+    - Responds to the client immediately with the job, in the same format as
+    updateCourseInformationURL (429 or 503 if the job cannot be queued).
 
     Example Usage:
       updateCourseInformationPDF()
@@ -1303,7 +1547,7 @@ def updateCourseInformationPDF():
     - Retrieves the current user's identity and role.
     - Validates the user as an academic.
     - Extracts information from the provided PDF.
-    - Starts a background thread to update the course information.
+    - Queues a job for the scrape workers to update the course information.
     - Immediately responds to the client, indicating the initiation of the update process.
     """
 
@@ -1327,37 +1571,36 @@ def updateCourseInformationPDF():
     # create course
     data = request.get_json()
     pdf = data["pdf"]
-    course_information = scrape_pdf(pdf)
+    course_information = pdf_scraping.scrape_pdf(pdf)
     if "UNSW Course Outline" not in course_information[0]:
         return jsonify({"error": "Invalid UNSW course outline pdf"}), 400
-    scraping_thread = threading.Thread(
-        target=process_course_update_pdf,
-        args=(
-            current_app._get_current_object(),
-            user,
-            course_information,
-        ),
-    )
-    scraping_thread.start()
 
-    # Respond to the client immediately with a 200 status code
-    return jsonify({"message": "Course pdf scrape update in progress."}), 200
+    # Queue the update for the job workers and respond to the client immediately
+    return enqueue_job(
+        "pdf", course_information, user.zID, "Course pdf scrape update in progress."
+    )
 
 
-def process_course_update_pdf(app, user, course_information):
+def process_course_update_pdf(app, user, course_information, report_progress=None):
     """
-    Process and update course information from a PDF.
+    Process and update course information from a PDF. Runs as the task of "pdf" scrape
+    jobs.
 
     Args:
     - app (Flask App): The Flask application context.
     - user (User): The academic user initiating the update.
     - course_information (list): Information extracted from the PDF.
+    - report_progress (callable, optional): Called with the percentage of the job done.
 
     Returns:
     - None
     """
     with app.app_context():
-        course_info = get_single_course_information_from_pdf(course_information)
+        course_info = pdf_scraping.get_single_course_information_from_pdf(
+            course_information
+        )
+        if report_progress:
+            report_progress(80)
         existing_course = Course.query.filter_by(
             courseCode=course_info["course"].strip(),
             yearDate=int(course_info["course_year"]),
@@ -1420,3 +1663,7 @@ def process_course_update_pdf(app, user, course_information):
         db.session.add(archive)
         # db.session.add(existing_course)
         db.session.commit()
+
+
+register_job_task("url", process_course_update_url)
+register_job_task("pdf", process_course_update_pdf)
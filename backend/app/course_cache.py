@@ -0,0 +1,272 @@
+'''
+This file contains the cache of the course detail responses served by
+/courses/<courseCode>, /courses/<courseCode>/<year>/<term> and
+/courses/<courseCode>/<year>/<term>/<version>.
+
+Entries are evicted least recently used first once COURSE_CACHE_SIZE entries are held, and
+expire COURSE_CACHE_TTL seconds after they were stored. Every response lists the year/terms
+of all offerings of its course code, so any write to a course or its archive drops every
+entry of that course code, and only those. The course codes written by other server
+processes, e.g. scraped by a scraper process or loaded by catalog.py, are read from
+tblModelChange at most every COURSE_CACHE_SYNC_INTERVAL seconds, see model_changes.py.
+'''
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+try:
+    from models import Course, CourseArchive
+except ImportError:
+    from .models import Course, CourseArchive
+try:
+    from model_changes import share_writes, pull_model_changes
+except ImportError:
+    from .model_changes import share_writes, pull_model_changes
+
+course_cache = {
+    "entries": OrderedDict(),  # key -> (expiry time, response data)
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "expirations": 0,
+    "invalidations": 0,
+    "syncedAt": None,  # when the writes of other processes were last read
+}
+course_cache_lock = threading.Lock()
+
+
+def get_course_cache_key(course_code, *args):
+    '''
+    Builds the cache key of a course detail response. Course codes are matched case
+    insensitively by the database, so they are upper-cased here too.
+
+    Parameters:
+    - course_code (str): The course code in the request.
+    - args: The rest of the request, e.g. the year, term and version.
+
+    Returns:
+    tuple: The cache key.
+    '''
+    return (str(course_code).upper(),) + tuple(str(arg) for arg in args)
+
+
+def get_cached_course(key):
+    '''
+    Looks up a course detail response.
+
+    Parameters:
+    - key (tuple): A key built with get_course_cache_key.
+
+    Returns:
+    dict or None: The cached response data, or None on a miss.
+    '''
+    sync_course_cache()
+    with course_cache_lock:
+        entry = course_cache["entries"].get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del course_cache["entries"][key]
+            course_cache["expirations"] += 1
+            entry = None
+        if entry is None:
+            course_cache["misses"] += 1
+            return None
+        course_cache["entries"].move_to_end(key)
+        course_cache["hits"] += 1
+        return entry[1]
+
+
+def sync_course_cache():
+    '''
+    Drops the cached responses of the course codes other processes wrote, at most every
+    COURSE_CACHE_SYNC_INTERVAL seconds.
+    '''
+    interval = current_app.config["COURSE_CACHE_SYNC_INTERVAL"]
+    with course_cache_lock:
+        now = time.monotonic()
+        synced_at = course_cache["syncedAt"]
+        if synced_at is not None and now - synced_at < interval:
+            return
+        course_cache["syncedAt"] = now
+    pull_model_changes()
+
+
+def cache_course(key, data):
+    '''
+    Stores a course detail response, evicting the least recently used ones if the cache
+    is full.
+
+    Parameters:
+    - key (tuple): A key built with get_course_cache_key.
+    - data (dict): The response data.
+    '''
+    size = current_app.config["COURSE_CACHE_SIZE"]
+    ttl = current_app.config["COURSE_CACHE_TTL"]
+    if size <= 0 or ttl <= 0:
+        return
+    with course_cache_lock:
+        course_cache["entries"][key] = (time.monotonic() + ttl, data)
+        course_cache["entries"].move_to_end(key)
+        while len(course_cache["entries"]) > size:
+            course_cache["entries"].popitem(last=False)
+            course_cache["evictions"] += 1
+
+
+def invalidate_course_code(course_code):
+    '''
+    Drops every cached response of a course code.
+
+    Parameters:
+    - course_code (str): The course code that was written.
+    '''
+    if course_code is None:
+        return
+    course_code = str(course_code).upper()
+    with course_cache_lock:
+        keys = [key for key in course_cache["entries"] if key[0] == course_code]
+        for key in keys:
+            del course_cache["entries"][key]
+        course_cache["invalidations"] += len(keys)
+
+
+def clear_course_cache():
+    '''
+    Drops every cached response.
+    '''
+    with course_cache_lock:
+        course_cache["invalidations"] += len(course_cache["entries"])
+        course_cache["entries"].clear()
+
+
+def get_course_cache_stats():
+    '''
+    Reports the cache counters.
+
+    Returns:
+    dict: The number of entries held, the capacity and TTL, and the hit, miss, eviction,
+    expiration and invalidation counts since the server started.
+    '''
+    with course_cache_lock:
+        lookups = course_cache["hits"] + course_cache["misses"]
+        return {
+            "entries": len(course_cache["entries"]),
+            "size": current_app.config["COURSE_CACHE_SIZE"],
+            "ttl": current_app.config["COURSE_CACHE_TTL"],
+            "hits": course_cache["hits"],
+            "misses": course_cache["misses"],
+            "hitRate": round(course_cache["hits"] / lookups, 4) if lookups else None,
+            "evictions": course_cache["evictions"],
+            "expirations": course_cache["expirations"],
+            "invalidations": course_cache["invalidations"],
+        }
+
+
+def invalidate_flushed_course_code(target, course_code):
+    '''
+    Drops the cached responses of a course code written in a flush, and remembers the code
+    so it is dropped again once the transaction commits, in case another request cached
+    the old rows in between.
+    '''
+    invalidate_course_code(course_code)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("written_course_codes", set()).add(course_code)
+
+
+@event.listens_for(Course, "after_insert")
+@event.listens_for(Course, "after_delete")
+@event.listens_for(CourseArchive, "after_insert")
+@event.listens_for(CourseArchive, "after_update")
+@event.listens_for(CourseArchive, "after_delete")
+def invalidate_written_course(mapper, connection, target):
+    '''
+    Drops the cached responses of a course whose offerings or archive changed.
+    '''
+    invalidate_flushed_course_code(target, target.courseCode)
+
+
+@event.listens_for(Course, "after_update")
+def invalidate_edited_course(mapper, connection, target):
+    '''
+    Drops the cached responses of an edited course, and of its old code if that changed.
+    '''
+    invalidate_flushed_course_code(target, target.courseCode)
+    for course_code in inspect(target).attrs.courseCode.history.deleted:
+        invalidate_flushed_course_code(target, course_code)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_courses(session):
+    '''
+    Drops the cached responses of the course codes written by a committed transaction.
+    '''
+    if session.info.pop("course_cache_stale", False):
+        clear_course_cache()
+    for course_code in session.info.pop("written_course_codes", ()):
+        invalidate_course_code(course_code)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_courses(session):
+    '''
+    Forgets the course codes written by a rolled back transaction.
+    '''
+    session.info.pop("course_cache_stale", None)
+    session.info.pop("written_course_codes", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_course_cache_on_bulk_write(orm_execute_state):
+    '''
+    Query.delete() and Query.update() skip the per-row events above. A bulk write that names
+    the course codes it touches through the "course_codes" execution option only drops
+    those, any other bulk write to tblCourse or tblCourseArchive clears the cache.
+    '''
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    if not any(
+        mapper.class_ in (Course, CourseArchive)
+        for mapper in orm_execute_state.all_mappers
+    ):
+        return
+    session = orm_execute_state.session
+    course_codes = orm_execute_state.execution_options.get("course_codes")
+    if course_codes is None:
+        clear_course_cache()
+        session.info["course_cache_stale"] = True
+        return
+    for course_code in course_codes:
+        invalidate_course_code(course_code)
+    session.info.setdefault("written_course_codes", set()).update(course_codes)
+
+
+def get_pending_course_codes(session):
+    '''
+    Lists the course codes a transaction about to commit wrote, for the other processes.
+    '''
+    if session.info.get("course_cache_stale"):
+        return None
+    return {
+        course_code
+        for course_code in session.info.get("written_course_codes", ())
+        if course_code is not None
+    }
+
+
+def apply_course_changes(course_codes):
+    '''
+    Drops the cached responses of the course codes another process wrote, or every
+    response if None.
+    '''
+    if course_codes is None:
+        clear_course_cache()
+        return
+    for course_code in course_codes:
+        invalidate_course_code(course_code)
+
+
+share_writes("courseCache", get_pending_course_codes, apply_course_changes)
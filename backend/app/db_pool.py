@@ -0,0 +1,149 @@
+'''
+This file configures the connection pool of the MySQL engine and records how it is used.
+
+Every server process keeps at most DB_POOL_SIZE idle connections, and opens up to
+DB_MAX_OVERFLOW more under load. A request that finds the pool exhausted waits up to
+DB_POOL_TIMEOUT seconds for a connection instead of opening another one. Connections are
+pinged before they are handed out and replaced after DB_POOL_RECYCLE seconds, so a
+connection MySQL dropped (wait_timeout, a restart) is replaced instead of failing with
+"MySQL server has gone away". The pool counts every checkout, how long it waited and every
+connection it had to replace; GET /admin/database-pool reports them with the pool's state.
+'''
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# URI scheme and connection arguments of each supported MySQL driver. mysqlconnector is
+# installed with requirements.txt and uses its C extension when it is built. mysqldb is
+# mysqlclient, a C driver installed separately with "pip3 install mysqlclient".
+DB_DRIVERS = {
+    "mysqlconnector": ("mysql+mysqlconnector", {"use_pure": False}),
+    "mysqldb": ("mysql+mysqldb", {}),
+}
+
+pool_stats = {
+    "checkouts": 0,  # connections handed out
+    "waitSeconds": 0.0,  # total time spent waiting for a connection
+    "maxWaitSeconds": 0.0,  # longest wait for a connection
+    "timeouts": 0,  # checkouts that gave up after DB_POOL_TIMEOUT seconds
+    "invalidated": 0,  # connections found dead (e.g. by the ping) and replaced
+}
+pool_stats_lock = threading.Lock()
+
+
+class MeteredQueuePool(QueuePool):
+    '''
+    A QueuePool that records how long every checkout waits for a connection.
+    '''
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with pool_stats_lock:
+                pool_stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - started
+        with pool_stats_lock:
+            pool_stats["checkouts"] += 1
+            pool_stats["waitSeconds"] += waited
+            pool_stats["maxWaitSeconds"] = max(pool_stats["maxWaitSeconds"], waited)
+        return connection
+
+
+@event.listens_for(MeteredQueuePool, "invalidate")
+def count_invalidated_connection(dbapi_connection, connection_record, exception):
+    '''
+    Counts a pooled connection that was found dead and discarded.
+    '''
+    with pool_stats_lock:
+        pool_stats["invalidated"] += 1
+
+
+def get_driver_uri(driver, credentials):
+    '''
+    Builds the SQLAlchemy URI of the database for a driver.
+
+    Parameters:
+    - driver (str): A key of DB_DRIVERS.
+    - credentials (str): The part of the URI after "://", e.g.
+    "root:password@localhost:3306/uni".
+
+    Returns:
+    str: The URI.
+    '''
+    if driver not in DB_DRIVERS:
+        raise ValueError(f"Unknown database driver '{driver}'.")
+    return f"{DB_DRIVERS[driver][0]}://{credentials}"
+
+
+def get_engine_options(
+    database_uri, pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping
+):
+    '''
+    Builds the SQLALCHEMY_ENGINE_OPTIONS of a server process.
+
+    Parameters:
+    - database_uri (str): The SQLAlchemy URI of the database, whose driver gets the
+    connection arguments of DB_DRIVERS.
+    - pool_size (int): Connections kept open.
+    - max_overflow (int): Connections opened on top of pool_size under load.
+    - pool_timeout (int): Seconds a checkout waits for a connection before failing.
+    - pool_recycle (int): Seconds after which a connection is replaced, below MySQL's
+    wait_timeout.
+    - pool_pre_ping (bool): Whether to ping a connection before handing it out.
+
+    Returns:
+    dict: The engine options.
+    '''
+    scheme = database_uri.split("://", 1)[0]
+    connect_args = {}
+    for driver_scheme, driver_connect_args in DB_DRIVERS.values():
+        if scheme == driver_scheme:
+            connect_args = dict(driver_connect_args)
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+def get_pool_stats(engine):
+    '''
+    Reports the state of an engine's connection pool and the counters of this process.
+
+    Parameters:
+    - engine (Engine): The database engine.
+
+    Returns:
+    dict: The pool's size, the connections idle in it, checked out and opened on top of
+    its size, and the checkout, wait, timeout and invalidation counters.
+    '''
+    pool = engine.pool
+    stats = {"driver": engine.dialect.driver}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "idle": pool.checkedin(),
+                "checkedOut": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    with pool_stats_lock:
+        stats.update(pool_stats)
+    stats["waitSeconds"] = round(stats["waitSeconds"], 3)
+    stats["maxWaitSeconds"] = round(stats["maxWaitSeconds"], 3)
+    stats["averageWaitSeconds"] = (
+        round(stats["waitSeconds"] / stats["checkouts"], 4) if stats["checkouts"] else 0.0
+    )
+    return stats
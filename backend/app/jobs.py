@@ -0,0 +1,503 @@
+'''
+This file contains the background job queue used to scrape course outlines, and the APIs
+used to follow the progress of a job.
+
+Jobs are stored in tblScrapeJob so they survive a restart. A fixed pool of
+SCRAPE_JOB_WORKERS worker threads claims queued jobs oldest first and runs the task
+registered for the job's type (process_course_update_url or process_course_update_pdf).
+Resubmitting a payload the same user already has queued or running returns the existing
+job, and submissions are refused once the queue is full, so a burst of uploads cannot
+start more Chrome and spaCy work than the workers can handle.
+
+Several server processes can run workers against the same database. A worker records its
+process (WORKER_ID) in claimedBy when it claims a job, and the process renews the
+heartbeatAt of its running jobs every few seconds. A running job whose heartbeat is older
+than SCRAPE_JOB_LEASE seconds was left behind by a process that stopped, and is put back in
+the queue; the jobs of live processes are never touched. An expired job that has already
+been attempted SCRAPE_JOB_MAX_ATTEMPTS times is marked failed instead, so a job that takes
+its process down with it is not retried forever.
+'''
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, or_, select, update
+
+try:
+    from models import db, User, ScrapeJob
+except ImportError:
+    from .models import db, User, ScrapeJob
+
+jobs = Blueprint("jobs", __name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Seconds an idle worker waits before checking the queue again
+POLL_INTERVAL = int(os.environ.get("SCRAPE_JOB_POLL_INTERVAL", 5))
+# Seconds a client is asked to wait before retrying a refused submission
+RETRY_AFTER = 60
+# Leases renewed per SCRAPE_JOB_LEASE, so a few missed renewals do not expire a lease
+HEARTBEATS_PER_LEASE = 4
+
+# Owner recorded on the jobs claimed by this process
+WORKER_ID = f"{socket.gethostname()[:64]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+job_tasks = {}
+job_workers = []
+job_workers_lock = threading.Lock()
+job_available = threading.Event()
+
+
+def register_job_task(job_type, task):
+    '''
+    Registers the function that runs jobs of a type.
+
+    Parameters:
+    - job_type (str): The job type, e.g. "url".
+    - task (callable): Called as task(app, user, payload, report_progress) inside an app
+    context, where report_progress takes a percentage.
+    '''
+    job_tasks[job_type] = task
+
+
+def get_payload_hash(job_type, payload):
+    '''
+    Hashes a job's type and payload to detect duplicate submissions.
+
+    Returns:
+    str: The hex SHA-256 digest.
+    '''
+    serialized = json.dumps([job_type, payload], sort_keys=True)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def get_job_info(job):
+    '''
+    Returns the public fields of a job.
+
+    Parameters:
+    - job (ScrapeJob): The job.
+
+    Returns:
+    dict: The job's ID, type, status, progress, attempts, error and timestamps.
+    '''
+    return {
+        "jobID": job.ID,
+        "jobType": job.jobType,
+        "status": job.status,
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "error": job.error,
+        "createdAt": job.createdAt.isoformat() if job.createdAt else None,
+        "startedAt": job.startedAt.isoformat() if job.startedAt else None,
+        "finishedAt": job.finishedAt.isoformat() if job.finishedAt else None,
+    }
+
+
+def enqueue_job(job_type, payload, zID, message):
+    '''
+    Queues a job for the worker pool, unless the user already has the same job queued or
+    running or the queue is full.
+
+    Parameters:
+    - job_type (str): A type registered with register_job_task.
+    - payload: The JSON serializable input of the task.
+    - zID (int): The user submitting the job.
+    - message (str): The message returned to the client on success.
+
+    Returns:
+    tuple: The JSON response and status code.
+
+    Response Codes:
+    - 200 OK: The job was queued, or an identical job is already queued or running.
+    - 429 Too Many Requests: The user has SCRAPE_JOB_USER_LIMIT jobs in progress.
+    - 503 Service Unavailable: SCRAPE_JOB_QUEUE_LIMIT jobs are already waiting.
+    '''
+    payloadHash = get_payload_hash(job_type, payload)
+    existing_job = db.session.execute(
+        select(ScrapeJob)
+        .where(
+            ScrapeJob.user == zID,
+            ScrapeJob.payloadHash == payloadHash,
+            ScrapeJob.status.in_(ACTIVE_STATUSES),
+        )
+        .limit(1)
+    ).scalar()
+    if existing_job:
+        response = {"message": message, "duplicate": True}
+        response.update(get_job_info(existing_job))
+        return jsonify(response), 200
+
+    user_jobs = db.session.execute(
+        select(func.count(ScrapeJob.ID)).where(
+            ScrapeJob.user == zID, ScrapeJob.status.in_(ACTIVE_STATUSES)
+        )
+    ).scalar()
+    if user_jobs >= current_app.config["SCRAPE_JOB_USER_LIMIT"]:
+        response = jsonify(
+            {"error": "Too many course updates in progress, try again later."}
+        )
+        response.headers["Retry-After"] = str(RETRY_AFTER)
+        return response, 429
+
+    queued_jobs = db.session.execute(
+        select(func.count(ScrapeJob.ID)).where(ScrapeJob.status == "queued")
+    ).scalar()
+    if queued_jobs >= current_app.config["SCRAPE_JOB_QUEUE_LIMIT"]:
+        response = jsonify({"error": "Course update queue is full, try again later."})
+        response.headers["Retry-After"] = str(RETRY_AFTER)
+        return response, 503
+
+    new_job = ScrapeJob(
+        jobType=job_type,
+        payload=json.dumps(payload),
+        payloadHash=payloadHash,
+        user=zID,
+        status="queued",
+        progress=0,
+        attempts=0,
+        createdAt=datetime.now(),
+    )
+    db.session.add(new_job)
+    db.session.commit()
+    job_available.set()
+
+    response = {"message": message, "duplicate": False}
+    response.update(get_job_info(new_job))
+    return jsonify(response), 200
+
+
+def set_job_fields(jobID, **fields):
+    '''
+    Updates a job claimed by this process outside of the caller's session, so job state is
+    committed even when the task's own transaction is rolled back. Once the job's lease has
+    expired and it was requeued, it belongs to no one or another process and is left alone.
+
+    Returns:
+    bool: Whether the job was updated.
+    '''
+    with db.engine.begin() as connection:
+        return bool(
+            connection.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.ID == jobID, ScrapeJob.claimedBy == WORKER_ID)
+                .values(**fields)
+            ).rowcount
+        )
+
+
+def claim_next_job():
+    '''
+    Marks the oldest queued job as running, claimed by this process.
+
+    Returns:
+    int or None: The ID of the claimed job, or None if the queue is empty.
+    '''
+    while True:
+        # A fresh transaction per attempt, so a job claimed by another worker is not seen
+        # again
+        with db.engine.begin() as connection:
+            jobID = connection.execute(
+                select(ScrapeJob.ID)
+                .where(ScrapeJob.status == "queued")
+                .order_by(ScrapeJob.ID)
+                .limit(1)
+            ).scalar()
+            if jobID is None:
+                return None
+            # Only one worker can move the job out of "queued"
+            claimed = connection.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.ID == jobID, ScrapeJob.status == "queued")
+                .values(
+                    status="running",
+                    progress=0,
+                    attempts=ScrapeJob.attempts + 1,
+                    startedAt=datetime.now(),
+                    claimedBy=WORKER_ID,
+                    heartbeatAt=datetime.now(),
+                )
+            ).rowcount
+        if claimed:
+            return jobID
+
+
+def renew_job_leases():
+    '''
+    Extends the lease of every job this process is running.
+    '''
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.claimedBy == WORKER_ID, ScrapeJob.status == "running")
+            .values(heartbeatAt=datetime.now())
+        )
+
+
+def requeue_expired_jobs(lease, max_attempts):
+    '''
+    Puts back in the queue the running jobs whose lease has expired, i.e. whose process
+    stopped while running them. A job that has already been attempted max_attempts times
+    is marked failed instead, so a job that takes its process down with it is not retried
+    forever.
+
+    Parameters:
+    - lease (int): Seconds after its last heartbeat that a job's lease expires.
+    - max_attempts (int): SCRAPE_JOB_MAX_ATTEMPTS.
+
+    Returns:
+    list: The IDs of the requeued jobs.
+    '''
+    expired = or_(
+        ScrapeJob.heartbeatAt.is_(None),
+        ScrapeJob.heartbeatAt < datetime.now() - timedelta(seconds=lease),
+    )
+    with db.engine.begin() as connection:
+        jobs = connection.execute(
+            select(ScrapeJob.ID, ScrapeJob.attempts).where(
+                ScrapeJob.status == "running", expired
+            )
+        ).all()
+        jobIDs = [job.ID for job in jobs if (job.attempts or 0) < max_attempts]
+        failedIDs = [job.ID for job in jobs if (job.attempts or 0) >= max_attempts]
+        # Checked again, so a lease renewed in the meantime is kept
+        if jobIDs:
+            connection.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.ID.in_(jobIDs), ScrapeJob.status == "running", expired)
+                .values(status="queued", claimedBy=None)
+            )
+        if failedIDs:
+            connection.execute(
+                update(ScrapeJob)
+                .where(
+                    ScrapeJob.ID.in_(failedIDs), ScrapeJob.status == "running", expired
+                )
+                .values(
+                    status="failed",
+                    claimedBy=None,
+                    error="The worker running the job was lost.",
+                    finishedAt=datetime.now(),
+                )
+            )
+    if jobIDs:
+        job_available.set()
+    return jobIDs
+
+
+@contextmanager
+def job_session(app):
+    '''
+    Gives a block of a job its own app context, and so its own scoped db.session, closed
+    when the block ends so its connection goes back to the pool even if the block fails.
+
+    Parameters:
+    - app (Flask app): The Flask application.
+    '''
+    with app.app_context():
+        try:
+            yield db.session
+        finally:
+            db.session.remove()
+
+
+def run_job(app, jobID):
+    '''
+    Runs a claimed job, requeueing it after a failure until it has been attempted
+    SCRAPE_JOB_MAX_ATTEMPTS times.
+
+    The job is read in one session and the task runs in another, so no connection or open
+    transaction is held while a page is scraped, and no session is shared between workers.
+
+    Parameters:
+    - app (Flask app): The Flask application.
+    - jobID (int): The ID of a job claimed with claim_next_job.
+    '''
+    with app.app_context():
+        with job_session(app) as session:
+            job = session.get(ScrapeJob, jobID)
+            jobType = job.jobType
+            payload = json.loads(job.payload)
+            attempts = job.attempts
+            userID = job.user
+            user = session.get(User, userID)
+            if user:
+                session.expunge(user)
+
+        try:
+            task = job_tasks[jobType]
+            if not user:
+                raise LookupError(f"User {userID} no longer exists.")
+
+            def report_progress(progress):
+                set_job_fields(jobID, progress=progress, heartbeatAt=datetime.now())
+
+            with job_session(app):
+                task(app, user, payload, report_progress)
+        except Exception as e:
+            app.logger.exception("Scrape job %s failed", jobID)
+            if attempts < app.config["SCRAPE_JOB_MAX_ATTEMPTS"]:
+                finished = set_job_fields(
+                    jobID, status="queued", error=str(e), claimedBy=None
+                )
+            else:
+                finished = set_job_fields(
+                    jobID, status="failed", error=str(e), finishedAt=datetime.now()
+                )
+        else:
+            finished = set_job_fields(
+                jobID,
+                status="done",
+                progress=100,
+                error=None,
+                finishedAt=datetime.now(),
+            )
+        if not finished:
+            app.logger.warning(
+                "Scrape job %s was requeued after its lease expired", jobID
+            )
+
+
+def run_job_worker(app):
+    '''
+    Runs queued jobs one at a time, forever.
+
+    Parameters:
+    - app (Flask app): The Flask application.
+    '''
+    while True:
+        try:
+            with app.app_context():
+                jobID = claim_next_job()
+        except Exception:
+            app.logger.exception("Could not read the scrape job queue")
+            jobID = None
+
+        if jobID is None:
+            job_available.wait(POLL_INTERVAL)
+            job_available.clear()
+            continue
+        run_job(app, jobID)
+
+
+def run_lease_keeper(app):
+    '''
+    Renews the leases of the jobs this process is running and requeues the jobs whose lease
+    has expired, forever.
+
+    Parameters:
+    - app (Flask app): The Flask application.
+    '''
+    lease = app.config["SCRAPE_JOB_LEASE"]
+    max_attempts = app.config["SCRAPE_JOB_MAX_ATTEMPTS"]
+    while True:
+        try:
+            with app.app_context():
+                renew_job_leases()
+                requeue_expired_jobs(lease, max_attempts)
+        except Exception:
+            app.logger.exception("Could not renew the scrape job leases")
+        time.sleep(max(lease / HEARTBEATS_PER_LEASE, 1))
+
+
+def start_job_workers(app):
+    '''
+    Starts the worker pool, and the thread keeping the leases of its jobs, which first
+    requeues the jobs left behind by processes that stopped. Any number of server processes
+    can run workers, as the jobs other processes are running keep their lease.
+
+    Parameters:
+    - app (Flask app): The Flask application.
+    '''
+    with job_workers_lock:
+        if job_workers:
+            return
+        lease_keeper = threading.Thread(
+            target=run_lease_keeper, args=(app,), daemon=True
+        )
+        lease_keeper.start()
+        job_workers.append(lease_keeper)
+
+        for _ in range(app.config["SCRAPE_JOB_WORKERS"]):
+            worker = threading.Thread(target=run_job_worker, args=(app,), daemon=True)
+            worker.start()
+            job_workers.append(worker)
+
+
+@jobs.route("/jobs", methods=["GET"])
+@jwt_required()
+def get_user_jobs():
+    """
+    Retrieve the 20 most recent course scraping jobs of the current user.
+
+    Returns:
+    - JSON response with the jobs, newest first.
+
+    Response Codes:
+    - 200 OK: Successful retrieval of the jobs.
+    - 401 Unauthorized: Invalid token.
+
+    Response JSON:
+    {
+      "jobs": [
+        {
+          "jobID": 12,
+          "jobType": "url",
+          "status": "running",
+          "progress": 10,
+          "attempts": 1,
+          "error": null,
+          "createdAt": "2024-02-19T10:01:02",
+          "startedAt": "2024-02-19T10:01:03",
+          "finishedAt": null
+        }
+      ]
+    }
+    """
+    user = User.query.filter_by(zID=get_jwt_identity()).first()
+    if not user:
+        return jsonify({"error": "Invalid token."}), 401
+
+    user_jobs = db.session.execute(
+        select(ScrapeJob)
+        .where(ScrapeJob.user == user.zID)
+        .order_by(ScrapeJob.ID.desc())
+        .limit(20)
+    ).scalars()
+    return jsonify({"jobs": [get_job_info(job) for job in user_jobs]}), 200
+
+
+@jobs.route("/jobs/<int:jobID>", methods=["GET"])
+@jwt_required()
+def get_job(jobID):
+    """
+    Retrieve the status and progress of one of the current user's course scraping jobs.
+
+    Args:
+    - jobID (int): The ID returned when the job was submitted.
+
+    Returns:
+    - JSON response with the job, in the format of the entries of GET /jobs.
+
+    Response Codes:
+    - 200 OK: Successful retrieval of the job.
+    - 401 Unauthorized: Invalid token.
+    - 404 Not Found: The job does not exist or belongs to another user.
+    """
+    user = User.query.filter_by(zID=get_jwt_identity()).first()
+    if not user:
+        return jsonify({"error": "Invalid token."}), 401
+
+    job = db.session.get(ScrapeJob, jobID)
+    if not job or job.user != user.zID:
+        return jsonify({"error": "Job not found."}), 404
+    return jsonify(get_job_info(job)), 200
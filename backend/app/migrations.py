@@ -0,0 +1,301 @@
+'''
+This file upgrades a database with the versioned scripts in database/migrations, and checks
+that the hot lookup queries are answered from an index.
+
+Every script is named NNN_description.sql and runs once, in version order. The versions
+applied so far are recorded in tblSchemaVersion. Databases built from
+database/schema/buildDatabaseTables.sql or database/populate_schema/populated_DB.sql start
+at the latest version. Run "python3 migrations.py" in backend/app to upgrade a database by
+hand, or set DB_AUTO_MIGRATE=1 to upgrade it whenever the server starts.
+
+Tables derived from JSON columns are filled in by backfill_derived_rows rather than by the
+scripts, because the rows are decoded in Python. The server runs it on its own connection
+when it starts, after the migrations, so requests never write them.
+'''
+
+import argparse
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+try:
+    from profile_vectors import backfill_profile_vectors
+except ImportError:
+    from .profile_vectors import backfill_profile_vectors
+try:
+    from term_weights import backfill_term_weights
+except ImportError:
+    from .term_weights import backfill_term_weights
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "database", "migrations"
+)
+
+migration_name_pattern = re.compile(r"^(\d+)_(\w+)\.sql$")
+use_statement_pattern = re.compile(r"^USE\s", re.IGNORECASE)
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS tblSchemaVersion(
+  version INT,
+  name VARCHAR(255),
+  appliedAt DATETIME,
+  PRIMARY KEY (version)
+)
+"""
+
+# Lookups run by nearly every request. Each must be answered from an index, see
+# find_full_scans.
+HOT_QUERIES = {
+    "user by email": (
+        "SELECT * FROM tblUser WHERE email = 'z0000000@ad.unsw.edu.au' AND verified = 1"
+    ),
+    "course offering": (
+        "SELECT * FROM tblCourse "
+        "WHERE courseCode = 'COMP0000' AND yearDate = 2023 AND term = 'T1'"
+    ),
+    "user enrolments": (
+        "SELECT * FROM tblCourseEnrolment WHERE user = 0 AND courseRole = 'student'"
+    ),
+    "course archive": "SELECT * FROM tblCourseArchive WHERE courseID = 0",
+    "group membership": (
+        "SELECT * FROM tblGroupMember WHERE groupID = 0 AND student = 0"
+    ),
+    "projects by creator": "SELECT * FROM tblProject WHERE creatorZId = 0",
+}
+
+# Named lock the server processes sharing a MySQL database take turns on to backfill, and
+# seconds a process waits for it
+BACKFILL_LOCK = "uni_backfill_derived_rows"
+BACKFILL_LOCK_TIMEOUT = 60
+
+# EXPLAIN access types that read a whole table or a whole index
+FULL_SCAN_TYPES = ("ALL", "index")
+
+
+def get_migrations(directory=MIGRATIONS_DIR):
+    '''
+    Lists the migration scripts.
+
+    Parameters:
+    - directory (str): The folder holding the scripts.
+
+    Returns:
+    list: A (version, name, path) tuple per script, in version order.
+    '''
+    migrations = []
+    for filename in os.listdir(directory):
+        match = migration_name_pattern.match(filename)
+        if match:
+            migrations.append(
+                (
+                    int(match.group(1)),
+                    match.group(2),
+                    os.path.join(directory, filename),
+                )
+            )
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    '''
+    Splits a migration script into statements, leaving out comments and USE statements so
+    the script runs against the database the server is configured with.
+
+    Parameters:
+    - sql (str): The script.
+
+    Returns:
+    list: The statements, without their terminating semicolons.
+    '''
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    statements = []
+    for statement in "\n".join(lines).split(";"):
+        statement = statement.strip()
+        if statement and not use_statement_pattern.match(statement):
+            statements.append(statement)
+    return statements
+
+
+def get_applied_versions(connection):
+    '''
+    Reads the migration versions applied to a database, creating tblSchemaVersion if it is
+    missing.
+
+    Parameters:
+    - connection (Connection): A connection to the database.
+
+    Returns:
+    set: The applied versions.
+    '''
+    connection.execute(text(SCHEMA_VERSION_TABLE))
+    return set(
+        connection.execute(text("SELECT version FROM tblSchemaVersion")).scalars()
+    )
+
+
+def get_pending_migrations(engine, directory=MIGRATIONS_DIR):
+    '''
+    Lists the migration scripts not applied to a database yet.
+
+    Parameters:
+    - engine (Engine): The database engine.
+    - directory (str): The folder holding the scripts.
+
+    Returns:
+    list: A (version, name, path) tuple per pending script, in version order.
+    '''
+    with engine.begin() as connection:
+        applied = get_applied_versions(connection)
+    return [
+        migration
+        for migration in get_migrations(directory)
+        if migration[0] not in applied
+    ]
+
+
+def apply_migrations(engine, directory=MIGRATIONS_DIR):
+    '''
+    Applies every pending migration script, recording each version once its script has
+    run. MySQL commits DDL statements as they run, so a script that fails part way has to
+    be fixed up by hand before it is retried.
+
+    Parameters:
+    - engine (Engine): The database engine.
+    - directory (str): The folder holding the scripts.
+
+    Returns:
+    list: The (version, name) of every script applied.
+    '''
+    applied = []
+    for version, name, path in get_pending_migrations(engine, directory):
+        with open(path, encoding="utf-8") as script:
+            statements = split_statements(script.read())
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.execute(
+                text(
+                    "INSERT INTO tblSchemaVersion(version, name, appliedAt) "
+                    "VALUES (:version, :name, :appliedAt)"
+                ),
+                {"version": version, "name": name, "appliedAt": datetime.now()},
+            )
+        applied.append((version, name))
+    return applied
+
+
+def backfill_derived_rows(engine):
+    '''
+    Fills in the rows derived from JSON columns that are missing, e.g. straight after the
+    migration that created their tables or on a database loaded from populated_DB.sql. The
+    rows are written in one transaction of their own, and only one process at a time
+    backfills a MySQL database, so two servers starting together never write the same rows.
+
+    Parameters:
+    - engine (Engine): The database engine.
+
+    Returns:
+    dict: The number of users, courses and projects backfilled.
+    '''
+    named_lock = engine.dialect.name == "mysql"
+    with engine.connect() as connection:
+        if named_lock:
+            locked = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": BACKFILL_LOCK, "timeout": BACKFILL_LOCK_TIMEOUT},
+            ).scalar()
+            connection.commit()
+            if locked != 1:
+                raise RuntimeError("Another server is still backfilling the database.")
+        try:
+            with connection.begin():
+                courses, projects = backfill_term_weights(connection)
+                return {
+                    "users": backfill_profile_vectors(connection),
+                    "courses": courses,
+                    "projects": projects,
+                }
+        finally:
+            if named_lock:
+                connection.execute(
+                    text("SELECT RELEASE_LOCK(:name)"), {"name": BACKFILL_LOCK}
+                )
+                connection.commit()
+
+
+def find_full_scans(connection, queries=HOT_QUERIES):
+    '''
+    Runs EXPLAIN on the hot lookup queries and reports those that read a whole table or
+    index instead of looking rows up.
+
+    Parameters:
+    - connection (Connection): A connection to the database.
+    - queries (dict): Maps a description of each query to its SQL.
+
+    Returns:
+    list: A dict per offending table access with the "query", "table" and access "type".
+    '''
+    full_scans = []
+    for description, query in queries.items():
+        for row in connection.execute(text("EXPLAIN " + query)).mappings():
+            if row["type"] in FULL_SCAN_TYPES:
+                full_scans.append(
+                    {"query": description, "table": row["table"], "type": row["type"]}
+                )
+    return full_scans
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Upgrade the database with the scripts in database/migrations."
+    )
+    parser.add_argument(
+        "--database-uri",
+        help="SQLAlchemy URI of the database, defaults to DATABASE_URI or the one the server uses.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the pending scripts without applying them.",
+    )
+    parser.add_argument(
+        "--check-plans",
+        action="store_true",
+        help="Fail if a hot lookup query scans a whole table.",
+    )
+    args = parser.parse_args()
+
+    database_uri = args.database_uri
+    if database_uri is None:
+        try:
+            from __init__ import get_database_uri
+        except ImportError:
+            from .__init__ import get_database_uri
+        database_uri = get_database_uri()
+    engine = create_engine(database_uri)
+
+    if args.dry_run:
+        for version, name, _ in get_pending_migrations(engine):
+            print(f"Pending {version:03d}_{name}")
+    else:
+        for version, name in apply_migrations(engine):
+            print(f"Applied {version:03d}_{name}")
+        for kind, count in backfill_derived_rows(engine).items():
+            print(f"Backfilled {count} {kind}")
+
+    if args.check_plans:
+        with engine.connect() as connection:
+            full_scans = find_full_scans(connection)
+        for full_scan in full_scans:
+            print(
+                f"Full scan of {full_scan['table']} ({full_scan['type']}) "
+                f"in {full_scan['query']}"
+            )
+        if full_scans:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+'''
+This file shares the writes to the recommendation models between server processes.
+
+Every server process keeps its own copy of the course, student and project recommendation
+models, and flags the keys its own transactions write once they commit (see
+ModelState.track_writes). The writes of other processes, e.g. the courses a scraper process
+scraped or a profile edited through an api process, would never reach the models of a
+recommender process that way. So every transaction writing a shared model also records the
+keys it wrote in tblModelChange, and a process flags the keys recorded since it last looked
+before it refreshes the model.
+
+A process reads the rows after the highest ID it has seen. IDs are taken when the rows are
+inserted but become visible when their transaction commits, so a row can appear after a
+row with a higher ID: the IDs skipped by a read are read again until they appear, or for
+MODEL_CHANGE_LAG seconds, after which their transaction must have rolled back.
+
+Rows older than MODEL_CHANGE_RETENTION seconds are deleted. A process that has not looked
+for half that long may have missed some, and rebuilds every model instead. The course
+detail cache shares the course codes it drops the same way, see course_cache.py, and writes
+made without the ORM, e.g. by catalog.py, are recorded with record_changes.
+'''
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, func, or_, select
+from sqlalchemy.orm import Session
+
+try:
+    from models import db, ModelChange
+except ImportError:
+    from .models import db, ModelChange
+
+# Seconds a skipped ID is read again before its transaction is taken to have rolled back
+MODEL_CHANGE_LAG = 60
+# IDs below the highest one read again when a process starts or rebuilds its models, and
+# the most skipped IDs kept, beyond which the models are rebuilt
+MODEL_CHANGE_WINDOW = 1000
+
+# Name -> how to find the keys a session wrote, and how to apply the keys others wrote
+shared_models = {}
+# The highest tblModelChange ID this process has read, the IDs it skipped and when it
+# first skipped them, and when it last looked
+model_changes = {"seen": None, "skipped": {}, "lookedAt": None, "prunedAt": None}
+model_changes_lock = threading.Lock()
+
+
+def share_writes(name, get_pending_writes, apply_changes):
+    '''
+    Records the keys the transactions of this process write in tblModelChange under a name,
+    in the transaction that writes them, and applies the keys every process writes under
+    that name.
+
+    Parameters:
+    - name (str): The name the keys are recorded under, e.g. "course".
+    - get_pending_writes (function): Takes a session about to commit, and returns the keys
+    it wrote, or None if the writes cannot be traced to individual keys.
+    - apply_changes (function): Takes the keys written by a process, as strings, or None to
+    drop everything.
+    '''
+    shared_models[name] = {
+        "getPendingWrites": get_pending_writes,
+        "applyChanges": apply_changes,
+    }
+
+
+def share_model_writes(state, key_type):
+    '''
+    Shares the writes to a recommendation model, see share_writes.
+
+    Parameters:
+    - state (ModelState): The model, whose writes are tracked with track_writes.
+    - key_type (type): The type of the model's keys, e.g. str for course codes.
+    '''
+
+    def apply_changes(item_keys):
+        if item_keys is None:
+            state.invalidate()
+        else:
+            state.mark_dirty(key_type(item_key) for item_key in item_keys)
+
+    share_writes(
+        state.name,
+        lambda session: session.info.get(state.pending_writes_key, ()),
+        apply_changes,
+    )
+
+
+def get_change_rows(name, keys):
+    '''
+    Builds the tblModelChange rows of the keys written under a shared name.
+
+    Parameters:
+    - name (str): The name the keys are recorded under.
+    - keys (iterable or None): The keys written, or None if the writes cannot be traced to
+    individual keys.
+
+    Returns:
+    list: A dict per row.
+    '''
+    changed_at = datetime.now()
+    item_keys = [None] if keys is None else sorted({str(key) for key in keys})
+    return [
+        {"model": name, "itemKey": item_key, "changedAt": changed_at}
+        for item_key in item_keys
+    ]
+
+
+def record_changes(connection, changes):
+    '''
+    Records keys written without the ORM session, in the transaction that writes them.
+
+    Parameters:
+    - connection (Connection): The connection the keys are written with.
+    - changes (dict): The keys written under each shared name, e.g. {"course": ["COMP1511"]}.
+    '''
+    rows = []
+    for name, keys in changes.items():
+        rows.extend(get_change_rows(name, keys))
+    if rows:
+        connection.execute(ModelChange.__table__.insert(), rows)
+
+
+@event.listens_for(Session, "before_commit")
+def record_model_changes(session):
+    '''
+    Records the keys of the shared models written by a transaction about to commit.
+    '''
+    if not shared_models:
+        return
+    # Flush first, so the rows the commit would flush are recorded too
+    session.flush()
+    rows = []
+    for name, shared in shared_models.items():
+        rows.extend(get_change_rows(name, shared["getPendingWrites"](session)))
+    if rows:
+        session.execute(ModelChange.__table__.insert(), rows)
+
+
+def prune_model_changes(retention):
+    '''
+    Deletes the tblModelChange rows older than the retention, at most every half of it.
+
+    Parameters:
+    - retention (int): MODEL_CHANGE_RETENTION, in seconds.
+    '''
+    now = time.monotonic()
+    if (
+        model_changes["prunedAt"] is not None
+        and now - model_changes["prunedAt"] < retention / 2
+    ):
+        return
+    model_changes["prunedAt"] = now
+    with db.engine.begin() as connection:
+        connection.execute(
+            delete(ModelChange).where(
+                ModelChange.changedAt < datetime.now() - timedelta(seconds=retention)
+            )
+        )
+
+
+def pull_model_changes():
+    '''
+    Applies the keys every process wrote to the shared models since the last call. The
+    first call, and a call after the rows since the last one may have been deleted, drop
+    every shared model instead.
+    '''
+    retention = current_app.config["MODEL_CHANGE_RETENTION"]
+    with model_changes_lock:
+        now = time.monotonic()
+        with db.engine.connect() as connection:
+            if (
+                model_changes["seen"] is None
+                or now - model_changes["lookedAt"] > retention / 2
+            ):
+                for shared in shared_models.values():
+                    shared["applyChanges"](None)
+                latest = connection.execute(select(func.max(ModelChange.ID))).scalar()
+                # Read the last rows again, in case rows below them are yet to commit
+                model_changes["seen"] = max((latest or 0) - MODEL_CHANGE_WINDOW, 0)
+                model_changes["skipped"] = {}
+
+            seen = model_changes["seen"]
+            skipped = model_changes["skipped"]
+            rows = connection.execute(
+                select(ModelChange.ID, ModelChange.model, ModelChange.itemKey)
+                .where(
+                    or_(ModelChange.ID > seen, ModelChange.ID.in_(list(skipped)))
+                    if skipped
+                    else ModelChange.ID > seen
+                )
+                .order_by(ModelChange.ID)
+            ).all()
+        model_changes["lookedAt"] = now
+
+        # Model name -> the keys written, or None if the whole model must be dropped
+        item_keys = {}
+        for row in rows:
+            skipped.pop(row.ID, None)
+            if row.itemKey is None:
+                item_keys[row.model] = None
+            elif item_keys.get(row.model, ()) is not None:
+                item_keys.setdefault(row.model, set()).add(row.itemKey)
+
+        latest = max([seen] + [row.ID for row in rows])
+        read = {row.ID for row in rows}
+        skipped.update(
+            (ID, now) for ID in range(seen + 1, latest + 1) if ID not in read
+        )
+        for ID, skipped_at in list(skipped.items()):
+            if now - skipped_at > MODEL_CHANGE_LAG:
+                del skipped[ID]
+        model_changes["seen"] = latest
+
+        if len(skipped) > MODEL_CHANGE_WINDOW:
+            # Too many rows pending to read them one by one, rebuild instead
+            skipped.clear()
+            item_keys = {name: None for name in shared_models}
+        for name, keys in item_keys.items():
+            if name in shared_models:
+                shared_models[name]["applyChanges"](keys)
+
+        prune_model_changes(retention)
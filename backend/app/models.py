@@ -31,6 +31,7 @@ class Major(db.Model):
 # User
 class User(db.Model):
     __tablename__ = "tblUser"
+    __table_args__ = (db.Index("email_verified", "email", "verified"),)
 
     zID = db.Column(db.Integer, primary_key=True)
     firstname = db.Column(db.String(100))
@@ -55,6 +56,80 @@ class UserCode(db.Model):
     user = db.Column(db.Integer, primary_key=True)
 
 
+# Skill and knowledge terms shared by the course, project and user weight tables
+class Term(db.Model):
+    __tablename__ = "tblTerm"
+
+    ID = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.Text(collation="utf8mb4_0900_bin"), nullable=False)
+    # SHA-256 of the term, see term_weights.get_term_hash
+    termHash = db.Column(db.String(64), unique=True, nullable=False)
+
+
+# Roles (metadataJson "class" keys) held by each user
+class UserClass(db.Model):
+    __tablename__ = "tblUserClass"
+    __table_args__ = (db.Index("role_type", "role", "roleType"),)
+
+    user = db.Column(
+        db.Integer, db.ForeignKey("tblUser.zID", ondelete="CASCADE"), primary_key=True
+    )
+    role = db.Column(db.String(25), primary_key=True)
+    # The "type" of the role in metadataJson, e.g. "casual academic"
+    roleType = db.Column(db.String(50))
+
+
+# Skill and knowledge weights of each user role, materialized from metadataJson
+class UserProfileTerm(db.Model):
+    __tablename__ = "tblUserProfileTerm"
+    __table_args__ = (db.Index("user_role", "user", "role"),)
+
+    ID = db.Column(db.Integer, primary_key=True)
+    user = db.Column(db.Integer, db.ForeignKey("tblUser.zID", ondelete="CASCADE"))
+    role = db.Column(db.String(25))
+    termID = db.Column(db.Integer, db.ForeignKey("tblTerm.ID"), index=True)
+    skillWeight = db.Column(db.Double)
+    knowledgeWeight = db.Column(db.Double)
+
+
+# Course scraping jobs submitted through /courses/url and /courses/pdf
+class ScrapeJob(db.Model):
+    __tablename__ = "tblScrapeJob"
+    __table_args__ = (
+        db.Index("status_id", "status", "ID"),
+        db.Index("user_payload", "user", "payloadHash"),
+    )
+
+    ID = db.Column(db.Integer, primary_key=True)
+    jobType = db.Column(db.String(10))
+    payload = db.Column(db.Text(4294967295))
+    payloadHash = db.Column(db.String(64))
+    user = db.Column(db.Integer, db.ForeignKey("tblUser.zID", ondelete="CASCADE"))
+    status = db.Column(db.String(10))
+    progress = db.Column(db.Integer)
+    attempts = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    createdAt = db.Column(db.DateTime)
+    startedAt = db.Column(db.DateTime)
+    finishedAt = db.Column(db.DateTime)
+    claimedBy = db.Column(db.String(100))
+    heartbeatAt = db.Column(db.DateTime)
+
+
+# Keys of the recommendation models written by each transaction, see model_changes.py
+class ModelChange(db.Model):
+    __tablename__ = "tblModelChange"
+    __table_args__ = (
+        db.Index("model_id", "model", "ID"),
+        db.Index("changedAt", "changedAt"),
+    )
+
+    ID = db.Column(db.BigInteger, primary_key=True)
+    model = db.Column(db.String(20))
+    itemKey = db.Column(db.String(255))
+    changedAt = db.Column(db.DateTime)
+
+
 # Course
 class Course(db.Model):
     __tablename__ = "tblCourse"
@@ -91,6 +166,18 @@ class CourseArchive(db.Model):
     school = db.Column(db.String(255), db.ForeignKey("tblSchool.schoolName"))
 
 
+# Skill and knowledge weights of each course, materialized from courseSkills/courseKnowledge
+class CourseTerm(db.Model):
+    __tablename__ = "tblCourseTerm"
+    __table_args__ = (db.UniqueConstraint("course", "termID", name="course_term"),)
+
+    ID = db.Column(db.Integer, primary_key=True)
+    course = db.Column(db.Integer, db.ForeignKey("tblCourse.ID", ondelete="CASCADE"))
+    termID = db.Column(db.Integer, db.ForeignKey("tblTerm.ID"), index=True)
+    skillWeight = db.Column(db.Double)
+    knowledgeWeight = db.Column(db.Double)
+
+
 # Course Role
 class CourseRole(db.Model):
     __tablename__ = "tblCourseRole"
@@ -103,6 +190,7 @@ class CourseRole(db.Model):
 # # Course Enrolment
 class CourseEnrolment(db.Model):
     __tablename__ = "tblCourseEnrolment"
+    __table_args__ = (db.Index("user_role_course", "user", "courseRole", "course"),)
     ID = db.Column(db.Integer, primary_key=True)
     course = db.Column(db.Integer, db.ForeignKey("tblCourse.ID"))
     user = db.Column(db.Integer, db.ForeignKey("tblUser.zID"))
@@ -111,6 +199,7 @@ class CourseEnrolment(db.Model):
 
 class Project(db.Model):
     __tablename__ = "tblProject"
+    __table_args__ = (db.Index("creatorZId", "creatorZId"),)
     ID = db.Column(db.Integer, primary_key=True)
     course = db.Column(db.Integer, db.ForeignKey("tblCourse.ID"))
     projectName = db.Column(db.String(255))
@@ -124,6 +213,22 @@ class Project(db.Model):
     topics = db.Column(db.Text)
     outcomes = db.Column(db.Text)
 
+    # Read-only, so deletes keep going through the explicit cascades in admin.py. Load
+    # with selectinload to fetch a page of projects with their groups in one extra query.
+    groups = db.relationship("Group", order_by="Group.ID", viewonly=True)
+
+
+# Skill and knowledge weights of each project, materialized from skills/knowledge
+class ProjectTerm(db.Model):
+    __tablename__ = "tblProjectTerm"
+    __table_args__ = (db.UniqueConstraint("project", "termID", name="project_term"),)
+
+    ID = db.Column(db.Integer, primary_key=True)
+    project = db.Column(db.Integer, db.ForeignKey("tblProject.ID", ondelete="CASCADE"))
+    termID = db.Column(db.Integer, db.ForeignKey("tblTerm.ID"), index=True)
+    skillWeight = db.Column(db.Double)
+    knowledgeWeight = db.Column(db.Double)
+
 
 # Group
 class Group(db.Model):
@@ -133,10 +238,13 @@ class Group(db.Model):
     groupName = db.Column(db.String(255))
     project = db.Column(db.Integer, db.ForeignKey("tblProject.ID"))
 
+    members = db.relationship("GroupMember", order_by="GroupMember.ID", viewonly=True)
+
 
 # Group Member
 class GroupMember(db.Model):
     __tablename__ = "tblGroupMember"
+    __table_args__ = (db.UniqueConstraint("groupID", "student", name="group_student"),)
 
     ID = db.Column(db.Integer, primary_key=True)
     groupID = db.Column(db.Integer, db.ForeignKey("tblGroup.ID"))
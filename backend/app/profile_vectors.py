@@ -0,0 +1,236 @@
+'''
+This file keeps the materialized user profile vectors in sync with metadataJson and
+contains the functions used to read them.
+
+tblUserClass holds the roles ("class" keys) each user has, with the "type" of the role where
+it has one, and tblUserProfileTerm holds the skill and knowledge weights of every role
+against the tblTerm dictionary. Both are rewritten whenever a user's metadataJson is written
+through the ORM, which covers registration, role changes, profile edits and course
+enrolments, so read paths never have to decode metadataJson. Users written before the
+tables existed, or loaded from populated_DB.sql, are backfilled when the server starts, see
+migrations.backfill_derived_rows.
+'''
+
+import json
+
+from sqlalchemy import event, inspect, select
+
+try:
+    from models import db, User, UserClass, UserProfileTerm, Term
+except ImportError:
+    from .models import db, User, UserClass, UserProfileTerm, Term
+try:
+    from term_weights import get_weights, get_term_rows, to_weight
+except ImportError:
+    from .term_weights import get_weights, get_term_rows, to_weight
+
+
+def get_profile_rows(zID, metadataJson):
+    '''
+    Flattens a user's metadataJson into profile vector rows.
+
+    Parameters:
+    - zID (int): The zID of the user.
+    - metadataJson (str): The user's metadata.
+
+    Returns:
+    tuple: The tblUserClass rows as a list of dicts, and the (key, skills, knowledge)
+    vector of every role as taken by get_term_rows.
+    '''
+    class_rows = []
+    vectors = []
+    metaData = json.loads(metadataJson) if metadataJson else {}
+    roles = metaData.get("class") if isinstance(metaData, dict) else None
+    if not isinstance(roles, dict):
+        return class_rows, vectors
+
+    for role, role_data in roles.items():
+        if not isinstance(role_data, dict):
+            class_rows.append({"user": zID, "role": role, "roleType": None})
+            continue
+        role_type = role_data.get("type")
+        class_rows.append(
+            {
+                "user": zID,
+                "role": role,
+                "roleType": role_type[:50] if isinstance(role_type, str) else None,
+            }
+        )
+        vectors.append(
+            (
+                {"user": zID, "role": role},
+                get_weights(role_data.get("skills")),
+                get_weights(role_data.get("knowledge")),
+            )
+        )
+    return class_rows, vectors
+
+
+def write_profile_rows(connection, zID, metadataJson):
+    '''
+    Replaces a user's profile vector rows.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - zID (int): The zID of the user.
+    - metadataJson (str or None): The user's metadata, or None to only remove the rows.
+    '''
+    connection.execute(
+        UserProfileTerm.__table__.delete().where(UserProfileTerm.user == zID)
+    )
+    connection.execute(UserClass.__table__.delete().where(UserClass.user == zID))
+    if metadataJson is None:
+        return
+
+    class_rows, vectors = get_profile_rows(zID, metadataJson)
+    if class_rows:
+        connection.execute(UserClass.__table__.insert(), class_rows)
+    term_rows = get_term_rows(connection, vectors)
+    if term_rows:
+        connection.execute(UserProfileTerm.__table__.insert(), term_rows)
+
+
+@event.listens_for(User, "after_insert")
+def insert_profile_vectors(mapper, connection, target):
+    '''
+    Materializes the profile vectors of a new user.
+    '''
+    write_profile_rows(connection, int(target.zID), target.metadataJson)
+
+
+@event.listens_for(User, "after_update")
+def update_profile_vectors(mapper, connection, target):
+    '''
+    Rewrites the profile vectors of a user whose metadataJson changed, for example through
+    addCourseEnrolment or deleteCourseEnrolment.
+    '''
+    if inspect(target).attrs.metadataJson.history.has_changes():
+        write_profile_rows(connection, int(target.zID), target.metadataJson)
+
+
+@event.listens_for(User, "before_delete")
+def delete_profile_vectors(mapper, connection, target):
+    '''
+    Removes the profile vectors of a user before the user row itself is deleted.
+    '''
+    write_profile_rows(connection, int(target.zID), None)
+
+
+def backfill_profile_vectors(connection):
+    '''
+    Materializes the profile vectors of every user who has no tblUserClass row yet, and the
+    weights of every user who has roles but no tblUserProfileTerm row, e.g. after a migration
+    cleared them.
+
+    Parameters:
+    - connection (Connection): The connection to write with, in a transaction of its own.
+
+    Returns:
+    int: The number of users backfilled.
+    '''
+    has_classes = select(UserClass.user).where(UserClass.user == User.zID).exists()
+    has_terms = (
+        select(UserProfileTerm.ID).where(UserProfileTerm.user == User.zID).exists()
+    )
+    class_rows = []
+    vectors = []
+    for zID, metadataJson in connection.execute(
+        select(User.zID, User.metadataJson).where(~has_classes)
+    ):
+        user_class_rows, user_vectors = get_profile_rows(zID, metadataJson)
+        class_rows.extend(user_class_rows)
+        vectors.extend(user_vectors)
+    for zID, metadataJson in connection.execute(
+        select(User.zID, User.metadataJson).where(has_classes, ~has_terms)
+    ):
+        vectors.extend(get_profile_rows(zID, metadataJson)[1])
+
+    zIDs = {row["user"] for row in class_rows}
+    if zIDs:
+        connection.execute(
+            UserProfileTerm.__table__.delete().where(UserProfileTerm.user.in_(zIDs))
+        )
+        connection.execute(UserClass.__table__.insert(), class_rows)
+    # Every user's terms are resolved with a single lookup
+    term_rows = get_term_rows(connection, vectors)
+    if term_rows:
+        connection.execute(UserProfileTerm.__table__.insert(), term_rows)
+    return len(zIDs | {row["user"] for row in term_rows})
+
+
+def get_role_members(role, zIDs=None):
+    '''
+    Retrieves the users holding a role.
+
+    Parameters:
+    - role (str): The role, e.g. "student".
+    - zIDs (iterable, optional): Only consider these users.
+
+    Returns:
+    list: The zIDs of the users holding the role, in zID order.
+    '''
+    query = select(UserClass.user).where(UserClass.role == role)
+    if zIDs is not None:
+        query = query.where(UserClass.user.in_(list(zIDs)))
+    return list(db.session.execute(query.order_by(UserClass.user)).scalars())
+
+
+def get_profile_terms(role, zIDs=None):
+    '''
+    Retrieves the skill and knowledge weights of many users in one query.
+
+    Parameters:
+    - role (str): The role whose weights are wanted, e.g. "student".
+    - zIDs (iterable, optional): Only fetch these users.
+
+    Returns:
+    dict: Maps each zID holding the role to {"skills": dict, "knowledge": dict}.
+    '''
+    members = get_role_members(role, zIDs)
+    profiles = {zID: {"skills": {}, "knowledge": {}} for zID in members}
+    if not profiles:
+        return profiles
+
+    query = (
+        select(
+            UserProfileTerm.user,
+            Term.term,
+            UserProfileTerm.skillWeight,
+            UserProfileTerm.knowledgeWeight,
+        )
+        .join(Term, Term.ID == UserProfileTerm.termID)
+        .where(UserProfileTerm.role == role)
+    )
+    if zIDs is not None:
+        query = query.where(UserProfileTerm.user.in_(list(profiles)))
+    for zID, term, skillWeight, knowledgeWeight in db.session.execute(
+        query.order_by(UserProfileTerm.ID)
+    ):
+        if zID not in profiles:
+            continue
+        if skillWeight is not None:
+            profiles[zID]["skills"][term] = to_weight(skillWeight)
+        if knowledgeWeight is not None:
+            profiles[zID]["knowledge"][term] = to_weight(knowledgeWeight)
+    return profiles
+
+
+def get_merged_profiles(role, zIDs=None):
+    '''
+    Retrieves the combined skill and knowledge weights of many users in one query.
+
+    Parameters:
+    - role (str): The role whose weights are wanted, e.g. "student".
+    - zIDs (iterable, optional): Only fetch these users.
+
+    Returns:
+    dict: Maps each zID holding the role to a dict of term -> skill weight + knowledge weight.
+    '''
+    return {
+        zID: {
+            term: (profile["skills"].get(term, 0) + profile["knowledge"].get(term, 0))
+            for term in set(profile["skills"]) | set(profile["knowledge"])
+        }
+        for zID, profile in get_profile_terms(role, zIDs).items()
+    }
+
@@ -7,15 +7,33 @@ import json
 import sys
 import os
 from flask import Blueprint, jsonify, request
-from recommendations.recommended_projects import get_project_recommendations, \
-                    get_missing_skills_and_knowledge, get_percentage_match
+from recommendations.recommended_projects import get_missing_skills_and_knowledge, \
+                    get_percentage_match
+from recommendations.recommended_projects import (
+    project_model,
+    load_project_model,
+    upsert_project_vector,
+    remove_project_vector,
+    recommend_from_project_model,
+    get_project_match,
+)
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import selectinload
 
 try:
     from models import db, User, Project, Group, GroupMember
 except ImportError:
     from .models import db, User, Project, Group, GroupMember
+try:
+    from term_weights import get_project_terms
+except ImportError:
+    from .term_weights import get_project_terms
+try:
+    from model_changes import share_model_writes, pull_model_changes
+except ImportError:
+    from .model_changes import share_model_writes, pull_model_changes
 
 # # Get the current and parent directory
 current_directory = os.getcwd()
@@ -24,6 +42,74 @@ sys.path.append(parent_directory)
 
 projects = Blueprint("projects", __name__)
 
+RECOMMENDED_PROJECTS_COUNT = 10
+
+
+def get_written_project_ids(target, updated):
+    """
+    Get the project IDs a written project affects in the project recommendation index.
+
+    Parameters:
+    - target (Project): The created, edited or deleted project.
+    - updated (bool): Whether the project was edited.
+
+    Returns:
+    - list: The project's ID, unless an edit left its skills and knowledge alone.
+    """
+    attrs = inspect(target).attrs
+    if updated and not (
+        attrs.skills.history.has_changes() or attrs.knowledge.history.has_changes()
+    ):
+        return []
+    return [target.ID]
+
+
+# Flag created, edited and deleted projects once their transaction commits. A bulk write
+# names the projects it touches through the "project_ids" execution option.
+project_model.track_writes(Project, get_written_project_ids, "project_ids")
+share_model_writes(project_model, int)
+
+
+def refresh_project_model():
+    """
+    Bring the project recommendation index in line with tblProject.
+
+    The index is built from every project the first time it is needed. After that only
+    projects flagged as created, edited or deleted, in this process or another, are re-read
+    and re-canonicalised.
+    """
+    pull_model_changes()
+    empty = {"skills": {}, "knowledge": {}}
+    if not project_model.is_loaded():
+        project_model.take_dirty()
+        project_terms = get_project_terms()
+        load_project_model(
+            {
+                project_ID: project_terms.get(project_ID, empty)
+                for project_ID in db.session.execute(
+                    select(Project.ID).order_by(Project.ID)
+                ).scalars()
+            }
+        )
+        return
+
+    dirty_ids = project_model.take_dirty()
+    if not dirty_ids:
+        return
+    existing_ids = set(
+        db.session.execute(
+            select(Project.ID).where(Project.ID.in_(dirty_ids))
+        ).scalars()
+    )
+    project_terms = get_project_terms(existing_ids)
+    for project_ID in sorted(dirty_ids):
+        if project_ID in existing_ids:
+            weights = project_terms.get(project_ID, empty)
+            upsert_project_vector(project_ID, weights["skills"], weights["knowledge"])
+        else:
+            remove_project_vector(project_ID)
+
+
 def get_recommended_projects(zID):
     """
     Given the user's zID, this function will return projects that
@@ -34,32 +120,29 @@ def get_recommended_projects(zID):
     user_knowledge = user_metaData["class"]["student"]["knowledge"]
     user_skills = user_metaData["class"]["student"]["skills"]
 
-    all_projects = []
-    projects = Project.query.all()
-    for project in projects:
-        project_ID = project.ID
-        project_skills = json.loads(project.skills)
-        project_knowledge = json.loads(project.skills)
-        all_projects.append(
-            {
-                "name": project_ID,
-                "Project required knowledge": project_knowledge,
-                "Project required skills": project_skills,
-            }
-        )
-    recommended_projects = get_project_recommendations(
-        all_projects, user_skills, user_knowledge
+    refresh_project_model()
+    recommended_projects = recommend_from_project_model(
+        user_skills, user_knowledge, RECOMMENDED_PROJECTS_COUNT
     )
     if len(recommended_projects) == 0:
         return {"projects": []}, 200
 
-    project_Id_recommended = [item[0] for item in recommended_projects]
-    top_recommended_projects = project_Id_recommended[:10]
+    top_recommended_projects = [item[0] for item in recommended_projects]
+
+    # Fetch the top projects in one query, then put them back in recommendation order
+    projects_by_ID = {
+        project.ID: project
+        for project in db.session.execute(
+            select(Project).where(Project.ID.in_(top_recommended_projects))
+        ).scalars()
+    }
 
     recommended_projects_info = []
 
     for project in top_recommended_projects:
-        project_all_info = Project.query.filter_by(ID=project).first()
+        project_all_info = projects_by_ID.get(project)
+        if project_all_info is None:
+            continue
         project_required_info = {
             "id": project_all_info.ID,
             "name": project_all_info.projectName,
@@ -84,82 +167,79 @@ def get_certain_project(zID, projectId):
     user_metaData = json.loads(user.metadataJson)
     student_knowledge = user_metaData["class"]["student"]["knowledge"]
     student_skills = user_metaData["class"]["student"]["skills"]
-    project_info = Project.query.filter_by(ID=projectId).first()
+    # The project, its groups and their members in three queries, however many groups
+    project_info = db.session.execute(
+        select(Project)
+        .where(Project.ID == projectId)
+        .options(selectinload(Project.groups).selectinload(Group.members))
+    ).scalar()
     if not project_info:
         return jsonify({"error": "Project not found"}), 404
 
     project_skills = json.loads(project_info.skills)
     project_knowledge = json.loads(project_info.knowledge)
 
-    project_data = [
-        {
-            "name": project_info.projectName,
-            "Project required knowledge": project_knowledge,
-            "Project required skills": project_skills,
-        }
-    ]
-
-    missing_skills, missing_knowledge = get_missing_skills_and_knowledge(
-        project_data, student_skills, student_knowledge
+    # Set differences over the cached canonical terms of the project and the student
+    refresh_project_model()
+    match = get_project_match(
+        project_info.ID, user.zID, student_skills, student_knowledge
     )
-
-    skills_knowledge_size = len(project_skills) + len(project_knowledge)
-    missing_size = len(missing_skills) + len(missing_knowledge)
+    if match is None:
+        # Only a project created after the index was refreshed can be missing from it
+        project_data = [
+            {
+                "name": project_info.projectName,
+                "Project required knowledge": project_knowledge,
+                "Project required skills": project_skills,
+            }
+        ]
+        missing_skills, missing_knowledge = get_missing_skills_and_knowledge(
+            project_data, student_skills, student_knowledge
+        )
+        skills_knowledge_size = len(project_skills) + len(project_knowledge)
+        missing_size = len(missing_skills) + len(missing_knowledge)
+        match = {
+            "missingSkills": list(missing_skills),
+            "missingKnowledge": list(missing_knowledge),
+            "percentageMatch": get_percentage_match(skills_knowledge_size, missing_size),
+        }
 
     full_project_info = {
         "id": project_info.ID,
         "name": project_info.projectName,
         "client": project_info.client,
-        "skills": json.loads(project_info.skills),
-        "knowledge": json.loads(project_info.knowledge),
-        "missingKnowledge": list(missing_knowledge),
-        "missingSkills": list(missing_skills),
+        "skills": project_skills,
+        "knowledge": project_knowledge,
+        "missingKnowledge": match["missingKnowledge"],
+        "missingSkills": match["missingSkills"],
         "thumbnail": project_info.thumbnail,
         "scope": project_info.scope,
         "requirements": project_info.requirements,
         "topics": json.loads(project_info.topics),
         "outcomes": project_info.outcomes,
-        "percentageMatch": get_percentage_match(skills_knowledge_size, missing_size),
-        "groups": get_groups_of_certain_project(projectId),
+        "percentageMatch": match["percentageMatch"],
+        "groups": get_groups_info(project_info.groups),
     }
     return jsonify(full_project_info), 200
 
 
-def get_groups_of_certain_project(projectId):
+def get_groups_info(groups):
     """
-    This function will get all the groups relating to a certain project.
+    This function will list the given groups with the zIDs of their members. The groups
+    should be loaded with selectinload(Group.members), otherwise every group costs a query.
     """
-    groups = Group.query.filter_by(project=projectId).all()
-
     groups_info = []
 
     for group in groups:
         group_details = {
             "id": group.ID,
             "groupName": group.groupName,
-            "members": get_members_of_group(group.ID),
+            "members": [group_member.student for group_member in group.members],
         }
         groups_info.append(group_details)
     return groups_info
 
 
-def get_members_of_group(groupId):
-    '''
-    Retrieve the members (students) of a group based on the group ID.
-
-    Parameters:
-    - groupId (int): The groupId of the group.
-
-    Returns:
-    - list: A list of zID of the members in the group.
-    '''
-    group_members = GroupMember.query.filter_by(groupID=groupId).all()
-    members_zID = []
-    for group_member in group_members:
-        members_zID.append(group_member.student)
-    return members_zID
-
-
 @projects.route("/projects/student", methods=["GET"])
 @jwt_required()
 def get_recommended_projects_students():
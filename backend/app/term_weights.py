@@ -0,0 +1,380 @@
+'''
+This file keeps the normalized skill and knowledge weights of courses and projects in sync
+with the JSON columns they are decoded from, and contains the functions used to read them.
+
+tblTerm is the dictionary of every skill and knowledge term, of any length, looked up by
+the SHA-256 of the term. tblCourseTerm, tblProjectTerm and tblUserProfileTerm (see
+profile_vectors.py) hold the weights of each course, project and user role against it. The
+JSON columns stay the source of truth: a course's or project's rows are rewritten whenever
+its skills or knowledge are written through the ORM, so recommenders can pull whole vectors
+with indexed joins instead of decoding every row. Courses and projects written before the
+tables existed, or loaded from populated_DB.sql, are backfilled when the server starts, see
+migrations.backfill_derived_rows.
+'''
+
+import hashlib
+import json
+
+from sqlalchemy import event, inspect, select
+
+try:
+    from models import db, Term, Course, CourseTerm, Project, ProjectTerm
+except ImportError:
+    from .models import db, Term, Course, CourseTerm, Project, ProjectTerm
+
+
+def get_weights(data):
+    '''
+    Keeps the numeric entries of a skills or knowledge dict.
+
+    Parameters:
+    - data: The decoded skills or knowledge value.
+
+    Returns:
+    dict: The terms with a numeric weight.
+    '''
+    if not isinstance(data, dict):
+        return {}
+    return {
+        term: weight
+        for term, weight in data.items()
+        if isinstance(weight, (int, float))
+    }
+
+
+def load_weights(text):
+    '''
+    Decodes a skills or knowledge JSON column.
+
+    Parameters:
+    - text (str or None): The column value.
+
+    Returns:
+    dict: The terms with a numeric weight, empty if the column is not a JSON object.
+    '''
+    try:
+        return get_weights(json.loads(text)) if text else {}
+    except ValueError:
+        return {}
+
+
+def to_weight(value):
+    '''
+    Converts a stored weight back to the int it was written as where possible.
+    '''
+    return int(value) if float(value).is_integer() else value
+
+
+def get_term_hash(term):
+    '''
+    Hashes a term the way MySQL's SHA2(term, 256) does, to look it up in tblTerm.
+
+    Returns:
+    str: The hex SHA-256 digest of the UTF-8 encoded term.
+    '''
+    return hashlib.sha256(term.encode("utf-8")).hexdigest()
+
+
+def get_term_ids(connection, terms):
+    '''
+    Looks up the IDs of terms, adding the ones tblTerm does not hold yet.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - terms (iterable): The terms.
+
+    Returns:
+    dict: Maps each term to its ID.
+    '''
+    terms_by_hash = {get_term_hash(term): term for term in terms}
+    if not terms_by_hash:
+        return {}
+    term_ids = {
+        terms_by_hash[termHash]: ID
+        for termHash, ID in connection.execute(
+            select(Term.termHash, Term.ID).where(Term.termHash.in_(terms_by_hash))
+        )
+    }
+    missing = [
+        termHash for termHash, term in terms_by_hash.items() if term not in term_ids
+    ]
+    if missing:
+        connection.execute(
+            Term.__table__.insert().prefix_with("IGNORE"),
+            [
+                {"term": terms_by_hash[termHash], "termHash": termHash}
+                for termHash in missing
+            ],
+        )
+        # A locking read, so terms another transaction committed after ours started are
+        # seen too
+        for termHash, ID in connection.execute(
+            select(Term.termHash, Term.ID)
+            .where(Term.termHash.in_(missing))
+            .with_for_update(read=True)
+        ):
+            term_ids[terms_by_hash[termHash]] = ID
+    return term_ids
+
+
+def get_term_rows(connection, vectors):
+    '''
+    Turns skill and knowledge dicts into weight table rows, resolving every term involved
+    with one lookup.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - vectors (list): (key, skills, knowledge) tuples, where key holds the owner columns of
+    the rows, e.g. {"course": 3}.
+
+    Returns:
+    list: A dict per row with the key columns, termID, skillWeight and knowledgeWeight.
+    '''
+    terms = set()
+    for _, skills, knowledge in vectors:
+        terms.update(skills)
+        terms.update(knowledge)
+    term_ids = get_term_ids(connection, terms)
+
+    rows = []
+    for key, skills, knowledge in vectors:
+        for term in list(skills) + [term for term in knowledge if term not in skills]:
+            if term not in term_ids:
+                continue
+            row = dict(key)
+            row.update(
+                termID=term_ids[term],
+                skillWeight=skills.get(term),
+                knowledgeWeight=knowledge.get(term),
+            )
+            rows.append(row)
+    return rows
+
+
+def write_course_terms(connection, course):
+    '''
+    Replaces a course's rows in tblCourseTerm.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - course (Course): The course.
+    '''
+    connection.execute(
+        CourseTerm.__table__.delete().where(CourseTerm.course == course.ID)
+    )
+    rows = get_term_rows(
+        connection,
+        [
+            (
+                {"course": course.ID},
+                load_weights(course.courseSkills),
+                load_weights(course.courseKnowledge),
+            )
+        ],
+    )
+    if rows:
+        connection.execute(CourseTerm.__table__.insert(), rows)
+
+
+def write_project_terms(connection, project):
+    '''
+    Replaces a project's rows in tblProjectTerm.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - project (Project): The project.
+    '''
+    connection.execute(
+        ProjectTerm.__table__.delete().where(ProjectTerm.project == project.ID)
+    )
+    rows = get_term_rows(
+        connection,
+        [
+            (
+                {"project": project.ID},
+                load_weights(project.skills),
+                load_weights(project.knowledge),
+            )
+        ],
+    )
+    if rows:
+        connection.execute(ProjectTerm.__table__.insert(), rows)
+
+
+def refresh_course_terms(connection, course_ids):
+    '''
+    Replaces the rows of many courses in tblCourseTerm, resolving all of their terms with one
+    lookup. Used by writes that bypass the ORM events, e.g. the bulk catalog import.
+
+    Parameters:
+    - connection (Connection): The connection to write with.
+    - course_ids (iterable): The IDs of the courses.
+    '''
+    course_ids = list(course_ids)
+    if not course_ids:
+        return
+    connection.execute(
+        CourseTerm.__table__.delete().where(CourseTerm.course.in_(course_ids))
+    )
+    courses = connection.execute(
+        select(Course.ID, Course.courseSkills, Course.courseKnowledge).where(
+            Course.ID.in_(course_ids)
+        )
+    ).all()
+    rows = get_term_rows(
+        connection,
+        [
+            ({"course": ID}, load_weights(skills), load_weights(knowledge))
+            for ID, skills, knowledge in courses
+        ],
+    )
+    if rows:
+        connection.execute(CourseTerm.__table__.insert(), rows)
+
+
+@event.listens_for(Course, "after_insert")
+def insert_course_terms(mapper, connection, target):
+    '''
+    Materializes the weights of a new course.
+    '''
+    write_course_terms(connection, target)
+
+
+@event.listens_for(Course, "after_update")
+def update_course_terms(mapper, connection, target):
+    '''
+    Rewrites the weights of a course whose skills or knowledge changed, e.g. through an edit
+    or a rescrape. Deleted courses lose their rows through ON DELETE CASCADE.
+    '''
+    attrs = inspect(target).attrs
+    if (
+        attrs.courseSkills.history.has_changes()
+        or attrs.courseKnowledge.history.has_changes()
+    ):
+        write_course_terms(connection, target)
+
+
+@event.listens_for(Project, "after_insert")
+def insert_project_terms(mapper, connection, target):
+    '''
+    Materializes the weights of a new project.
+    '''
+    write_project_terms(connection, target)
+
+
+@event.listens_for(Project, "after_update")
+def update_project_terms(mapper, connection, target):
+    '''
+    Rewrites the weights of a project whose skills or knowledge changed. Deleted projects
+    lose their rows through ON DELETE CASCADE.
+    '''
+    attrs = inspect(target).attrs
+    if attrs.skills.history.has_changes() or attrs.knowledge.history.has_changes():
+        write_project_terms(connection, target)
+
+
+def backfill_term_weights(connection):
+    '''
+    Materializes the weights of every course and project that has no row in tblCourseTerm
+    or tblProjectTerm yet.
+
+    Parameters:
+    - connection (Connection): The connection to write with, in a transaction of its own.
+
+    Returns:
+    tuple: The number of courses and the number of projects backfilled.
+    '''
+    courses = connection.execute(
+        select(Course.ID, Course.courseSkills, Course.courseKnowledge).where(
+            ~select(CourseTerm.ID).where(CourseTerm.course == Course.ID).exists()
+        )
+    ).all()
+    course_rows = get_term_rows(
+        connection,
+        [
+            ({"course": ID}, load_weights(skills), load_weights(knowledge))
+            for ID, skills, knowledge in courses
+        ],
+    )
+    if course_rows:
+        connection.execute(CourseTerm.__table__.insert(), course_rows)
+
+    projects = connection.execute(
+        select(Project.ID, Project.skills, Project.knowledge).where(
+            ~select(ProjectTerm.ID).where(ProjectTerm.project == Project.ID).exists()
+        )
+    ).all()
+    project_rows = get_term_rows(
+        connection,
+        [
+            ({"project": ID}, load_weights(skills), load_weights(knowledge))
+            for ID, skills, knowledge in projects
+        ],
+    )
+    if project_rows:
+        connection.execute(ProjectTerm.__table__.insert(), project_rows)
+    return (
+        len({row["course"] for row in course_rows}),
+        len({row["project"] for row in project_rows}),
+    )
+
+
+def get_term_weights(model, owner_column, owner_ids=None):
+    '''
+    Retrieves the skill and knowledge weights of many courses or projects in one query.
+
+    Parameters:
+    - model (CourseTerm or ProjectTerm): The weight table.
+    - owner_column (Column): Its course or project column.
+    - owner_ids (iterable, optional): Only fetch these courses or projects.
+
+    Returns:
+    dict: Maps each ID with weights to {"skills": dict, "knowledge": dict}.
+    '''
+    query = select(
+        owner_column, Term.term, model.skillWeight, model.knowledgeWeight
+    ).join(Term, Term.ID == model.termID)
+    if owner_ids is not None:
+        owner_ids = list(owner_ids)
+        if not owner_ids:
+            return {}
+        query = query.where(owner_column.in_(owner_ids))
+
+    weights = {}
+    for ID, term, skillWeight, knowledgeWeight in db.session.execute(
+        query.order_by(model.ID)
+    ):
+        vector = weights.setdefault(ID, {"skills": {}, "knowledge": {}})
+        if skillWeight is not None:
+            vector["skills"][term] = to_weight(skillWeight)
+        if knowledgeWeight is not None:
+            vector["knowledge"][term] = to_weight(knowledgeWeight)
+    return weights
+
+
+def get_course_terms(course_ids=None):
+    '''
+    Retrieves the skill and knowledge weights of many courses in one query.
+
+    Parameters:
+    - course_ids (iterable, optional): Only fetch these courses.
+
+    Returns:
+    dict: Maps each course ID to {"skills": dict, "knowledge": dict}. Courses without any
+    weight are left out.
+    '''
+    return get_term_weights(CourseTerm, CourseTerm.course, course_ids)
+
+
+def get_project_terms(project_ids=None):
+    '''
+    Retrieves the skill and knowledge weights of many projects in one query.
+
+    Parameters:
+    - project_ids (iterable, optional): Only fetch these projects.
+
+    Returns:
+    dict: Maps each project ID to {"skills": dict, "knowledge": dict}. Projects without
+    any weight are left out.
+    '''
+    return get_term_weights(ProjectTerm, ProjectTerm.project, project_ids)
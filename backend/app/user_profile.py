@@ -17,6 +17,7 @@ import json
 from flask_mail import Mail, Message
 from flask import Blueprint, request, jsonify, current_app, session
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from sqlalchemy import inspect, select, tuple_
 
 try:
     from auth import is_strong_password, is_valid_email
@@ -44,37 +45,100 @@ except ImportError:
         Group,
         GroupMember,
     )
-from recommendations.recommend_students import get_reccomended_students
+from recommendations.recommend_students import (
+    student_model,
+    load_student_model,
+    upsert_student_profile,
+    remove_student_profile,
+    recommend_from_student_model,
+)
 from recommendations.recommend_courses import get_recommended_courses
 
-try:
-    from webscraping.transcript_scrape import scrape_pdf_from_base64
-except ImportError:
-    from ..webscraping.transcript_scrape import scrape_pdf_from_base64
+from lazy_imports import lazy_import
 
 try:
-    from webscraping.scrape_single_course import get_single_course_information
+    from recommendations.similar_words import *
 except ImportError:
-    from ..webscraping.scrape_single_course import get_single_course_information
+    from ..recommendations.similar_words import *
 
 try:
-    from webscraping.pdf_scraping import *
+    from course import addCourseEnrolments
 except ImportError:
-    from ..webscraping.pdf_scraping import *
+    from app.course import addCourseEnrolments
 
 try:
-    from recommendations.similar_words import *
+    from profile_vectors import get_profile_terms, get_merged_profiles
 except ImportError:
-    from ..recommendations.similar_words import *
-
+    from .profile_vectors import get_profile_terms, get_merged_profiles
 try:
-    from course import addCourseEnrolment
+    from model_changes import share_model_writes, pull_model_changes
 except ImportError:
-    from app.course import addCourseEnrolment
+    from .model_changes import share_model_writes, pull_model_changes
 
 
 user_profile = Blueprint("profile", __name__)
-mail = Mail(current_app)
+mail = Mail()
+
+
+@user_profile.record_once
+def init_mail(state):
+    '''
+    Sets up the mail extension on the app the blueprint is registered on.
+    '''
+    mail.init_app(state.app)
+
+RECOMMENDED_STUDENTS_PAGE_SIZE = 50
+
+# Imported by the first transcript upload, see lazy_imports
+transcript_scrape = lazy_import("webscraping.transcript_scrape")
+
+
+def get_written_student_ids(target, updated):
+    '''
+    Gets the zIDs a written user affects in the student recommendation model.
+
+    Parameters:
+    - target (User): The created, edited or deleted user.
+    - updated (bool): Whether the user was edited.
+
+    Returns:
+    list: The user's zID, unless an edit left their skills and knowledge alone.
+    '''
+    if updated and not inspect(target).attrs.metadataJson.history.has_changes():
+        return []
+    return [int(target.zID)]
+
+
+# Flags created, edited and deleted users once their transaction commits. A bulk write to
+# tblUser invalidates the whole student recommendation model, unless it names the zIDs it
+# touches through the "student_ids" execution option.
+student_model.track_writes(User, get_written_student_ids, "student_ids")
+share_model_writes(student_model, int)
+
+
+def refresh_student_model():
+    '''
+    Brings the student recommendation model in line with tblUser.
+
+    The model is loaded from the materialized profile vectors of every student the first time
+    it is needed. After that only users flagged as created, edited or deleted, in this process
+    or another, are re-read.
+    '''
+    pull_model_changes()
+    if not student_model.is_loaded():
+        student_model.take_dirty()
+        load_student_model(get_merged_profiles("student"))
+        return
+
+    dirty_ids = student_model.take_dirty()
+    if not dirty_ids:
+        return
+    profiles = get_merged_profiles("student", dirty_ids)
+    for zID in dirty_ids:
+        if zID in profiles:
+            upsert_student_profile(zID, profiles[zID])
+        else:
+            remove_student_profile(zID)
 
 
 
@@ -519,13 +583,13 @@ def getProfileSkills(zID, role):
     '''
     user = User.query.filter_by(zID=zID).first()
     if user:
-        metaData = json.loads(user.metadataJson)
+        profile = get_profile_terms(role, [user.zID]).get(user.zID)
+        if profile is None:
+            return jsonify({"error": "Invalid Role"}), 400
         try:
-            skills = top_items(
-                normalize_skills_knowledge(metaData["class"][role]["skills"])
-            )
+            skills = top_items(normalize_skills_knowledge(profile["skills"]))
         except:
-            skills = top_items(metaData["class"][role]["skills"])
+            skills = top_items(profile["skills"])
         return jsonify({"skills": skills}), 200
 
     else:
@@ -546,9 +610,10 @@ def getProfileKnowledge(zID, role):
     '''
     user = User.query.filter_by(zID=zID).first()
     if user:
-        metaData = json.loads(user.metadataJson)
-        knowledge = metaData["class"][role]["knowledge"]
-        knowledge = normalize_skills_knowledge(knowledge)
+        profile = get_profile_terms(role, [user.zID]).get(user.zID)
+        if profile is None:
+            return jsonify({"error": "Invalid Role"}), 400
+        knowledge = normalize_skills_knowledge(profile["knowledge"])
         replace_words = get_replaceable_words(knowledge)
         cleaned_knowledge = replace_similar_words_in_dict(knowledge, replace_words)
         try:
@@ -561,54 +626,61 @@ def getProfileKnowledge(zID, role):
         return jsonify({"error": "Invalid User"}), 400
 
 
-def getRecommendedStudents(zID):
+def getRecommendedStudents(zID, offset=0, limit=None):
     '''
-    Retrieves and returns a list of recommended students based on skills and knowledge matching.
+    Retrieves and returns a page of recommended students based on skills and knowledge matching.
 
     Parameters:
-    - zID (str): The zID of the user.
+    - zID (int): The zID of the user.
+    - offset (int): The number of recommended students to skip.
+    - limit (int): The maximum number of students to return, or None for all of them.
 
     Returns:
     JSON: A JSON response containing information about recommended students, including zID,
-          first name, last name, headline, skills, knowledge, and image URL.
-    '''
-    all_students = {}
-    users = User.query.all()
-    for user in users:
-        metaData = json.loads(user.metadataJson)
-        if "student" in list(metaData["class"].keys()):
-            user_knowledge = metaData["class"]["student"]["knowledge"]
-            user_skills = metaData["class"]["student"]["skills"]
-            user_skills_and_knowledge = {
-                term: (user_skills.get(term, 0) + user_knowledge.get(term, 0))
-                for term in set(user_skills) | set(user_knowledge)
-            }
-            all_students[user.zID] = user_skills_and_knowledge
-    recommended_students = get_reccomended_students(all_students, zID)
+          first name, last name, headline, skills, knowledge, and image URL, together with
+          the total number of students that can be paged through.
+    '''
+    refresh_student_model()
+    try:
+        recommended_students, total = recommend_from_student_model(zID, offset, limit)
+    except KeyError:
+        return jsonify({"error": "User is not a student."}), 400
+
+    users = {
+        user.zID: user
+        for user in db.session.query(
+            User.zID, User.firstname, User.lastname, User.headline, User.imageURL
+        ).filter(User.zID.in_(recommended_students))
+    }
+    profiles = get_profile_terms("student", recommended_students)
 
     recommended_students_info = []
 
     for student in recommended_students:
-        user = User.query.filter_by(zID=student).first()
-        metaData = json.loads(user.metadataJson)
-        user_knowledge = metaData["class"]["student"]["knowledge"]
-        user_knowledge_list = list(user_knowledge.keys())
-        user_skills = metaData["class"]["student"]["skills"]
-        user_skills_list = list(user_skills.keys())
+        user = users.get(student)
+        if user is None:
+            # Deleted since the model was last refreshed
+            continue
+        profile = profiles.get(student, {"skills": {}, "knowledge": {}})
 
         user_info = {
             "zID": user.zID,
             "firstName": user.firstname,
             "lastName": user.lastname,
             "headline": user.headline,
-            "skills": user_skills_list,
-            "knowledge": user_knowledge_list,
+            "skills": list(profile["skills"].keys()),
+            "knowledge": list(profile["knowledge"].keys()),
             "imageURL": user.imageURL,
         }
 
         recommended_students_info.append(user_info)
 
-    return {"students": recommended_students_info}, 200
+    return {
+        "students": recommended_students_info,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+    }, 200
 
 
 def updateCourseTranscriptPDF(zID, transcript):
@@ -622,18 +694,25 @@ def updateCourseTranscriptPDF(zID, transcript):
     Returns:
     JSON: An empty JSON response indicating the success of the course enrolment update.
     '''
-    course_list = scrape_pdf_from_base64(transcript)
+    course_list = transcript_scrape.scrape_pdf_from_base64(transcript)
+    offerings = []
     for course in course_list:
         try:
             courseCode = course[0]
             yearDate = course[1]
             term = course[2][0] + course[2][-1]
-            courseInfo = Course.query.filter_by(
-                courseCode=courseCode, yearDate=yearDate, term=term
-            ).first()
-            addCourseEnrolment(zID, courseInfo.ID, "student")
-        except:
-            pass
+        except (IndexError, TypeError):
+            continue
+        offerings.append((courseCode, yearDate, term))
+
+    # Look up every offering at once and enrol in all of them with one metadata write
+    if offerings:
+        course_ids = db.session.execute(
+            select(Course.ID).where(
+                tuple_(Course.courseCode, Course.yearDate, Course.term).in_(offerings)
+            )
+        ).scalars()
+        addCourseEnrolments(zID, course_ids, "student")
     return jsonify({}), 200
 
 
@@ -1337,17 +1416,25 @@ def extractTranscriptPDF():
 @jwt_required()
 def recommendedUsers():
     '''
-    Retrieves a list of recommended users for a student.
+    Retrieves a page of recommended users for a student.
 
     Parameters:
     - Requires a valid JWT token.
     - URL Parameter: zID
+    - URL Parameter (optional): offset, the number of recommended users to skip (default 0)
+    - URL Parameter (optional): limit, the page size (default 50)
 
     Response:
-    - JSON containing information about recommended users.
+    - JSON containing information about recommended users and the total available.
     '''
     zID = int(request.args.get("zID"))
-    response = getRecommendedStudents(zID)
+    offset = request.args.get("offset", default=0, type=int)
+    limit = request.args.get(
+        "limit", default=RECOMMENDED_STUDENTS_PAGE_SIZE, type=int
+    )
+    if offset < 0 or limit < 1:
+        return jsonify({"error": "Invalid page."}), 400
+    response = getRecommendedStudents(zID, offset, limit)
     return response
 
 
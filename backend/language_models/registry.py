@@ -0,0 +1,146 @@
+"""
+Process-wide registry of the NLP models shared by webscraping and recommendations.
+
+Each pipeline is loaded lazily, exactly once per process, the first time it is asked for, and
+the same object is handed to every caller and thread afterwards. warm_models loads them up
+front (e.g. on server startup) and get_model_footprints reports what each load cost.
+"""
+
+import os
+import threading
+import time
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_lg")
+
+loaded_models = {}
+model_footprints = {}
+models_lock = threading.RLock()
+
+
+def get_resident_memory():
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        - int or None: Resident memory in bytes, or None where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def load_model(key, loader):
+    """
+    Load a model once and record its footprint.
+
+    Parameters:
+        - key (tuple): The registry key of the model.
+        - loader (callable): Builds the model when it is not loaded yet.
+
+    Returns:
+        - object: The shared model.
+    """
+    model = loaded_models.get(key)
+    if model is not None:
+        return model
+
+    with models_lock:
+        if key not in loaded_models:
+            memory_before = get_resident_memory()
+            started = time.perf_counter()
+            model = loader()
+            footprint = {
+                "loadSeconds": round(time.perf_counter() - started, 3),
+                "residentBytesAdded": None,
+            }
+            memory_after = get_resident_memory()
+            if memory_before is not None and memory_after is not None:
+                footprint["residentBytesAdded"] = memory_after - memory_before
+            vectors = getattr(getattr(model, "vocab", None), "vectors", None)
+            if vectors is not None:
+                footprint["vectorBytes"] = int(vectors.data.nbytes)
+            model_footprints["/".join(key)] = footprint
+            loaded_models[key] = model
+    return loaded_models[key]
+
+
+def get_spacy_model(name=SPACY_MODEL):
+    """
+    Get the shared spaCy pipeline.
+
+    Parameters:
+        - name (str): The spaCy package to load. Defaults to SPACY_MODEL.
+
+    Returns:
+        - spacy.language.Language: The pipeline, loaded on first use.
+    """
+
+    def loader():
+        import spacy
+
+        return spacy.load(name)
+
+    return load_model(("spacy", name), loader)
+
+
+def get_skill_extractor(name=SPACY_MODEL):
+    """
+    Get the shared SkillNer extractor, built on the shared spaCy pipeline.
+
+    Parameters:
+        - name (str): The spaCy package the extractor runs on. Defaults to SPACY_MODEL.
+
+    Returns:
+        - SkillExtractor: The extractor, built on first use.
+    """
+
+    def loader():
+        from spacy.matcher import PhraseMatcher
+        from skillNer.general_params import SKILL_DB
+        from skillNer.skill_extractor_class import SkillExtractor
+
+        return SkillExtractor(get_spacy_model(name), SKILL_DB, PhraseMatcher)
+
+    return load_model(("skillner", name), loader)
+
+
+MODEL_LOADERS = {
+    "spacy": get_spacy_model,
+    "skillner": get_skill_extractor,
+}
+
+
+def warm_models(names):
+    """
+    Load models ahead of their first use.
+
+    Parameters:
+        - names (str or list): Model names from MODEL_LOADERS, either as a list or as a
+        comma-separated string such as "spacy,skillner". Empty loads nothing.
+
+    Returns:
+        - dict: The footprints of every loaded model, as returned by get_model_footprints.
+    """
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    for name in names or []:
+        if name not in MODEL_LOADERS:
+            raise ValueError(f"Unknown NLP model '{name}'.")
+        MODEL_LOADERS[name]()
+    return get_model_footprints()
+
+
+def get_model_footprints():
+    """
+    Report the cost of every model loaded so far.
+
+    Returns:
+        - dict: Maps "<kind>/<package>" to its load time in seconds, the resident memory the
+        load added (None where it cannot be measured) and, for spaCy pipelines, the size
+        of the word vector table.
+    """
+    with models_lock:
+        return {key: dict(footprint) for key, footprint in model_footprints.items()}
@@ -0,0 +1,86 @@
+"""
+Deferred imports of the scraping and NLP code paths.
+
+The webscraping modules pull in Selenium, webdriver_manager, pandas, NLTK, SkillNer and spaCy
+when they are imported, which costs seconds and hundreds of MB. A server that only serves
+login and profile pages never needs them, so the app imports them through lazy_import: the
+module is imported the first time one of its attributes is used, e.g. by the first scrape
+job, and every later use goes straight to sys.modules. tests/test_import_budget.py checks
+that none of HEAVY_MODULES is imported when the server starts.
+"""
+
+import importlib
+import threading
+
+# Top-level packages a server start must not import
+HEAVY_MODULES = (
+    "selenium",
+    "webdriver_manager",
+    "pandas",
+    "sklearn",
+    "nltk",
+    "skillNer",
+    "spacy",
+    "IPython",
+    "bs4",
+    "fuzzywuzzy",
+    "PyPDF2",
+)
+
+lazy_modules_lock = threading.Lock()
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is first used.
+    """
+
+    def __init__(self, name):
+        self.__dict__["name"] = name
+        self.__dict__["module"] = None
+
+    def load(self):
+        """
+        Import the module, once.
+
+        Returns:
+            - module: The imported module.
+        """
+        module = self.__dict__["module"]
+        if module is None:
+            with lazy_modules_lock:
+                module = self.__dict__["module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["name"])
+                    self.__dict__["module"] = module
+        return module
+
+    def is_loaded(self):
+        """
+        Returns:
+            - bool: Whether the module has been imported yet.
+        """
+        return self.__dict__["module"] is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self.load(), attribute, value)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded() else "not loaded"
+        return f"<lazy module '{self.__dict__['name']}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Get a module that is only imported when it is first used.
+
+    Parameters:
+        - name (str): The absolute name of the module, e.g. "webscraping.pdf_scraping".
+
+    Returns:
+        - LazyModule: The stand-in for the module.
+    """
+    return LazyModule(name)
@@ -0,0 +1,233 @@
+"""
+State shared by the persisted recommendation models of this process.
+
+Every model (courses, students, projects) is a ModelState: a dict of the model's data guarded
+by a re-entrant lock, with a "loaded" flag cleared when the model must be rebuilt from the
+database and the set of "dirty" keys (course codes, zIDs, project IDs) whose stored data may
+be stale. track_writes flags the rows of an ORM class written by a transaction once it
+commits, so a request refreshing the model in between never reads the uncommitted rows and
+loses the flag; the flags of a rolled back transaction are dropped.
+
+Once built, a model's sparse matrix follows single-item writes row by row (see edit_matrix
+and set_matrix_row) instead of being rebuilt from every item on the next read. Removed items
+leave an empty row behind, so the matrix is only rebuilt once a share of its rows
+(MATRIX_REBUILD_FRACTION) has been edited since it was built.
+"""
+
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# Share of a matrix's rows that may be edited in place before it is rebuilt instead
+MATRIX_REBUILD_FRACTION = 0.25
+
+
+def set_matrix_row(matrix, row, columns, values, column_count):
+    """
+    Replace one row of a sparse matrix, or append it.
+
+    The matrix itself is left untouched, so a request still reading it is not affected.
+
+    Parameters:
+        - matrix (csr_matrix): The matrix.
+        - row (int): The row to replace, or the number of rows to append one.
+        - columns (list): The columns of the row's entries.
+        - values (list): The row's entries.
+        - column_count (int): The number of columns of the result, at least the matrix's.
+
+    Returns:
+        - csr_matrix: The matrix with the row replaced.
+    """
+    row_count = matrix.shape[0]
+    start = matrix.indptr[row]
+    end = matrix.indptr[row + 1] if row < row_count else start
+    if row == row_count:
+        indptr = np.append(matrix.indptr, start)
+    else:
+        indptr = matrix.indptr.copy()
+    indptr[row + 1 :] += len(columns) - (end - start)
+    data = np.concatenate(
+        (matrix.data[:start], np.asarray(values, dtype=np.float64), matrix.data[end:])
+    )
+    indices = np.concatenate(
+        (
+            matrix.indices[:start],
+            np.asarray(columns, dtype=matrix.indices.dtype),
+            matrix.indices[end:],
+        )
+    )
+
+    return csr_matrix(
+        (data, indices, indptr), shape=(max(row_count, row + 1), column_count)
+    )
+
+
+class ModelState(dict):
+    """
+    The data of one persisted recommendation model and the lock that guards it.
+    """
+
+    def __init__(self, name, **fields):
+        """
+        Parameters:
+            - name (str): The name of the model, e.g. "course".
+            - fields: The model's own entries and their empty values.
+        """
+        super().__init__(
+            loaded=False, dirty=set(), matrix=None, edited_rows=0, **fields
+        )
+        self.name = name
+        self.lock = threading.RLock()
+        self.pending_writes_key = f"{name}_model_writes"
+
+    def is_loaded(self):
+        """
+        Returns:
+            - bool: True once the model has been loaded from the database.
+        """
+        return self["loaded"]
+
+    def invalidate(self):
+        """
+        Drop the model so it is rebuilt from the database on next use. Used when the database
+        changes in ways that cannot be traced to individual keys.
+        """
+        with self.lock:
+            self["loaded"] = False
+            self["matrix"] = None
+
+    def set_matrix(self, matrix):
+        """
+        Keep a matrix just built from every item.
+
+        Parameters:
+            - matrix: The model's matrix.
+        """
+        with self.lock:
+            self["matrix"] = matrix
+            self["edited_rows"] = 0
+
+    def edit_matrix(self, row_count):
+        """
+        Count an in-place edit of one row of the matrix. Past MATRIX_REBUILD_FRACTION of its
+        rows the matrix is dropped instead, to be rebuilt from every item on next use.
+
+        Parameters:
+            - row_count (int): The number of rows of the matrix, removed ones included.
+
+        Returns:
+            - bool: True if the matrix is there to be edited.
+        """
+        with self.lock:
+            if self["matrix"] is None:
+                return False
+            if self["edited_rows"] >= MATRIX_REBUILD_FRACTION * row_count:
+                self["matrix"] = None
+                return False
+            self["edited_rows"] += 1
+            return True
+
+    def mark_dirty(self, keys):
+        """
+        Flag keys whose stored data may no longer match the database.
+
+        Parameters:
+            - keys (iterable): The keys to flag.
+        """
+        with self.lock:
+            self["dirty"].update(keys)
+
+    def take_dirty(self):
+        """
+        Returns:
+            - set: The keys flagged since the last call, clearing the flags.
+        """
+        with self.lock:
+            dirty = self["dirty"]
+            self["dirty"] = set()
+            return dirty
+
+    def add_pending_writes(self, session, keys):
+        """
+        Remember keys written in a session's transaction, or None if the writes cannot be
+        traced to individual keys, until the transaction ends.
+
+        Parameters:
+            - session (Session): The session that wrote them.
+            - keys (iterable or None): The keys written.
+        """
+        pending = session.info.get(self.pending_writes_key, set())
+        if pending is None or keys is None:
+            session.info[self.pending_writes_key] = None
+            return
+        pending.update(keys)
+        session.info[self.pending_writes_key] = pending
+
+    def apply_pending_writes(self, session):
+        """
+        Flag the keys written by a committed transaction.
+
+        Parameters:
+            - session (Session): The session that committed.
+        """
+        if self.pending_writes_key not in session.info:
+            return
+        keys = session.info.pop(self.pending_writes_key)
+        if keys is None:
+            self.invalidate()
+        else:
+            self.mark_dirty(keys)
+
+    def drop_pending_writes(self, session):
+        """
+        Forget the keys written by a rolled back transaction.
+
+        Parameters:
+            - session (Session): The session that rolled back.
+        """
+        session.info.pop(self.pending_writes_key, None)
+
+    def track_writes(self, model_class, get_keys, bulk_option):
+        """
+        Keep the model in line with the rows of an ORM class.
+
+        Parameters:
+            - model_class (class): The ORM class the model is built from.
+            - get_keys (function): Takes a flushed row and whether it was updated, and returns
+            the keys it affects, empty when an edit cannot change the model.
+            - bulk_option (str): The execution option through which a Query.delete() or
+            Query.update() names the keys it touches. One that names none invalidates the
+            whole model.
+        """
+
+        def record_inserted_or_deleted(mapper, connection, target):
+            session = object_session(target)
+            if session is not None:
+                self.add_pending_writes(session, get_keys(target, False))
+
+        def record_updated(mapper, connection, target):
+            session = object_session(target)
+            if session is not None:
+                self.add_pending_writes(session, get_keys(target, True))
+
+        def record_bulk_write(orm_execute_state):
+            # Query.delete() and Query.update() skip the per-row events above
+            if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+                return
+            if any(
+                mapper.class_ is model_class for mapper in orm_execute_state.all_mappers
+            ):
+                self.add_pending_writes(
+                    orm_execute_state.session,
+                    orm_execute_state.execution_options.get(bulk_option),
+                )
+
+        event.listen(model_class, "after_insert", record_inserted_or_deleted)
+        event.listen(model_class, "after_delete", record_inserted_or_deleted)
+        event.listen(model_class, "after_update", record_updated)
+        event.listen(Session, "do_orm_execute", record_bulk_write)
+        event.listen(Session, "after_commit", self.apply_pending_writes)
+        event.listen(Session, "after_rollback", self.drop_pending_writes)
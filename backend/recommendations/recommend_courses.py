@@ -1,9 +1,50 @@
 """
 This script provides course recommendations based on student skills and knowledge.
 
+The catalog is kept as a persisted TF-IDF model: every course's skills and knowledge are
+tokenized once into raw term counts, held in a sparse course-by-term matrix next to the idf
+weight of every column and the TF-IDF norm of every row. A course edit only replaces that
+course's row and refreshes the weights and norms with vectorised passes, and a student query is
+scored with a single sparse matrix-vector product followed by a top-k selection.
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
+import re
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from model_state import ModelState, set_matrix_row
+except ImportError:
+    from recommendations.model_state import ModelState, set_matrix_row
+
+# Same tokens as the default TfidfVectorizer analyzer (lowercase, 2+ word characters),
+# without importing scikit-learn on server start
+token_pattern = re.compile(r"(?u)\b\w\w+\b")
+
+
+def analyzer(text):
+    """
+    Parameters: Text
+
+    Returns: List of the lowercase tokens of the text
+    """
+    return token_pattern.findall(text.lower())
+
+# Persisted catalog model shared by every request served by this process. Its dirty keys
+# are course codes and its matrix is the raw term count course-by-term matrix.
+course_model = ModelState(
+    "course",
+    documents={},  # course code -> Counter of raw term counts
+    document_frequency=Counter(),  # term -> number of courses containing it
+    codes=[],  # course code of each matrix row, None for removed courses
+    rows={},  # course code -> matrix row
+    vocabulary={},  # term -> matrix column
+    frequencies=None,  # number of courses containing the term of each matrix column
+    idf=None,  # idf weight of each matrix column
+    norms=None,  # TF-IDF l2 norm of each matrix row
+)
+course_model_lock = course_model.lock
 
 
 def combine_skills_and_knowledge(courses_data):
@@ -35,6 +76,161 @@ def combine_skills_and_knowledge(courses_data):
     return courses
 
 
+def count_terms(skills_and_knowledge):
+    """
+    Parameters: Dict (or any iterable) of skill and knowledge phrases
+
+    Returns: Counter of the raw TF-IDF term counts of the phrases joined into one document
+    """
+    return Counter(analyzer(" ".join(skills_and_knowledge)))
+
+
+def build_count_matrix(codes, documents, document_frequency):
+    """
+    Parameters:
+    1. List of course codes, one per matrix row
+    2. Dict of course code -> Counter of raw term counts
+    3. Counter of term -> number of documents containing it
+
+    Returns: Tuple of (raw term count csr_matrix, vocabulary dict, array of the number of
+    documents containing the term of each column)
+    """
+    vocabulary = {
+        term: column
+        for column, term in enumerate(
+            sorted(term for term, count in document_frequency.items() if count > 0)
+        )
+    }
+    frequencies = np.array(
+        [document_frequency[term] for term in vocabulary], dtype=np.float64
+    )
+
+    indptr = [0]
+    indices = []
+    data = []
+    for code in codes:
+        for term, count in documents[code].items():
+            indices.append(vocabulary[term])
+            data.append(count)
+        indptr.append(len(indices))
+
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), indices, indptr),
+        shape=(len(codes), len(vocabulary)),
+    )
+
+    return matrix, vocabulary, frequencies
+
+
+def get_idf(frequencies, document_count):
+    """
+    Parameters:
+    1. Array of the number of documents containing the term of each column
+    2. Number of documents
+
+    Returns: Array of the smoothed idf weight of each column, as a TfidfVectorizer computes
+    it, and 0 for the columns of terms no document contains any more
+    """
+    idf = np.log((1 + document_count) / (1 + frequencies)) + 1
+    idf[frequencies == 0] = 0
+    return idf
+
+
+def get_row_norms(counts, idf):
+    """
+    Parameters:
+    1. Raw term count csr_matrix
+    2. idf weight of each matrix column
+
+    Returns: Array of the l2 norm of each row once weighted by the idf, 1 for empty rows
+    """
+    squared = counts.copy()
+    squared.data **= 2
+    norms = np.sqrt(squared @ idf**2)
+    norms[norms == 0] = 1
+    return norms
+
+
+def build_tfidf_matrix(codes, documents, document_frequency):
+    """
+    Parameters:
+    1. List of course codes, one per matrix row
+    2. Dict of course code -> Counter of raw term counts
+    3. Counter of term -> number of documents containing it
+
+    Returns: Tuple of (l2-normalised TF-IDF csr_matrix, vocabulary dict, idf array), weighted the
+    same way as a TfidfVectorizer fitted on the documents (smoothed idf, l2 norm)
+    """
+    counts, vocabulary, frequencies = build_count_matrix(
+        codes, documents, document_frequency
+    )
+    idf = get_idf(frequencies, len(codes))
+    norms = get_row_norms(counts, idf)
+    matrix = csr_matrix(counts.multiply(idf).multiply(1 / norms[:, np.newaxis]))
+
+    return matrix, vocabulary, idf
+
+
+def get_query_vector(vocabulary, idf, student_skills_and_knowledge):
+    """
+    Parameters:
+    1. Dict of term -> matrix column
+    2. idf weight of each matrix column
+    3. Dict of student_skills_and_knowledge
+
+    Returns: The l2-normalised TF-IDF vector of the student, or None if it has no known term
+    """
+    query = np.zeros(len(vocabulary))
+    for term, count in count_terms(student_skills_and_knowledge).items():
+        if term in vocabulary:
+            query[vocabulary[term]] = count
+    query *= idf
+    norm = np.linalg.norm(query)
+    if norm == 0:
+        return None
+
+    return query / norm
+
+
+def score_documents(matrix, vocabulary, idf, student_skills_and_knowledge):
+    """
+    Parameters:
+    1. l2-normalised TF-IDF course-by-term matrix
+    2. Dict of term -> matrix column
+    3. idf weight of each matrix column
+    4. Dict of student_skills_and_knowledge
+
+    Returns: Array with the cosine similarity of the student against every matrix row
+    """
+    query = get_query_vector(vocabulary, idf, student_skills_and_knowledge)
+    if query is None:
+        return np.zeros(matrix.shape[0])
+
+    return matrix @ query
+
+
+def top_k(scores, k=None, exclude=None):
+    """
+    Parameters:
+    1. Array of scores, one per candidate
+    2. Number of candidates to return (None for all)
+    3. Boolean mask of candidates to skip (None to keep all)
+
+    Returns: Indices of the best scoring candidates in descending order, ties broken by index
+    """
+    candidates = np.arange(len(scores))
+    if exclude is not None:
+        candidates = candidates[~exclude]
+    if k is not None and k < len(candidates):
+        # argpartition gives the k best in O(n); widen to every tie of the k-th score so the
+        # final order matches a stable sort
+        kth = np.partition(-scores[candidates], k - 1)[k - 1]
+        candidates = candidates[-scores[candidates] <= kth]
+    order = np.lexsort((candidates, -scores[candidates]))
+    candidates = candidates[order]
+    return candidates if k is None else candidates[:k]
+
+
 def get_recommended_courses(student_skills_and_knowledge, courses_data):
     """
     Parameters:
@@ -47,28 +243,21 @@ def get_recommended_courses(student_skills_and_knowledge, courses_data):
     """
     courses = combine_skills_and_knowledge(courses_data)
 
-    # Fit the TF-IDF vectorizer on all the combined data
-    all_text_data = [
-        " ".join(course["skills_and_knowledge_covered"].keys()) for course in courses
-    ]
-    tfidf = TfidfVectorizer()
-    tfidf.fit(all_text_data)
+    codes = list(range(len(courses)))
+    documents = {
+        code: count_terms(course["skills_and_knowledge_covered"])
+        for code, course in zip(codes, courses)
+    }
+    document_frequency = Counter()
+    for counts in documents.values():
+        document_frequency.update(counts.keys())
 
-    # Calculate cosine similarity between student skills and each course's skills
-    cosine_sims = []
-    student_skills_text = " ".join(student_skills_and_knowledge.keys())
-
-    for course in courses:
-        course_skills_text = " ".join(course["skills_and_knowledge_covered"].keys())
-        skills_matrix = tfidf.transform([student_skills_text, course_skills_text])
-        cosine_sim = linear_kernel(skills_matrix[0:1], skills_matrix[1:2])
-        cosine_sims.append(cosine_sim[0][0])
+    matrix, vocabulary, idf = build_tfidf_matrix(codes, documents, document_frequency)
+    scores = score_documents(matrix, vocabulary, idf, student_skills_and_knowledge)
 
     recommended_courses = {}
     for i, course in enumerate(courses):
-        course_name = course["course_name"]
-        cosine_sim = cosine_sims[i]
-        recommended_courses[course_name] = cosine_sim
+        recommended_courses[course["course_name"]] = float(scores[i])
 
     # Sort courses based on cosine similarity in descending order (most recommended first)
     sorted_courses = sorted(
@@ -76,3 +265,188 @@ def get_recommended_courses(student_skills_and_knowledge, courses_data):
     )
 
     return sorted_courses
+
+
+def load_course_model(courses_data):
+    """
+    Replace the persisted course model with the given catalog.
+
+    Parameters: List of dicts (courses_data) containing courses' name, skills and knowledge
+    as seperate fields in a dict, one per course code
+    """
+    documents = {}
+    for course in combine_skills_and_knowledge(courses_data):
+        documents[course["course_name"]] = count_terms(
+            course["skills_and_knowledge_covered"]
+        )
+    document_frequency = Counter()
+    for counts in documents.values():
+        document_frequency.update(counts.keys())
+
+    with course_model_lock:
+        course_model["documents"] = documents
+        course_model["document_frequency"] = document_frequency
+        course_model["dirty"] = set()
+        course_model["matrix"] = None
+        course_model["loaded"] = True
+
+
+def build_course_matrix():
+    """
+    Build the matrix of the persisted course model from every course. Called under the lock.
+    """
+    codes = list(course_model["documents"])
+    counts, vocabulary, frequencies = build_count_matrix(
+        codes, course_model["documents"], course_model["document_frequency"]
+    )
+    idf = get_idf(frequencies, len(codes))
+    course_model["codes"] = codes
+    course_model["rows"] = {code: row for row, code in enumerate(codes)}
+    course_model["vocabulary"] = vocabulary
+    course_model["frequencies"] = frequencies
+    course_model["idf"] = idf
+    course_model["norms"] = get_row_norms(counts, idf)
+    course_model.set_matrix(counts)
+
+
+def update_course_row(course_code, previous, counts):
+    """
+    Bring the course's row of the persisted matrix, and the idf weights and row norms, in
+    line with a write to the course. Called under the lock, once the documents and document
+    frequencies were updated.
+
+    The lists, dicts and arrays read by requests are replaced rather than changed, so a
+    request scoring the previous matrix outside the lock is not affected.
+
+    Parameters:
+    1. Course code
+    2. Counter of the course's previous term counts (None if it is new)
+    3. Counter of the course's new term counts (None if it was removed)
+    """
+    if not course_model.edit_matrix(len(course_model["codes"])):
+        return
+
+    codes = list(course_model["codes"])
+    rows = dict(course_model["rows"])
+    vocabulary = course_model["vocabulary"]
+    frequencies = course_model["frequencies"]
+    new_terms = [term for term in counts or () if term not in vocabulary]
+    if new_terms:
+        vocabulary = dict(vocabulary)
+        for term in new_terms:
+            vocabulary[term] = len(vocabulary)
+        frequencies = np.concatenate((frequencies, np.zeros(len(new_terms))))
+    else:
+        frequencies = frequencies.copy()
+    # Only the terms the course gained or lost change their document frequency
+    changed_terms = set(previous or ()) ^ set(counts or ())
+    for term in changed_terms:
+        frequencies[vocabulary[term]] = course_model["document_frequency"][term]
+
+    row = rows.get(course_code)
+    if row is None:
+        row = len(codes)
+        codes.append(course_code)
+        rows[course_code] = row
+    if counts is None:
+        # The row is left empty, and skipped by recommend_from_course_model
+        codes[row] = None
+        del rows[course_code]
+        counts = {}
+    matrix = set_matrix_row(
+        course_model["matrix"],
+        row,
+        [vocabulary[term] for term in counts],
+        list(counts.values()),
+        len(vocabulary),
+    )
+
+    idf = course_model["idf"]
+    if previous is not None and codes[row] is not None and not changed_terms:
+        # Same courses and document frequencies, so only this row's norm moves
+        norms = course_model["norms"].copy()
+        norms[row] = get_row_norms(matrix[row], idf)[0]
+    else:
+        # Every idf weight depends on the number of courses
+        idf = get_idf(frequencies, len(rows))
+        norms = get_row_norms(matrix, idf)
+
+    course_model["codes"] = codes
+    course_model["rows"] = rows
+    course_model["vocabulary"] = vocabulary
+    course_model["frequencies"] = frequencies
+    course_model["idf"] = idf
+    course_model["norms"] = norms
+    course_model["matrix"] = matrix
+
+
+def upsert_course_document(course_code, skills, knowledge):
+    """
+    Add a course to the persisted model, or replace its skills and knowledge.
+
+    Parameters:
+    1. Course code
+    2. Dict of the course's skills
+    3. Dict of the course's knowledge
+    """
+    counts = count_terms(set(skills) | set(knowledge))
+    with course_model_lock:
+        previous = course_model["documents"].get(course_code)
+        if previous is not None:
+            course_model["document_frequency"].subtract(previous.keys())
+        # Replacing the entry in place keeps the course's tie-breaking position
+        course_model["documents"][course_code] = counts
+        course_model["document_frequency"].update(counts.keys())
+        update_course_row(course_code, previous, counts)
+
+
+def remove_course_document(course_code):
+    """
+    Remove a course from the persisted model if it is present.
+
+    Parameters: Course code
+    """
+    with course_model_lock:
+        counts = course_model["documents"].pop(course_code, None)
+        if counts is None:
+            return
+        course_model["document_frequency"].subtract(counts.keys())
+        update_course_row(course_code, counts, None)
+
+
+def recommend_from_course_model(student_skills_and_knowledge, k=None, exclude_codes=()):
+    """
+    Score a student against the persisted course model.
+
+    Parameters:
+    1. Dict of student_skills_and_knowledge
+    2. Number of courses to return (None for all)
+    3. Iterable of course codes to leave out (e.g. completed courses)
+
+    Returns: List of (course code, cosine similarity) tuples in descending order of similarity,
+    ties keeping the order in which the courses were loaded
+    """
+    with course_model_lock:
+        if course_model["matrix"] is None:
+            build_course_matrix()
+        matrix = course_model["matrix"]
+        vocabulary = course_model["vocabulary"]
+        idf = course_model["idf"]
+        norms = course_model["norms"]
+        codes = course_model["codes"]
+        rows = course_model["rows"]
+
+    if not rows:
+        return []
+
+    query = get_query_vector(vocabulary, idf, student_skills_and_knowledge)
+    if query is None:
+        scores = np.zeros(len(codes))
+    else:
+        scores = (matrix @ (query * idf)) / norms
+    exclude_codes = set(exclude_codes)
+    exclude = np.array(
+        [code is None or code in exclude_codes for code in codes], dtype=bool
+    )
+
+    return [(codes[i], float(scores[i])) for i in top_k(scores, k, exclude)]
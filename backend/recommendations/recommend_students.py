@@ -5,9 +5,125 @@ Usage:
     - Import the module.
     - Use the get_recommended_students function with a dictionary of student profiles
     and a specific student's skills and knowledge as a dict.
+    - Or keep the cohort loaded with load_student_model and page through
+    recommend_from_student_model.
+
+All students are held in one sparse student-by-term matrix, so a request scores the whole
+cohort with a handful of sparse matrix-vector products instead of one cosine per pair. A
+profile edit only replaces that student's row of the persisted matrix.
 """
 
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from model_state import ModelState, set_matrix_row
+    from recommend_courses import top_k
+except ImportError:
+    from recommendations.model_state import ModelState, set_matrix_row
+    from recommendations.recommend_courses import top_k
+
+# Persisted cohort model shared by every request served by this process. Its dirty keys are
+# zIDs and its matrix is the result of build_student_matrix.
+student_model = ModelState(
+    "student",
+    profiles={},  # zID -> dict of skill and knowledge weights
+)
+student_model_lock = student_model.lock
+
+
+def build_student_matrix(student_profiles):
+    """
+    Build the sparse term-indexed matrices used to compare students.
+
+    Parameters:
+        - student_profiles (dict): A dictionary containing student IDs as keys and their skills and
+        knowledge in a dict as values.
+
+    Returns:
+        - dict: The student IDs in row order ("ids"), their row positions ("positions"), the
+        term -> column "vocabulary", the skill/knowledge weights ("weights"), the squared
+        weights ("squared"), a 0/1 matrix of which terms each student has ("presence") and the
+        rows of removed students ("removed"), left empty by update_student_row.
+    """
+    ids = list(student_profiles.keys())
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for student in ids:
+        for term, weight in student_profiles[student].items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(weight)
+        indptr.append(len(indices))
+
+    shape = (len(ids), len(vocabulary))
+    data = np.asarray(data, dtype=np.float64)
+    weights = csr_matrix((data, indices, indptr), shape=shape)
+    squared = csr_matrix((data**2, indices, indptr), shape=shape)
+    # A term with a weight of 0 still counts as a shared feature, so presence is kept apart
+    presence = csr_matrix((np.ones(len(data)), indices, indptr), shape=shape)
+
+    return {
+        "ids": ids,
+        "positions": {student: row for row, student in enumerate(ids)},
+        "vocabulary": vocabulary,
+        "weights": weights,
+        "squared": squared,
+        "presence": presence,
+        "removed": set(),
+    }
+
+
+def rank_students(student_matrix, z_id, offset=0, limit=None):
+    """
+    Rank every other student against one student.
+
+    Students sharing at least one feature come first, ordered by the cosine similarity of the
+    shared features only. The remaining students follow in their original order.
+
+    Parameters:
+        - student_matrix (dict): The matrices returned by build_student_matrix.
+        - z_id (int): The student ID for which recommendations are requested.
+        - offset (int): The number of ranked students to skip.
+        - limit (int): The maximum number of students to return, or None for all of them.
+
+    Returns:
+        - tuple: The page of recommended student IDs and the total number of other students.
+    """
+    ids = student_matrix["ids"]
+    row = student_matrix["positions"][z_id]
+    weights = student_matrix["weights"]
+    presence = student_matrix["presence"]
+
+    own_weights = weights[row].toarray().ravel()
+    own_presence = presence[row].toarray().ravel()
+
+    # Each product sums over the features a student shares with z_id
+    dots = weights @ own_weights
+    other_norms = student_matrix["squared"] @ own_presence
+    own_norms = presence @ own_weights**2
+    common = (presence @ own_presence) > 0
+    common[row] = False
+
+    norms = np.sqrt(other_norms * own_norms)
+    similarities = np.zeros(len(ids))
+    np.divide(dots, norms, out=similarities, where=norms > 0)
+
+    total = len(student_matrix["positions"]) - 1
+    end = total if limit is None else min(offset + limit, total)
+    if offset >= end:
+        return [], total
+
+    ranked = list(top_k(similarities, end, ~common))
+    if len(ranked) < end:
+        uncommon = np.flatnonzero(~common)
+        uncommon = uncommon[uncommon != row]
+        if student_matrix["removed"]:
+            uncommon = uncommon[~np.isin(uncommon, list(student_matrix["removed"]))]
+        ranked.extend(uncommon[: end - len(ranked)])
+
+    return [ids[i] for i in ranked[offset:end]], total
 
 
 def get_reccomended_students(student_profiles, z_id):
@@ -24,32 +140,129 @@ def get_reccomended_students(student_profiles, z_id):
         similar to least similar. The remaining students that have no similarity will be returned
         at the end of this list.
     """
+    recommended_students, _ = rank_students(
+        build_student_matrix(student_profiles), z_id
+    )
+    return recommended_students
+
+
+def load_student_model(student_profiles):
+    """
+    Replace the persisted cohort model.
+
+    Parameters:
+        - student_profiles (dict): A dictionary containing student IDs as keys and their skills and
+        knowledge in a dict as values.
+    """
+    with student_model_lock:
+        student_model["profiles"] = dict(student_profiles)
+        student_model["dirty"] = set()
+        student_model["matrix"] = None
+        student_model["loaded"] = True
+
+
+def update_student_row(z_id, profile):
+    """
+    Bring the student's row of the persisted matrices in line with a write to their profile.
+    Called under the lock. The matrices are replaced rather than changed, so a request
+    ranking the previous ones outside the lock is not affected.
+
+    Parameters:
+        - z_id (int): The student ID.
+        - profile (dict): The student's skill and knowledge weights, or None if they were
+        removed.
+    """
+    student_matrix = student_model["matrix"]
+    if student_matrix is None or not student_model.edit_matrix(
+        len(student_matrix["ids"])
+    ):
+        return
 
-    # Calculate cosine similarity between Student1 and other students
-    student1_profile = student_profiles[z_id]
-    similarities = {}
+    ids = list(student_matrix["ids"])
+    positions = dict(student_matrix["positions"])
+    vocabulary = student_matrix["vocabulary"]
+    removed = student_matrix["removed"]
+    new_terms = [term for term in profile or () if term not in vocabulary]
+    if new_terms:
+        vocabulary = dict(vocabulary)
+        for term in new_terms:
+            vocabulary[term] = len(vocabulary)
 
-    for student, profile in student_profiles.items():
-        if student != z_id:
-            common_features = set(student1_profile.keys()) & set(profile.keys())
-            if common_features:
-                features1 = [student1_profile[feature] for feature in common_features]
-                features2 = [profile[feature] for feature in common_features]
-                similarity = cosine_similarity([features1], [features2])[0][0]
-                similarities[student] = similarity
+    row = positions.get(z_id)
+    if row is None:
+        row = len(ids)
+        ids.append(z_id)
+        positions[z_id] = row
+    if profile is None:
+        ids[row] = None
+        del positions[z_id]
+        removed = removed | {row}
+        profile = {}
+    columns = [vocabulary[term] for term in profile]
+    data = np.asarray(list(profile.values()), dtype=np.float64)
 
-    # Sort students by similarity (higher values are more similar)
-    recommended_students = sorted(similarities, key=similarities.get, reverse=True)
+    student_model["matrix"] = {
+        "ids": ids,
+        "positions": positions,
+        "vocabulary": vocabulary,
+        "weights": set_matrix_row(
+            student_matrix["weights"], row, columns, data, len(vocabulary)
+        ),
+        "squared": set_matrix_row(
+            student_matrix["squared"], row, columns, data**2, len(vocabulary)
+        ),
+        "presence": set_matrix_row(
+            student_matrix["presence"],
+            row,
+            columns,
+            np.ones(len(data)),
+            len(vocabulary),
+        ),
+        "removed": removed,
+    }
 
-    # If no similarity, print all other students
-    if not recommended_students:
-        recommended_students = [
-            student for student in student_profiles if student != z_id
-        ]
 
-    if len(recommended_students) != len(student_profiles):
-        for key in student_profiles.keys():
-            if key not in recommended_students and key != z_id:
-                recommended_students.append(key)
+def upsert_student_profile(z_id, profile):
+    """
+    Add a student to the persisted cohort model, or replace their profile.
 
-    return recommended_students
+    Parameters:
+        - z_id (int): The student ID.
+        - profile (dict): The student's skill and knowledge weights.
+    """
+    with student_model_lock:
+        # Replacing the entry in place keeps the student's tie-breaking position
+        student_model["profiles"][z_id] = profile
+        update_student_row(z_id, profile)
+
+
+def remove_student_profile(z_id):
+    """
+    Remove a student from the persisted cohort model if they are present.
+
+    Parameters:
+        - z_id (int): The student ID.
+    """
+    with student_model_lock:
+        if student_model["profiles"].pop(z_id, None) is not None:
+            update_student_row(z_id, None)
+
+
+def recommend_from_student_model(z_id, offset=0, limit=None):
+    """
+    Rank the persisted cohort against one student.
+
+    Parameters:
+        - z_id (int): The student ID for which recommendations are requested.
+        - offset (int): The number of ranked students to skip.
+        - limit (int): The maximum number of students to return, or None for all of them.
+
+    Returns:
+        - tuple: The page of recommended student IDs and the total number of other students.
+    """
+    with student_model_lock:
+        if student_model["matrix"] is None:
+            student_model.set_matrix(build_student_matrix(student_model["profiles"]))
+        student_matrix = student_model["matrix"]
+
+    return rank_students(student_matrix, z_id, offset, limit)
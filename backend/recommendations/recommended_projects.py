@@ -1,17 +1,60 @@
 """
 This script provides project recommendations based on student skills and knowledge.
 
+Projects are also kept in a persisted index: each project's terms are canonicalised once, when
+the project is loaded or written, and the canonical vectors are held in one l2-normalised sparse
+project-by-term matrix. A student query is canonicalised against the same replaceable words and
+scored against every project with a single sparse matrix-vector product followed by a top-k
+selection, and a project write only replaces that project's row of the matrix. The canonical skill and knowledge sets of each project, and of recently seen student
+profiles, are kept too, so the missing terms of a student are a plain set difference.
 """
 
 import math
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix
 
 try:
-    from similar_words import get_replaceable_words, replace_similar_words_in_dict
+    from similar_words import (
+        SIMILARITY_THRESHOLD,
+        get_replaceable_words,
+        replace_similar_words_in_dict,
+        similarity_matrix,
+    )
 except ImportError:
     from recommendations.similar_words import (
+        SIMILARITY_THRESHOLD,
         get_replaceable_words,
         replace_similar_words_in_dict,
+        similarity_matrix,
     )
+try:
+    from model_state import ModelState, set_matrix_row
+    from recommend_courses import top_k
+except ImportError:
+    from recommendations.model_state import ModelState, set_matrix_row
+    from recommendations.recommend_courses import top_k
+
+# Persisted project index shared by every request served by this process. Its dirty keys are
+# project IDs and its matrix is the l2-normalised project-by-term matrix.
+project_model = ModelState(
+    "project",
+    replace_words=[],  # canonical terms, chosen from every project's terms at load time
+    canonical_terms={},  # term -> canonical term it is counted under, filled as seen
+    vectors={},  # project ID -> canonical dict of combined skill and knowledge weights
+    ids=[],  # project ID of each matrix row, None for removed projects
+    rows={},  # project ID -> matrix row
+    vocabulary={},  # canonical term -> matrix column
+    term_sets={},  # project ID -> canonical skill and knowledge sets, see get_term_sets
+    generation=0,  # bumped whenever the replaceable words change
+)
+project_model_lock = project_model.lock
+
+STUDENT_TERM_SETS_SIZE = 1024
+
+# Canonical term sets of recently seen student profiles, least recently used first
+student_term_sets = OrderedDict()  # zID -> (generation, profile terms, canonical terms)
 
 
 def cosine_similarity(vector1, vector2):
@@ -167,3 +210,392 @@ def get_percentage_match(skills_knowledge_size, missing_size):
 
     """
     return round(100 * (1 - missing_size / skills_knowledge_size))
+
+
+def combine_project_terms(skills, knowledge):
+    """
+    Combine skills and knowledge into one vector, adding the weights of shared terms.
+
+    Parameters:
+        - skills (dict): The skill weights.
+        - knowledge (dict): The knowledge weights.
+
+    Returns:
+        - dict: The combined weights.
+    """
+    return {
+        term: (skills.get(term, 0) + knowledge.get(term, 0))
+        for term in set(skills) | set(knowledge)
+    }
+
+
+def canonicalise_vector(vector, replace_words, canonical_terms):
+    """
+    Count every term of a vector under its canonical term, the first replaceable word it is
+    similar to, exactly as replace_similar_words_in_dict does.
+
+    Parameters:
+        - vector (dict): Term weights.
+        - replace_words (list): The replaceable words of the index.
+        - canonical_terms (dict): The canonical term of every term seen so far, updated with
+        the terms of this vector so each term is only compared once.
+
+    Returns:
+        - dict: The weights keyed by canonical term, summed where terms share one.
+    """
+    missing = [term for term in vector if term not in canonical_terms]
+    if missing:
+        found = {term: term for term in missing}
+        if replace_words:
+            matches = similarity_matrix(missing, replace_words) > SIMILARITY_THRESHOLD
+            for row, term in enumerate(missing):
+                if matches[row].any():
+                    # The first replaceable word above the threshold wins
+                    found[term] = replace_words[int(np.argmax(matches[row]))]
+        canonical_terms.update(found)
+
+    canonical = {}
+    for term, weight in vector.items():
+        canonical_term = canonical_terms[term]
+        canonical[canonical_term] = canonical.get(canonical_term, 0) + weight
+    return canonical
+
+
+def get_term_sets(skills, knowledge, replace_words, canonical_terms):
+    """
+    Canonicalise a project's skills and knowledge into the sets missing terms are taken from.
+
+    Parameters:
+        - skills (dict): The project's skill weights.
+        - knowledge (dict): The project's knowledge weights.
+        - replace_words (list): The replaceable words of the index.
+        - canonical_terms (dict): The canonical term cache of the index.
+
+    Returns:
+        - dict: The canonical "skills" and "knowledge" frozensets, and the "size" the match
+        percentage is taken over, i.e. the number of skills plus the number of knowledge terms.
+    """
+    return {
+        "skills": frozenset(canonicalise_vector(skills, replace_words, canonical_terms)),
+        "knowledge": frozenset(
+            canonicalise_vector(knowledge, replace_words, canonical_terms)
+        ),
+        "size": len(skills) + len(knowledge),
+    }
+
+
+def build_project_matrix(ids, vectors):
+    """
+    Build the l2-normalised sparse matrix the projects are scored with.
+
+    Parameters:
+        - ids (list): The project IDs, one per matrix row.
+        - vectors (dict): Maps each project ID to its canonical term weights.
+
+    Returns:
+        - tuple: The project-by-term csr_matrix and the term -> column vocabulary.
+    """
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for project_ID in ids:
+        for term, weight in vectors[project_ID].items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(weight)
+        indptr.append(len(indices))
+
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), indices, indptr),
+        shape=(len(ids), len(vocabulary)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = csr_matrix(matrix.multiply(1 / norms[:, np.newaxis]))
+
+    return matrix, vocabulary
+
+
+def load_project_model(projects):
+    """
+    Replace the persisted project index, choosing the replaceable words from the terms of
+    every project.
+
+    Parameters:
+        - projects (dict): Maps each project ID to a dict with its "skills" and "knowledge"
+        weights, in the order ties should be broken.
+    """
+    vectors = {
+        project_ID: combine_project_terms(weights["skills"], weights["knowledge"])
+        for project_ID, weights in projects.items()
+    }
+    all_terms = set()
+    for vector in vectors.values():
+        all_terms.update(vector)
+    replace_words = get_replaceable_words(sorted(all_terms))
+    canonical_terms = {}
+    canonical_vectors = {
+        project_ID: canonicalise_vector(vector, replace_words, canonical_terms)
+        for project_ID, vector in vectors.items()
+    }
+    term_sets = {
+        project_ID: get_term_sets(
+            weights["skills"], weights["knowledge"], replace_words, canonical_terms
+        )
+        for project_ID, weights in projects.items()
+    }
+
+    with project_model_lock:
+        project_model["replace_words"] = replace_words
+        project_model["canonical_terms"] = canonical_terms
+        project_model["vectors"] = canonical_vectors
+        project_model["term_sets"] = term_sets
+        project_model["generation"] += 1
+        project_model["dirty"] = set()
+        project_model["matrix"] = None
+        project_model["loaded"] = True
+
+
+def get_canonical_terms():
+    """
+    Take what new terms are canonicalised with outside the lock. The canonical term cache is
+    copied, so the language model runs without holding the lock and the shared cache is only
+    written under it, by keep_canonical_terms.
+
+    Returns:
+        - tuple: The index generation, its replaceable words and a copy of its canonical term
+        cache.
+    """
+    with project_model_lock:
+        return (
+            project_model["generation"],
+            project_model["replace_words"],
+            dict(project_model["canonical_terms"]),
+        )
+
+
+def keep_canonical_terms(generation, canonical_terms):
+    """
+    Store the terms canonicalised on a copy taken with get_canonical_terms, unless the
+    replaceable words were chosen again in the meantime.
+
+    Parameters:
+        - generation (int): The index generation the copy was taken at.
+        - canonical_terms (dict): The copy, updated with the new terms.
+    """
+    with project_model_lock:
+        if project_model["generation"] == generation:
+            project_model["canonical_terms"].update(canonical_terms)
+
+
+def update_project_row(project_ID, vector):
+    """
+    Bring the project's row of the persisted matrix in line with a write to the project.
+    Called under the lock. The matrix, IDs and vocabulary are replaced rather than changed,
+    so a request scoring the previous ones outside the lock is not affected.
+
+    Parameters:
+        - project_ID (int): The project ID.
+        - vector (dict): The project's canonical term weights, or None if it was removed.
+    """
+    if not project_model.edit_matrix(len(project_model["ids"])):
+        return
+
+    ids = list(project_model["ids"])
+    rows = dict(project_model["rows"])
+    vocabulary = project_model["vocabulary"]
+    new_terms = [term for term in vector or () if term not in vocabulary]
+    if new_terms:
+        vocabulary = dict(vocabulary)
+        for term in new_terms:
+            vocabulary[term] = len(vocabulary)
+
+    row = rows.get(project_ID)
+    if row is None:
+        row = len(ids)
+        ids.append(project_ID)
+        rows[project_ID] = row
+    if vector is None:
+        # The row is left empty, and skipped by recommend_from_project_model
+        ids[row] = None
+        del rows[project_ID]
+        vector = {}
+    norm = math.sqrt(sum(weight**2 for weight in vector.values())) or 1
+
+    project_model["matrix"] = set_matrix_row(
+        project_model["matrix"],
+        row,
+        [vocabulary[term] for term in vector],
+        [weight * (1 / norm) for weight in vector.values()],
+        len(vocabulary),
+    )
+    project_model["ids"] = ids
+    project_model["rows"] = rows
+    project_model["vocabulary"] = vocabulary
+
+
+def upsert_project_vector(project_ID, skills, knowledge):
+    """
+    Add a project to the persisted index, or replace its skills and knowledge.
+
+    Parameters:
+        - project_ID (int): The project ID.
+        - skills (dict): The project's skill weights.
+        - knowledge (dict): The project's knowledge weights.
+    """
+    generation, replace_words, canonical_terms = get_canonical_terms()
+    vector = canonicalise_vector(
+        combine_project_terms(skills, knowledge), replace_words, canonical_terms
+    )
+    term_sets = get_term_sets(skills, knowledge, replace_words, canonical_terms)
+    keep_canonical_terms(generation, canonical_terms)
+    with project_model_lock:
+        # Replacing the entry in place keeps the project's tie-breaking position
+        project_model["vectors"][project_ID] = vector
+        project_model["term_sets"][project_ID] = term_sets
+        update_project_row(project_ID, vector)
+
+
+def remove_project_vector(project_ID):
+    """
+    Remove a project from the persisted index if it is present.
+
+    Parameters:
+        - project_ID (int): The project ID.
+    """
+    with project_model_lock:
+        project_model["term_sets"].pop(project_ID, None)
+        if project_model["vectors"].pop(project_ID, None) is not None:
+            update_project_row(project_ID, None)
+
+
+def recommend_from_project_model(student_skills, student_knowledge, k=None):
+    """
+    Score a student against the persisted project index.
+
+    Parameters:
+        - student_skills (dict): The student's skill weights.
+        - student_knowledge (dict): The student's knowledge weights.
+        - k (int): The number of projects to return, or None for all of them.
+
+    Returns:
+        - list: (project ID, cosine similarity) tuples from most to least similar, ties keeping
+        the order in which the projects were loaded.
+    """
+    with project_model_lock:
+        if project_model["matrix"] is None:
+            ids = list(project_model["vectors"])
+            matrix, project_model["vocabulary"] = build_project_matrix(
+                ids, project_model["vectors"]
+            )
+            project_model["ids"] = ids
+            project_model["rows"] = {
+                project_ID: row for row, project_ID in enumerate(ids)
+            }
+            project_model.set_matrix(matrix)
+        matrix = project_model["matrix"]
+        vocabulary = project_model["vocabulary"]
+        ids = project_model["ids"]
+        rows = project_model["rows"]
+
+    if not rows:
+        return []
+
+    generation, replace_words, canonical_terms = get_canonical_terms()
+    student_vector = canonicalise_vector(
+        combine_project_terms(student_skills, student_knowledge),
+        replace_words,
+        canonical_terms,
+    )
+    keep_canonical_terms(generation, canonical_terms)
+    query = np.zeros(len(vocabulary))
+    for term, weight in student_vector.items():
+        if term in vocabulary:
+            query[vocabulary[term]] = weight
+    # Terms no project has still count towards the student's magnitude
+    norm = math.sqrt(sum(weight**2 for weight in student_vector.values()))
+    if norm == 0:
+        scores = np.zeros(len(ids))
+    else:
+        scores = matrix @ (query / norm)
+
+    exclude = None
+    if len(rows) < len(ids):
+        exclude = np.array([project_ID is None for project_ID in ids], dtype=bool)
+
+    return [(ids[i], float(scores[i])) for i in top_k(scores, k, exclude)]
+
+
+def get_student_term_set(z_id, student_skills, student_knowledge):
+    """
+    Look up the canonical terms of a student's profile, canonicalising them on a miss.
+
+    An entry is keyed by the student's current skill and knowledge terms, so it is replaced as
+    soon as their profile changes, and by the index generation, so it is replaced whenever the
+    replaceable words are chosen again.
+
+    Parameters:
+        - z_id (int): The student ID.
+        - student_skills (dict): The student's skill weights.
+        - student_knowledge (dict): The student's knowledge weights.
+
+    Returns:
+        - frozenset: The canonical terms of the student's skills and knowledge.
+    """
+    profile_terms = frozenset(student_skills) | frozenset(student_knowledge)
+    with project_model_lock:
+        entry = student_term_sets.get(z_id)
+        if entry is not None and entry[:2] == (project_model["generation"], profile_terms):
+            student_term_sets.move_to_end(z_id)
+            return entry[2]
+        generation, replace_words, canonical_terms = get_canonical_terms()
+
+    canonical = frozenset(
+        canonicalise_vector(
+            dict.fromkeys(profile_terms, 0), replace_words, canonical_terms
+        )
+    )
+    keep_canonical_terms(generation, canonical_terms)
+    with project_model_lock:
+        student_term_sets[z_id] = (generation, profile_terms, canonical)
+        student_term_sets.move_to_end(z_id)
+        while len(student_term_sets) > STUDENT_TERM_SETS_SIZE:
+            student_term_sets.popitem(last=False)
+    return canonical
+
+
+def get_project_match(project_ID, z_id, student_skills, student_knowledge):
+    """
+    Work out what a student is missing for a project from the cached canonical term sets,
+    without running the language model for anything seen before.
+
+    Parameters:
+        - project_ID (int): The project ID.
+        - z_id (int): The student ID.
+        - student_skills (dict): The student's skill weights.
+        - student_knowledge (dict): The student's knowledge weights.
+
+    Returns:
+        - dict or None: The sorted "missingSkills" and "missingKnowledge" and the
+        "percentageMatch", or None if the project is not in the index.
+    """
+    with project_model_lock:
+        term_sets = project_model["term_sets"].get(project_ID)
+    if term_sets is None:
+        return None
+
+    student_terms = get_student_term_set(z_id, student_skills, student_knowledge)
+    missing_skills = term_sets["skills"] - student_terms
+    missing_knowledge = term_sets["knowledge"] - student_terms
+    if term_sets["size"] == 0:
+        percentage_match = 100
+    else:
+        percentage_match = get_percentage_match(
+            term_sets["size"], len(missing_skills) + len(missing_knowledge)
+        )
+
+    return {
+        "missingSkills": sorted(missing_skills),
+        "missingKnowledge": sorted(missing_knowledge),
+        "percentageMatch": percentage_match,
+    }
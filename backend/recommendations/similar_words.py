@@ -3,9 +3,87 @@ Functions for processing and analyzing textual data, including word similarity,
 common word identification, and replacement of similar words.
 """
 
-import spacy
+import threading
 
-nlp = spacy.load("en_core_web_lg")
+import numpy as np
+
+from language_models.registry import get_spacy_model
+
+SIMILARITY_THRESHOLD = 0.8
+
+# Phrase-vector index shared by every request served by this process. Each
+# distinct phrase maps to (token orths, unit-length vector) and is only ever
+# embedded once.
+phrase_index = {}
+phrase_index_lock = threading.Lock()
+
+
+def index_phrases(phrases):
+    """
+    Embed any phrases that are not yet in the phrase-vector index.
+
+    Parameters:
+        - phrases (iterable): The phrases that are about to be compared.
+
+    Note:
+        - Only the tokenizer and the static word vectors are used, so the tagger, parser and
+        NER components of the pipeline never run. The document vector of a tokenized phrase
+        is the mean of its word vectors, which is exactly what spaCy compares in
+        Doc.similarity.
+    """
+    missing = [phrase for phrase in set(phrases) if phrase not in phrase_index]
+    if not missing:
+        return
+
+    nlp = get_spacy_model()
+    entries = {}
+    for phrase, doc in zip(missing, nlp.tokenizer.pipe(missing)):
+        vector = np.zeros(nlp.vocab.vectors_length, dtype=np.float32)
+        if doc.has_vector:
+            norm = np.linalg.norm(doc.vector)
+            if norm > 0:
+                vector = (doc.vector / norm).astype(np.float32)
+        entries[phrase] = (tuple(token.orth for token in doc), vector)
+
+    with phrase_index_lock:
+        phrase_index.update(entries)
+
+
+def similarity_matrix(phrases1, phrases2):
+    """
+    Calculate the semantic similarity of every phrase in one list against every phrase in
+    another with a single matrix multiply over the phrase-vector index.
+
+    Parameters:
+        - phrases1 (list): The phrases making up the rows of the result.
+        - phrases2 (list): The phrases making up the columns of the result.
+
+    Returns:
+        - numpy.ndarray: A len(phrases1) x len(phrases2) matrix where entry [i, j] is the value
+        calculate_similarity(phrases1[i], phrases2[j]) would return.
+    """
+    phrases1 = list(phrases1)
+    phrases2 = list(phrases2)
+    index_phrases(phrases1 + phrases2)
+
+    entries1 = [phrase_index[phrase] for phrase in phrases1]
+    entries2 = [phrase_index[phrase] for phrase in phrases2]
+    dimensions = get_spacy_model().vocab.vectors_length
+    matrix1 = np.array([vector for _, vector in entries1]).reshape(-1, dimensions)
+    matrix2 = np.array([vector for _, vector in entries2]).reshape(-1, dimensions)
+
+    similarities = matrix1 @ matrix2.T
+
+    # spaCy reports token-for-token identical docs as identical regardless of their vectors
+    columns_by_tokens = {}
+    for column, (tokens, vector) in enumerate(entries2):
+        if vector.any():
+            columns_by_tokens.setdefault(tokens, []).append(column)
+    for row, (tokens, vector) in enumerate(entries1):
+        if vector.any() and tokens in columns_by_tokens:
+            similarities[row, columns_by_tokens[tokens]] = 1.0
+
+    return similarities
 
 
 def calculate_similarity(phrase1, phrase2):
@@ -23,13 +101,9 @@ def calculate_similarity(phrase1, phrase2):
     Note:
         - The function uses spaCy's pre-trained word vectors to capture semantic information.
         - If either of the input phrases lacks word vectors, the function returns 0.0.
+        - Prefer similarity_matrix when comparing many phrases at once.
     """
-    doc1 = nlp(phrase1)
-    doc2 = nlp(phrase2)
-
-    if doc1.has_vector and doc2.has_vector:
-        return doc1.similarity(doc2)
-    return 0.0
+    return float(similarity_matrix([phrase1], [phrase2])[0, 0])
 
 
 def has_common_word(phrase1, phrase2):
@@ -70,14 +144,16 @@ def replace_similar_words_in_dict(input_dict, keywords):
 
     """
 
+    keys = list(input_dict.keys())
+    keywords = list(keywords)
+    matches = similarity_matrix(keys, keywords) > SIMILARITY_THRESHOLD
+
     updated_dict = {}
-    for key, value in input_dict.items():
+    for row, (key, value) in enumerate(input_dict.items()):
         updated_key = key  # Initialize updated_key with the original key
-        for keyword in keywords:
-            similarity = calculate_similarity(key, keyword)
-            if similarity > 0.8:
-                updated_key = keyword
-                break
+        if matches[row].any():
+            # The first keyword above the threshold wins
+            updated_key = keywords[int(np.argmax(matches[row]))]
 
         # Combine values if the updated_key already exists in the updated_dict
         if updated_key in updated_dict:
@@ -138,9 +214,9 @@ def check_duplicates_in_replace_words(replace_words, word1, remove_dups):
 
     """
 
-    for word in replace_words:
-        similarity2 = calculate_similarity(word, word1)
-        if similarity2 > 0.8:
+    similarities = similarity_matrix(replace_words, [word1])[:, 0]
+    for word, similarity2 in zip(replace_words, similarities):
+        if similarity2 > SIMILARITY_THRESHOLD:
             if len(word) > len(word1):
                 remove_dups.append(word)
             else:
@@ -174,24 +250,34 @@ def get_replaceable_words(project_data, student_skills=None, student_knowledge=N
     else:
         all_words = project_data
 
-    replace_words = []
-    remove_dups = []
-
-    for word1 in all_words:
-        for word2 in all_words:
-            similarity = calculate_similarity(word1, word2)
-            if word1 != word2:
-                if (
-                    similarity > 0.8
-                    and word1 not in replace_words
-                    and word2 not in replace_words
-                    and has_common_word(word1, word2)
-                ):
-                    remove_dups = check_duplicates_in_replace_words(
-                        replace_words, word1, remove_dups
-                    )
-                    replace_words.append(word1)
-
-    replace_words = [word for word in replace_words if word not in remove_dups]
-
-    return replace_words
+    all_words = list(all_words)
+    # Every pairwise similarity comes from this one matrix multiply
+    similarities = similarity_matrix(all_words, all_words)
+    similar = similarities > SIMILARITY_THRESHOLD
+
+    replace_indices = []
+    replace_words = set()
+    remove_dups = set()
+
+    for i, word1 in enumerate(all_words):
+        if word1 in replace_words:
+            continue
+        for j in np.flatnonzero(similar[i]):
+            word2 = all_words[j]
+            if (
+                word1 != word2
+                and word2 not in replace_words
+                and has_common_word(word1, word2)
+            ):
+                # Of two similar replaceable words keep the shorter one
+                for k in replace_indices:
+                    if similar[k, i]:
+                        word = all_words[k]
+                        remove_dups.add(word if len(word) > len(word1) else word1)
+                replace_indices.append(i)
+                replace_words.add(word1)
+                break
+
+    return [
+        all_words[k] for k in replace_indices if all_words[k] not in remove_dups
+    ]
@@ -448,6 +448,67 @@ def test_successful_project_list(client):
         clear_project()
 
 
+def test_paginated_project_list(client):
+    """
+    Test paging through, filtering and exporting the project list.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        data = {"email": "banana@gmail.com", "password": "banana"}
+        response = client.post("/login", json=data)
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+        zid = User.query.filter_by(email="banana@gmail.com").first().zID
+
+        for name in ["Test Project 1", "Test Project 2", "Other Project"]:
+            add_dummy_project_to_db(
+                name, "Test Client", "{}", "Test Thumbnail", "Test Scope", "[]", zid
+            )
+
+        response = client.get("/admin/all-projects?limit=2", headers=headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [project["projectName"] for project in data["projects"]] == [
+            "Test Project 1",
+            "Test Project 2",
+        ]
+        assert data["nextCursor"] == data["projects"][-1]["id"]
+
+        response = client.get(
+            f"/admin/all-projects?limit=2&after={data['nextCursor']}", headers=headers
+        )
+        data = response.get_json()
+        assert [project["projectName"] for project in data["projects"]] == [
+            "Other Project"
+        ]
+        assert data["nextCursor"] is None
+
+        response = client.get("/admin/all-projects?search=Test", headers=headers)
+        assert len(response.get_json()["projects"]) == 2
+
+        # Exports stream every matching project, one JSON object per line
+        response = client.get("/admin/all-projects?format=ndjson&limit=1", headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["projectName"] for line in lines] == [
+            "Test Project 1",
+            "Test Project 2",
+            "Other Project",
+        ]
+
+        response = client.get("/admin/all-projects?limit=0", headers=headers)
+        assert response.status_code == 400
+
+        clear_project()
+
+
 def test_successful_admin_dashboard(client):
     """
     Test the successful retrieval of the admin dashboard information.
@@ -517,6 +578,8 @@ def test_successful_admin_dashboard(client):
         assert data["dashboard"]["userCount"]["admin"] == 1
         assert data["dashboard"]["courseCount"] == 0
         assert data["dashboard"]["projectCount"] == 2
+        # Neither project is attached to a course, so no school has any
+        assert data["dashboard"]["schoolCount"] == []
 
         clear_project()
 
@@ -589,6 +652,82 @@ def test_course_delete(client):
         clear_project()
 
 
+def test_course_delete_dry_run(client):
+    """
+    Test that a dry run reports the rows a course deletion would affect without deleting
+    anything, that a dryRun which is not a JSON boolean is refused, and that the deletion
+    then keeps the attached project.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        data = {"email": "banana@gmail.com", "password": "banana"}
+        response = client.post("/login", json=data)
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+        zid = User.query.filter_by(email="banana@gmail.com").first().zID
+
+        course = add_dummy_course_to_db(
+            "COMP9900", "Capstone Project", "School of Computer Science and Engineering"
+        )
+        courseID = course.ID
+        assign_course_to_academic(courseID, zid)
+        project = add_dummy_project_to_db(
+            "Test Project1", "Test Client", "{}", "Test Thumbnail", "Test Scope", "[]", zid
+        )
+        project.course = courseID
+        db.session.commit()
+        projectID = project.ID
+        course_data = {"courseCode": "COMP9900", "yearDate": 2022, "term": "T2"}
+
+        # bool("false") is True, so this used to be taken as a dry run
+        response = client.delete(
+            "/admin/course/delete",
+            headers=headers,
+            json=dict(course_data, dryRun="false"),
+        )
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "dryRun must be a boolean."}
+        assert Course.query.filter_by(ID=courseID).count() == 1
+
+        response = client.delete(
+            "/admin/course/delete",
+            headers=headers,
+            json=dict(course_data, dryRun=True),
+        )
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "dryRun": True,
+            "affected": {
+                "courses": 1,
+                "courseArchives": 0,
+                "enrolments": 1,
+                "users": 1,
+                "detachedProjects": 1,
+            },
+        }
+        assert Course.query.filter_by(ID=courseID).count() == 1
+        assert CourseEnrolment.query.filter_by(course=courseID).count() == 1
+
+        delete_courseEnrolment(courseID)
+        response = client.delete(
+            "/admin/course/delete",
+            headers=headers,
+            json=dict(course_data, dryRun=False),
+        )
+        assert response.status_code == 200
+        assert response.get_json()["affected"]["detachedProjects"] == 1
+        assert Course.query.filter_by(ID=courseID).count() == 0
+        assert db.session.get(Project, projectID).course is None
+
+        clear_project()
+
+
 def test_project_delete(client):
     """
     Test the deletion of a project by an admin.
@@ -644,6 +783,63 @@ def test_project_delete(client):
         assert len(data["projects"]) == 0
 
 
+def test_project_delete_dry_run(client):
+    """
+    Test that a dry run reports the rows a project deletion would affect without deleting
+    anything, and that the deletion then removes every group and member at once.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        data = {"email": "banana@gmail.com", "password": "banana"}
+        response = client.post("/login", json=data)
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+        zid = User.query.filter_by(email="banana@gmail.com").first().zID
+
+        project = add_dummy_project_to_db(
+            "Test Project1", "Test Client", "{}", "Test Thumbnail", "Test Scope", "[]", zid
+        )
+        projectID = project.ID
+        for number in range(3):
+            group = Group(groupName=f"Test Group {number}", project=projectID)
+            db.session.add(group)
+            db.session.commit()
+            db.session.add(GroupMember(groupID=group.ID, student=zid))
+            db.session.commit()
+
+        response = client.delete(
+            "/admin/project/delete",
+            headers=headers,
+            json={"ID": projectID, "dryRun": True},
+        )
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "dryRun": True,
+            "affected": {"projects": 1, "groups": 3, "groupMembers": 3},
+        }
+        assert check_project_count() == 1
+        assert check_group_count() == 3
+
+        response = client.delete(
+            "/admin/project/delete", headers=headers, json={"ID": projectID}
+        )
+        assert response.status_code == 200
+        assert response.get_json()["affected"] == {
+            "projects": 1,
+            "groups": 3,
+            "groupMembers": 3,
+        }
+        assert check_project_count() == 0
+        assert check_group_count() == 0
+        assert GroupMember.query.count() == 0
+
+
 def test_group_delete(client):
     """
     Test the deletion of a group by an admin.
@@ -779,3 +975,28 @@ def test_student_project_list(client):
 
         # Delete the user from the database
         clear_project()
+
+
+def test_database_pool_stats(client):
+    """
+    Test the retrieval of the database connection pool counters.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        data = {"email": "banana@gmail.com", "password": "banana"}
+        response = client.post("/login", json=data)
+        assert response.status_code == 200
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {response.get_json().get('token')}",
+        }
+
+        response = client.get("/admin/database-pool", headers=headers)
+        assert response.status_code == 200
+        pool = response.get_json()["pool"]
+        assert pool["size"] == app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"]
+        assert pool["checkouts"] > 0
+        assert pool["checkedOut"] <= pool["size"] + pool["overflow"]
+        assert pool["timeouts"] == 0
@@ -0,0 +1,44 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+import pytest
+from app.__init__ import PROFILES, create_app
+
+
+def test_scraper_profile_only_serves_jobs():
+    """
+    Test that a scraper process only registers the jobs blueprint and is sized by its
+    profile.
+    """
+    scraper = create_app({"APP_PROFILE": "scraper", "APP_SERVICES": []})
+    assert set(scraper.blueprints) == {"jobs"}
+    assert scraper.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == (
+        PROFILES["scraper"]["DB_POOL_SIZE"]
+    )
+
+    client = scraper.test_client()
+    assert client.get("/jobs").status_code == 401
+    assert client.post("/login", json={}).status_code == 404
+
+
+def test_api_profile_serves_every_blueprint():
+    """
+    Test that an api process registers every blueprint without running scrape jobs.
+    """
+    api = create_app({"APP_PROFILE": "api"})
+    assert set(api.blueprints) == {"profile", "course", "projects", "admin", "jobs"}
+    assert api.config["APP_SERVICES"] == []
+
+
+def test_unknown_profile():
+    """
+    Test that an unknown profile or blueprint is refused.
+    """
+    with pytest.raises(ValueError):
+        create_app({"APP_PROFILE": "unknown"})
+    with pytest.raises(ValueError):
+        create_app({"APP_PROFILE": "api", "APP_BLUEPRINTS": ["unknown"]})
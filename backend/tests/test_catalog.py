@@ -0,0 +1,108 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+import csv
+import pytest
+from app.app import app
+from app.catalog import CATALOG_COLUMNS, import_catalog
+from app.models import db, Course
+from app.term_weights import get_course_terms
+
+
+def write_catalog(path, rows):
+    """
+    Write a catalog CSV with the columns of the scraped catalog.
+
+    Parameters:
+    - path (str): Where to write the CSV.
+    - rows (list): A dict per course, missing columns are left empty.
+    """
+    with open(path, "w", newline="") as catalog:
+        writer = csv.DictWriter(catalog, fieldnames=CATALOG_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def get_catalog_row(code, name, skills):
+    """
+    Build a catalog row of a T3 2023 offering.
+    """
+    return {
+        "Course Code": code,
+        "Course Name": name,
+        "Course Description": "Test Description",
+        "Skills": skills,
+        "Knowledge": "{'python': 2}",
+        "topics": "No Information about Topics",
+        "Year": "2023",
+        "Term": "T3",
+        "Date Scraped": "2023-10-23 22:55:56",
+    }
+
+
+def delete_courses(codes):
+    """
+    Delete every offering of some course codes, and with them their term weights.
+    """
+    Course.query.filter(Course.courseCode.in_(codes)).delete()
+    db.session.commit()
+
+
+def test_import_catalog_upserts_and_reports_errors(tmp_path):
+    """
+    Test that a catalog import writes the valid rows, reports the rejected ones, and
+    updates the offerings it already holds when it is imported again.
+    """
+    with app.app_context():
+        codes = ["ZZZZ9991", "ZZZ9992", "ZZZZ9993"]
+        delete_courses(codes)
+
+        catalog_path = str(tmp_path / "catalog.csv")
+        report_path = str(tmp_path / "errors.csv")
+        write_catalog(
+            catalog_path,
+            [
+                get_catalog_row("ZZZZ9991", "Test Course", "{'essay writing': 3}"),
+                get_catalog_row("ZZZ9992", "Bad Code", "{}"),
+                get_catalog_row("ZZZZ9993", "Bad Skills", "not a dict"),
+            ],
+        )
+
+        summary = import_catalog(db.engine, catalog_path, report_path=report_path)
+        assert summary == {"rows": 3, "loaded": 1, "rejected": 2}
+        with open(report_path, newline="") as report:
+            errors = list(csv.DictReader(report))
+        assert [(error["row"], error["error"]) for error in errors] == [
+            ("2", "Invalid course code"),
+            ("3", "Skills are not a JSON object"),
+        ]
+
+        course = Course.query.filter_by(courseCode="ZZZZ9991").one()
+        courseID = course.ID
+        assert course.courseName == "Test Course"
+        assert course.topics == "[]"
+        assert get_course_terms([courseID])[courseID] == {
+            "skills": {"essay writing": 3},
+            "knowledge": {"python": 2},
+        }
+
+        # Importing the offering again updates it in place
+        write_catalog(
+            catalog_path,
+            [get_catalog_row("ZZZZ9991", "Renamed Course", "{'public speaking': 1}")],
+        )
+        summary = import_catalog(db.engine, catalog_path)
+        assert summary == {"rows": 1, "loaded": 1, "rejected": 0}
+
+        db.session.expire_all()
+        course = Course.query.filter_by(courseCode="ZZZZ9991").one()
+        assert course.ID == courseID
+        assert course.courseName == "Renamed Course"
+        assert get_course_terms([courseID])[courseID]["skills"] == {"public speaking": 1}
+
+        delete_courses(codes)
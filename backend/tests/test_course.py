@@ -12,6 +12,7 @@ import json
 import pytest
 from app.app import app
 from app.models import db, User, UserCode, Course, CourseArchive, CourseEnrolment
+from app.course_cache import get_course_cache_stats
 
 
 @pytest.fixture
@@ -893,3 +894,72 @@ def test_missing_fields_update_course_info(client):
         delete_courseEnrolment(course.ID)
         delete_course("COMP9900")
         delete_user(zID="1234567")
+
+
+def test_course_cache_invalidated_on_edit(client):
+    """
+    Test that repeated course detail requests are served from the cache and that editing
+    the course drops the cached response.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_course("COMP9900")
+        delete_user(zID="1234567")
+        # Add user to DB
+        add_academic_user_to_db(
+            "Evan", "Li", "1234567", "z1234567@ad.unsw.edu.au", "Lyz1234567", 1
+        )
+
+        # Define user login data
+        login_data = {"email": "z1234567@ad.unsw.edu.au", "password": "Lyz1234567"}
+
+        # Add the same user to DB using register
+        response = client.post("/login", json=login_data)
+
+        # Get headers
+        responseData = response.get_json()
+        access_token = responseData.get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+
+        course = add_dummy_course_to_db(
+            "COMP9900", "Capstone Project", "School of Computer Science and Engineering"
+        )
+
+        response = client.get(f"/courses/COMP9900", headers=headers)
+        assert response.get_json()["name"] == "Capstone Project"
+        hits = get_course_cache_stats()["hits"]
+        response = client.get(f"/courses/COMP9900", headers=headers)
+        assert response.get_json()["name"] == "Capstone Project"
+        assert get_course_cache_stats()["hits"] == hits + 1
+
+        newInfo = {
+            "name": "cs",
+            "code": "COMP9900",
+            "year": "2022",
+            "term": "T2",
+            "description": "cse",
+            "skills": "c",
+            "topics": "12345",
+            "knowledge": "java",
+            "thumbnail": "null",
+            "revision": datetime.now(),
+            "school": "School of Computer Science and Engineering",
+        }
+        response = client.put(
+            f"/courses/{course.courseCode}/{course.yearDate}/{course.term}",
+            headers=headers,
+            json=newInfo,
+        )
+        assert response.status_code == 200
+
+        response = client.get(f"/courses/COMP9900", headers=headers)
+        assert response.get_json()["name"] == "cs"
+        assert response.get_json()["currentVersion"] == 2
+
+        delete_course("COMP9900")
+        delete_user(zID="1234567")
@@ -11,6 +11,16 @@ import json
 import pytest
 from app.app import app
 from app.models import db, User, UserCode, Course, CourseArchive, CourseEnrolment
+from app.course import get_latest_courses, addCourseEnrolments, deleteCourseEnrolments
+from app.term_weights import get_course_terms
+from recommendations.recommend_courses import (
+    course_model,
+    get_recommended_courses,
+    load_course_model,
+    recommend_from_course_model,
+    remove_course_document,
+    upsert_course_document,
+)
 import base64
 
 
@@ -448,3 +458,234 @@ def test_recommended_courses_multiple(client):
         delete_course("COMP2511")
         delete_user(zID="5255998")
         delete_user(zID="1234569")
+
+
+def test_latest_course_offerings(client):
+    """
+    Test that the latest offering of each course code is picked by year, then term.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():  # Create an application context
+        for _ in range(3):
+            delete_course("COMP9998")
+        delete_course("COMP9999")
+
+        add_dummy_course_to_db(
+            "COMP9998", "Old Course", "School of Computer Science and Engineering",
+            yearDate="2023", term="T1",
+        )
+        newest = add_dummy_course_to_db(
+            "COMP9998", "New Course", "School of Computer Science and Engineering",
+            yearDate="2023", term="T3",
+        )
+        add_dummy_course_to_db(
+            "COMP9998", "Older Course", "School of Computer Science and Engineering",
+            yearDate="2022", term="T3",
+        )
+        only = add_dummy_course_to_db(
+            "COMP9999", "Only Course", "School of Computer Science and Engineering",
+        )
+
+        latest_courses = get_latest_courses(["COMP9998", "COMP9999", "COMP0000"])
+        assert list(latest_courses) == ["COMP9998", "COMP9999"]
+        assert latest_courses["COMP9998"].ID == newest.ID
+        assert latest_courses["COMP9999"].ID == only.ID
+        assert get_latest_courses([]) == {}
+
+        # Course codes are matched case insensitively
+        delete_user(zID="5255998")
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data={"class": {"student": {}}},
+        )
+        response = client.post(
+            "/login", json={"email": "z5255998@ad.unsw.edu.au", "password": "1amSammi*"}
+        )
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {response.get_json().get('token')}",
+        }
+        response = client.get("/courses/comp9998", headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()["code"] == "COMP9998"
+        assert response.get_json()["name"] == "New Course"
+        delete_user(zID="5255998")
+
+        for _ in range(3):
+            delete_course("COMP9998")
+        delete_course("COMP9999")
+
+
+def test_batch_course_enrolments(client):
+    """
+    Test that enrolling in and dropping several courses at once adds and removes the sum
+    of their skills and knowledge.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():  # Create an application context
+        delete_course("COMP9998")
+        delete_course("COMP9999")
+        delete_user(zID="5255998")
+
+        user_data = {
+            "class": {
+                "student": {
+                    "major": "null",
+                    "program": "null",
+                    "transcript": "null",
+                    "skills": {"python": 10},
+                    "knowledge": {},
+                    "jobExperience": {},
+                }
+            }
+        }
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data=user_data,
+        )
+        first = add_dummy_course_to_db(
+            "COMP9998", "First Course", "School of Computer Science and Engineering"
+        )
+        first.courseSkills = json.dumps({"python": 20, "sql": 5})
+        first.courseKnowledge = json.dumps({"graphs": 10})
+        second = add_dummy_course_to_db(
+            "COMP9999", "Second Course", "School of Computer Science and Engineering"
+        )
+        second.courseSkills = json.dumps({"python": 30})
+        second.courseKnowledge = json.dumps({"graphs": 5})
+        db.session.commit()
+
+        added = addCourseEnrolments(5255998, [first.ID, second.ID, first.ID], "student")
+        assert added == [first.ID, second.ID]
+        # Courses the user is already enrolled in are skipped
+        assert addCourseEnrolments(5255998, [first.ID], "student") == []
+        assert CourseEnrolment.query.filter_by(user=5255998).count() == 2
+
+        student = json.loads(User.query.filter_by(zID=5255998).first().metadataJson)
+        student = student["class"]["student"]
+        assert student["skills"] == {"python": 60, "sql": 5}
+        assert student["knowledge"] == {"graphs": 15}
+
+        removed = deleteCourseEnrolments(5255998, [first.ID, second.ID], "student")
+        assert sorted(removed) == sorted([first.ID, second.ID])
+        assert CourseEnrolment.query.filter_by(user=5255998).count() == 0
+
+        student = json.loads(User.query.filter_by(zID=5255998).first().metadataJson)
+        student = student["class"]["student"]
+        assert student["skills"] == {"python": 10}
+        assert student["knowledge"] == {}
+
+        delete_course("COMP9998")
+        delete_course("COMP9999")
+        delete_user(zID="5255998")
+
+
+def test_course_term_weights(client):
+    """
+    Test that a course's skills and knowledge are mirrored into tblCourseTerm when the
+    course is created and when they are edited.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():  # Create an application context
+        delete_course("COMP9998")
+
+        course = add_dummy_course_to_db(
+            "COMP9998", "Weighted Course", "School of Computer Science and Engineering"
+        )
+        courseID = course.ID
+        # The dummy course's columns are not JSON objects, so it has no weights
+        assert get_course_terms([courseID]) == {}
+
+        course.courseSkills = json.dumps({"python": 20, "Python": 5})
+        course.courseKnowledge = json.dumps({"graphs": 7.5, "python": 1})
+        db.session.commit()
+        assert get_course_terms([courseID])[courseID] == {
+            "skills": {"python": 20, "Python": 5},
+            "knowledge": {"python": 1, "graphs": 7.5},
+        }
+
+        course.courseSkills = json.dumps({"java": 3})
+        db.session.commit()
+        assert get_course_terms([courseID])[courseID] == {
+            "skills": {"java": 3},
+            "knowledge": {"graphs": 7.5, "python": 1},
+        }
+
+        # Terms longer than 255 characters are kept too
+        long_term = " ".join(["distributed systems"] * 20)
+        course.courseKnowledge = json.dumps({long_term: 2})
+        db.session.commit()
+        assert get_course_terms([courseID])[courseID] == {
+            "skills": {"java": 3},
+            "knowledge": {long_term: 2},
+        }
+
+        delete_course("COMP9998")
+        assert get_course_terms([courseID]) == {}
+
+
+def test_course_model_edited_in_place(client):
+    """
+    Test that course writes edit the persisted course model's matrix in place, and that it
+    scores courses as a model built from scratch would.
+
+    Args:
+    - client: Flask test client.
+    """
+    courses_data = [
+        {
+            "name": f"COMP{9900 + number}",
+            "skills": {f"skill {number}": 1, "python": 1},
+            "knowledge": {f"topic {number % 3}": 1},
+        }
+        for number in range(12)
+    ]
+    student = {"python": 1, "topic 1": 1, "new topic": 1}
+    try:
+        load_course_model(courses_data)
+        recommend_from_course_model(student)
+        matrix = course_model["matrix"]
+
+        upsert_course_document("COMP9901", {"new topic": 1}, {})
+        remove_course_document("COMP9902")
+        upsert_course_document("COMP9999", {"python": 1}, {"new topic": 1})
+        # Edited, not dropped to be rebuilt
+        assert course_model["matrix"] is not None
+        assert course_model["matrix"] is not matrix
+
+        courses_data[1] = {
+            "name": "COMP9901",
+            "skills": {"new topic": 1},
+            "knowledge": {},
+        }
+        del courses_data[2]
+        courses_data.append(
+            {"name": "COMP9999", "skills": {"python": 1}, "knowledge": {"new topic": 1}}
+        )
+        expected = dict(get_recommended_courses(student, courses_data))
+        recommended = recommend_from_course_model(student, exclude_codes=["COMP9900"])
+        assert [code for code, _ in recommended] == sorted(
+            (code for code in expected if code != "COMP9900"),
+            key=lambda code: -expected[code],
+        )
+        for code, score in recommended:
+            assert score == pytest.approx(expected[code])
+    finally:
+        # Rebuilt from the database on next use
+        course_model.invalidate()
@@ -0,0 +1,58 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+import json
+import subprocess
+import pytest
+from lazy_imports import HEAVY_MODULES
+
+# Seconds a fresh interpreter may take to import the server
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", 5))
+
+IMPORT_SCRIPT = """
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.getcwd()))
+started = time.perf_counter()
+import app.app
+seconds = time.perf_counter() - started
+modules = sorted({name.split(".")[0] for name in sys.modules})
+print(json.dumps({"seconds": seconds, "modules": modules}))
+"""
+
+
+def import_server():
+    """
+    Import the server in a fresh interpreter, without warming any NLP model.
+
+    Returns:
+    dict: The "seconds" the import took and the top-level "modules" it imported.
+    """
+    env = dict(os.environ, NLP_WARM_MODELS="", DB_AUTO_MIGRATE="0", DB_BACKFILL="0")
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=current_directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_server_start_skips_heavy_modules():
+    """
+    Test that importing the server neither imports the scraping and NLP dependencies nor
+    takes longer than IMPORT_BUDGET_SECONDS.
+    """
+    startup = import_server()
+    assert [name for name in HEAVY_MODULES if name in startup["modules"]] == []
+    assert startup["seconds"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,321 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+import hashlib
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.app import app
+from app.jobs import (
+    WORKER_ID,
+    get_payload_hash,
+    register_job_task,
+    requeue_expired_jobs,
+    run_job,
+)
+from app.models import db, User, ScrapeJob
+
+
+@pytest.fixture
+def client():
+    # Create and return a test client for the Flask app
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def add_academic_user_to_db(firstname, lastname, zID, email, password, verified):
+    """
+    Add a new academic user to the database.
+
+    Args:
+    - firstname (str): The first name of the user.
+    - lastname (str): The last name of the user.
+    - zID (str): The unique identifier for the user.
+    - email (str): The email address of the user.
+    - password (str): The password for the user (will be hashed before storing).
+    - verified (bool): A flag indicating whether the user's account is verified.
+
+    Returns:
+    - User: The newly created User object.
+    """
+    user_data = {
+        "class": {
+            "academic": {"major": "null", "program": "null", "transcript": "null"}
+        }
+    }
+    metadata = json.dumps(user_data, indent=2)
+    hashed_password = hashlib.sha256(password.encode()).hexdigest()
+
+    new_user = User(
+        zID=zID,
+        firstname=firstname,
+        lastname=lastname,
+        email=email,
+        enPassword=hashed_password,
+        metadataJson=metadata,
+        verified=verified,
+    )
+    db.session.add(new_user)
+    db.session.commit()
+
+    return new_user
+
+
+def delete_user(zID):
+    """
+    Delete a user, and with it their scrape jobs, from the database.
+
+    Parameters:
+    - zID (str): The unique identifier for the user to be deleted.
+    """
+    user = User.query.filter_by(zID=zID).first()
+    if user:
+        db.session.delete(user)
+        db.session.commit()
+
+
+def add_running_job_to_db(
+    zID, job_type, payload, claimedBy=WORKER_ID, heartbeatAt=None, attempts=1
+):
+    """
+    Add a job that a worker is already running, so the test workers leave it alone.
+
+    Args:
+    - claimedBy (str): The process running the job, this one by default.
+    - heartbeatAt (datetime): The job's last heartbeat, now by default.
+    - attempts (int): The times the job has been claimed, once by default.
+
+    Returns:
+    - ScrapeJob: The newly created job.
+    """
+    new_job = ScrapeJob(
+        jobType=job_type,
+        payload=json.dumps(payload),
+        payloadHash=get_payload_hash(job_type, payload),
+        user=zID,
+        status="running",
+        progress=10,
+        attempts=attempts,
+        createdAt=datetime.now(),
+        startedAt=datetime.now(),
+        claimedBy=claimedBy,
+        heartbeatAt=heartbeatAt or datetime.now(),
+    )
+    db.session.add(new_job)
+    db.session.commit()
+
+    return new_job
+
+
+def login(client, email, password):
+    """
+    Log a user in and return the request headers carrying their token.
+    """
+    response = client.post("/login", json={"email": email, "password": password})
+    access_token = response.get_json().get("token")
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {access_token}",
+    }
+
+
+def test_scrape_job_status_and_dedup(client):
+    """
+    Test that a job's owner can follow it and that resubmitting the same URL returns the
+    job already in progress instead of queueing a new one.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="1234569")
+        delete_user(zID="1234570")
+
+        add_academic_user_to_db(
+            firstname="Test",
+            lastname="Academic",
+            zID="1234569",
+            email="z1234569@ad.unsw.edu.au",
+            password="1amTest*",
+            verified=1,
+        )
+        add_academic_user_to_db(
+            firstname="Other",
+            lastname="Academic",
+            zID="1234570",
+            email="z1234570@ad.unsw.edu.au",
+            password="1amOther*",
+            verified=1,
+        )
+
+        url = (
+            "https://www.unsw.edu.au/course-outlines/course-outline"
+            "#courseOutlineCode=COMP1511"
+        )
+        job = add_running_job_to_db(1234569, "url", url)
+        jobID = job.ID
+
+        headers = login(client, "z1234569@ad.unsw.edu.au", "1amTest*")
+
+        response = client.get(f"/jobs/{jobID}", headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "running"
+        assert response.get_json()["progress"] == 10
+
+        response = client.put("/courses/url", headers=headers, json={"url": url})
+        assert response.status_code == 200
+        assert response.get_json()["duplicate"] is True
+        assert response.get_json()["jobID"] == jobID
+
+        response = client.get("/jobs", headers=headers)
+        assert response.status_code == 200
+        assert [job["jobID"] for job in response.get_json()["jobs"]] == [jobID]
+
+        # Other users cannot see the job
+        other_headers = login(client, "z1234570@ad.unsw.edu.au", "1amOther*")
+        response = client.get(f"/jobs/{jobID}", headers=other_headers)
+        assert response.status_code == 404
+
+        delete_user(zID="1234569")
+        delete_user(zID="1234570")
+        assert ScrapeJob.query.filter_by(ID=jobID).first() is None
+
+
+def test_job_runs_in_its_own_session(client):
+    """
+    Test that a job's task runs in a session of its own, with the job's user loaded
+    before the task starts, and that the job is marked done once it returns.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="1234571")
+        add_academic_user_to_db(
+            firstname="Job",
+            lastname="Academic",
+            zID="1234571",
+            email="z1234571@ad.unsw.edu.au",
+            password="1amJob*",
+            verified=1,
+        )
+
+        task_runs = []
+
+        def record_task_session(app, user, payload, report_progress):
+            task_runs.append((db.session(), user.email, payload))
+            report_progress(50)
+
+        register_job_task("session-test", record_task_session)
+        job = add_running_job_to_db(1234571, "session-test", "payload")
+        jobID = job.ID
+
+        run_job(app, jobID)
+
+        [(task_session, email, payload)] = task_runs
+        assert task_session is not db.session()
+        assert email == "z1234571@ad.unsw.edu.au"
+        assert payload == "payload"
+
+        db.session.expire_all()
+        job = db.session.get(ScrapeJob, jobID)
+        assert job.status == "done"
+        assert job.progress == 100
+
+        delete_user(zID="1234571")
+
+
+def test_expired_jobs_are_requeued(client):
+    """
+    Test that only the running jobs whose lease has expired are put back in the queue,
+    and that the jobs other live processes are running are left alone.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="1234572")
+        add_academic_user_to_db(
+            firstname="Lease",
+            lastname="Academic",
+            zID="1234572",
+            email="z1234572@ad.unsw.edu.au",
+            password="1amLease*",
+            verified=1,
+        )
+        lease = app.config["SCRAPE_JOB_LEASE"]
+
+        stale_job = add_running_job_to_db(
+            1234572,
+            "lease-test",
+            "stale",
+            claimedBy="stopped-host:1:00000000",
+            heartbeatAt=datetime.now() - timedelta(seconds=2 * lease),
+        )
+        live_job = add_running_job_to_db(
+            1234572, "lease-test", "live", claimedBy="other-host:1:00000000"
+        )
+        stale_jobID = stale_job.ID
+        live_jobID = live_job.ID
+
+        requeued = requeue_expired_jobs(lease, app.config["SCRAPE_JOB_MAX_ATTEMPTS"])
+        assert stale_jobID in requeued
+        assert live_jobID not in requeued
+
+        db.session.expire_all()
+        live_job = db.session.get(ScrapeJob, live_jobID)
+        assert live_job.status == "running"
+        assert live_job.claimedBy == "other-host:1:00000000"
+        # The test workers may claim the requeued job straight away
+        stale_job = db.session.get(ScrapeJob, stale_jobID)
+        assert stale_job.claimedBy != "stopped-host:1:00000000"
+
+        delete_user(zID="1234572")
+
+
+def test_expired_job_at_max_attempts_fails(client):
+    """
+    Test that a job whose lease expired on its last attempt, e.g. because it crashed its
+    process every time, is marked failed instead of being requeued.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="1234573")
+        add_academic_user_to_db(
+            firstname="Crash",
+            lastname="Academic",
+            zID="1234573",
+            email="z1234573@ad.unsw.edu.au",
+            password="1amCrash*",
+            verified=1,
+        )
+        lease = app.config["SCRAPE_JOB_LEASE"]
+        max_attempts = app.config["SCRAPE_JOB_MAX_ATTEMPTS"]
+
+        crashing_job = add_running_job_to_db(
+            1234573,
+            "lease-test",
+            "crashing",
+            claimedBy="stopped-host:1:00000000",
+            heartbeatAt=datetime.now() - timedelta(seconds=2 * lease),
+            attempts=max_attempts,
+        )
+        crashing_jobID = crashing_job.ID
+
+        assert crashing_jobID not in requeue_expired_jobs(lease, max_attempts)
+
+        db.session.expire_all()
+        crashing_job = db.session.get(ScrapeJob, crashing_jobID)
+        assert crashing_job.status == "failed"
+        assert crashing_job.claimedBy is None
+        assert crashing_job.error == "The worker running the job was lost."
+        assert crashing_job.finishedAt is not None
+
+        delete_user(zID="1234573")
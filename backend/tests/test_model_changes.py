@@ -0,0 +1,132 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+from datetime import datetime
+from app.app import app
+from app.course import course_model
+from app.course_cache import cache_course, get_cached_course, get_course_cache_key
+from app.model_changes import pull_model_changes
+from app.models import db, Course, ModelChange
+
+
+def get_recorded_keys(model):
+    """
+    Get the keys recorded in tblModelChange for a model.
+    """
+    return set(
+        db.session.execute(
+            db.select(ModelChange.itemKey).where(ModelChange.model == model)
+        ).scalars()
+    )
+
+
+def test_course_writes_are_shared():
+    """
+    Test that a committed course write is recorded for the other processes, a rolled back
+    one is not, and the courses another process wrote are flagged on the next pull.
+    """
+    with app.app_context():
+        pull_model_changes()
+        course_model.take_dirty()
+
+        db.session.add(Course(courseCode="COMP9996", yearDate=2023, term="T1"))
+        db.session.rollback()
+        course = Course(courseCode="COMP9997", yearDate=2023, term="T1")
+        db.session.add(course)
+        db.session.commit()
+        assert "COMP9997" in get_recorded_keys("course")
+        assert "COMP9996" not in get_recorded_keys("course")
+
+        # As recorded by a scraper process
+        with db.engine.begin() as connection:
+            connection.execute(
+                ModelChange.__table__.insert(),
+                [
+                    {
+                        "model": "course",
+                        "itemKey": "COMP9998",
+                        "changedAt": datetime.now(),
+                    }
+                ],
+            )
+        pull_model_changes()
+        assert {"COMP9997", "COMP9998"} <= course_model.take_dirty()
+
+        db.session.delete(course)
+        db.session.commit()
+        db.session.execute(
+            db.delete(ModelChange).where(
+                ModelChange.itemKey.in_(["COMP9997", "COMP9998"])
+            )
+        )
+        db.session.commit()
+
+
+def add_change(connection, item_key, model="course"):
+    """
+    Record a course write as another process would.
+    """
+    connection.execute(
+        ModelChange.__table__.insert(),
+        [{"model": model, "itemKey": item_key, "changedAt": datetime.now()}],
+    )
+
+
+def test_changes_committed_out_of_order_are_read():
+    """
+    Test that a change whose transaction commits after one with a higher ID is still
+    flagged once it commits.
+    """
+    with app.app_context():
+        pull_model_changes()
+        course_model.take_dirty()
+
+        with db.engine.connect() as slow_writer:
+            with slow_writer.begin():
+                # Takes the lower ID, but commits last
+                add_change(slow_writer, "COMP9994")
+                with db.engine.begin() as fast_writer:
+                    add_change(fast_writer, "COMP9995")
+                pull_model_changes()
+                dirty = course_model.take_dirty()
+                assert "COMP9995" in dirty
+                assert "COMP9994" not in dirty
+
+        pull_model_changes()
+        assert "COMP9994" in course_model.take_dirty()
+
+        db.session.execute(
+            db.delete(ModelChange).where(
+                ModelChange.itemKey.in_(["COMP9994", "COMP9995"])
+            )
+        )
+        db.session.commit()
+
+
+def test_course_cache_follows_other_processes():
+    """
+    Test that the cached responses of a course another process wrote are dropped.
+    """
+    with app.app_context():
+        sync_interval = app.config["COURSE_CACHE_SYNC_INTERVAL"]
+        app.config["COURSE_CACHE_SYNC_INTERVAL"] = 0
+        try:
+            # The first read of a process drops the whole cache
+            pull_model_changes()
+            key = get_course_cache_key("COMP9993")
+            cache_course(key, {"courseCode": "COMP9993"})
+            assert get_cached_course(key) == {"courseCode": "COMP9993"}
+
+            with db.engine.begin() as connection:
+                add_change(connection, "COMP9993", model="courseCache")
+            assert get_cached_course(key) is None
+        finally:
+            app.config["COURSE_CACHE_SYNC_INTERVAL"] = sync_interval
+            db.session.execute(
+                db.delete(ModelChange).where(ModelChange.itemKey == "COMP9993")
+            )
+            db.session.commit()
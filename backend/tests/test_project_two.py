@@ -11,6 +11,15 @@ import json
 import pytest
 from app.app import app
 from app.models import db, User, Project, Group, GroupMember
+from app.projects import get_certain_project
+from recommendations.recommended_projects import (
+    load_project_model,
+    project_model,
+    recommend_from_project_model,
+    remove_project_vector,
+    upsert_project_vector,
+)
+from sqlalchemy import event
 
 
 @pytest.fixture
@@ -789,3 +798,308 @@ def test_returns_correct_projects_information_multiple_projects_with_groups(clie
         clear_project()
         delete_user(zID="5255998")
         delete_user(zID="1234569")
+
+
+def test_project_groups_loaded_in_constant_queries(client):
+    """
+    Test that listing a project's groups and their members costs the same number of queries
+    however many groups the project has.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        delete_user(zID="5255998")
+
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data={"class": {"student": {"skills": {}, "knowledge": {}}}},
+        )
+
+        project = Project(
+            projectName="Test Project",
+            client="Test Client",
+            skills=json.dumps({"essay writing": 100}),
+            knowledge=json.dumps({"python": 100}),
+            topics=json.dumps(["Test Topics"]),
+            creatorZId=5255998,
+        )
+        db.session.add(project)
+        db.session.commit()
+        projectID = project.ID
+
+        groupIDs = []
+
+        def add_groups(count):
+            for number in range(len(groupIDs), len(groupIDs) + count):
+                group = Group(groupName=f"Test Group {number}", project=projectID)
+                db.session.add(group)
+                db.session.commit()
+                db.session.add(GroupMember(groupID=group.ID, student=5255998))
+                db.session.commit()
+                groupIDs.append(group.ID)
+
+        def get_project_counting_statements():
+            statements = []
+
+            def count_statement(
+                conn, cursor, statement, parameters, context, executemany
+            ):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count_statement)
+            try:
+                response, status = get_certain_project(5255998, projectID)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count_statement)
+            assert status == 200
+            return len(statements), response.get_json()["groups"]
+
+        add_groups(1)
+        # The first read builds the project recommendation index
+        get_project_counting_statements()
+        one_group_statements, _ = get_project_counting_statements()
+
+        add_groups(4)
+        five_group_statements, groups = get_project_counting_statements()
+
+        assert five_group_statements == one_group_statements
+        assert groups == [
+            {
+                "id": groupID,
+                "groupName": f"Test Group {number}",
+                "members": [5255998],
+            }
+            for number, groupID in enumerate(groupIDs)
+        ]
+
+        clear_project()
+        delete_user(zID="5255998")
+
+
+def test_recommended_projects_follow_project_edits(client):
+    """
+    Test that the project recommendation index picks up projects that are created, edited
+    and deleted after it was built.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        delete_user(zID="5255998")
+
+        user_data = {
+            "class": {
+                "student": {
+                    "major": "null",
+                    "program": "null",
+                    "transcript": "null",
+                    "skills": {"essay writing": 100},
+                    "knowledge": {"python": 100},
+                    "jobExperience": {},
+                }
+            }
+        }
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data=user_data,
+        )
+
+        response = client.post(
+            "/login",
+            json={"email": "z5255998@ad.unsw.edu.au", "password": "1amSammi*"},
+        )
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+
+        for name, skills, knowledge in [
+            ("Test Project", {"essay writing": 100}, {"python": 100}),
+            ("Test Project 2", {"public speaking": 100}, {"graphs": 100}),
+        ]:
+            project_data = {
+                "name": name,
+                "client": "Test Client",
+                "skills": skills,
+                "knowledge": knowledge,
+                "thumbnail": "Test Thumbnail",
+                "scope": "Test Scope",
+                "topics": ["Test Topics"],
+                "requirements": "Test Requirements",
+                "outcomes": "Test Outcomes",
+            }
+            response = client.post("/projects", json=project_data, headers=headers)
+            assert response.status_code == 200
+
+        response = client.get("/projects/student", headers=headers)
+        assert [project["name"] for project in response.get_json()["projects"]] == [
+            "Test Project",
+            "Test Project 2",
+        ]
+
+        # Editing a project's skills and knowledge re-ranks it
+        first = Project.query.filter_by(projectName="Test Project").first()
+        second = Project.query.filter_by(projectName="Test Project 2").first()
+        first.skills = json.dumps({"public speaking": 100})
+        first.knowledge = json.dumps({"graphs": 100})
+        second.skills = json.dumps({"essay writing": 100})
+        second.knowledge = json.dumps({"python": 100})
+        db.session.commit()
+
+        response = client.get("/projects/student", headers=headers)
+        assert [project["name"] for project in response.get_json()["projects"]] == [
+            "Test Project 2",
+            "Test Project",
+        ]
+
+        # Deleted projects are no longer recommended
+        delete_project(second.ID)
+
+        response = client.get("/projects/student", headers=headers)
+        assert [project["name"] for project in response.get_json()["projects"]] == [
+            "Test Project",
+        ]
+
+        clear_project()
+        delete_user(zID="5255998")
+
+
+def test_project_match_follows_profile_and_project_edits(client):
+    """
+    Test that the missing skills, missing knowledge and match percentage of a project page
+    follow edits to both the student's profile and the project.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        clear_project()
+        delete_user(zID="5255998")
+
+        user_data = {
+            "class": {
+                "student": {
+                    "major": "null",
+                    "program": "null",
+                    "transcript": "null",
+                    "skills": {"essay writing": 100},
+                    "knowledge": {},
+                    "jobExperience": {},
+                }
+            }
+        }
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data=user_data,
+        )
+
+        response = client.post(
+            "/login",
+            json={"email": "z5255998@ad.unsw.edu.au", "password": "1amSammi*"},
+        )
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+
+        project = Project(
+            projectName="Test Project",
+            client="Test Client",
+            skills=json.dumps({"essay writing": 50, "public speaking": 50}),
+            knowledge=json.dumps({"graphs": 100}),
+            topics=json.dumps(["Test Topics"]),
+            creatorZId=5255998,
+        )
+        db.session.add(project)
+        db.session.commit()
+        projectID = project.ID
+
+        content = client.get(f"/projects/{projectID}", headers=headers).get_json()
+        assert content["missingSkills"] == ["public speaking"]
+        assert content["missingKnowledge"] == ["graphs"]
+        assert content["percentageMatch"] == 33
+
+        # The student picks up the missing knowledge
+        user = User.query.filter_by(zID=5255998).first()
+        user_data["class"]["student"]["knowledge"] = {"graphs": 100}
+        user.metadataJson = json.dumps(user_data)
+        db.session.commit()
+
+        content = client.get(f"/projects/{projectID}", headers=headers).get_json()
+        assert content["missingSkills"] == ["public speaking"]
+        assert content["missingKnowledge"] == []
+        assert content["percentageMatch"] == 67
+
+        # The project drops the missing skill
+        project = Project.query.filter_by(ID=projectID).first()
+        project.skills = json.dumps({"essay writing": 100})
+        db.session.commit()
+
+        content = client.get(f"/projects/{projectID}", headers=headers).get_json()
+        assert content["missingSkills"] == []
+        assert content["missingKnowledge"] == []
+        assert content["percentageMatch"] == 100
+
+        clear_project()
+        delete_user(zID="5255998")
+
+
+def test_project_model_edited_in_place(client):
+    """
+    Test that project writes edit the persisted project index's matrix in place, and that
+    it scores projects as an index rebuilt from the same projects would.
+
+    Args:
+    - client: Flask test client.
+    """
+    projects = {
+        number: {
+            "skills": {"python": 10 * number + 10},
+            "knowledge": {"databases": 50},
+        }
+        for number in range(12)
+    }
+    try:
+        load_project_model(projects)
+        recommend_from_project_model({"python": 100}, {})
+        matrix = project_model["matrix"]
+
+        upsert_project_vector(1, {"python": 40}, {"networking": 20})
+        remove_project_vector(2)
+        upsert_project_vector(99, {"networking": 60}, {})
+        # Edited, not dropped to be rebuilt
+        assert project_model["matrix"] is not None
+        assert project_model["matrix"] is not matrix
+
+        recommended = recommend_from_project_model(
+            {"python": 100}, {"networking": 50}
+        )
+        project_model.set_matrix(None)
+        rebuilt = recommend_from_project_model({"python": 100}, {"networking": 50})
+        assert [ID for ID, _ in recommended] == [ID for ID, _ in rebuilt]
+        assert 2 not in [ID for ID, _ in recommended]
+        for (_, score), (_, rebuilt_score) in zip(recommended, rebuilt):
+            assert score == pytest.approx(rebuilt_score)
+    finally:
+        # Rebuilt from the database on next use
+        project_model.invalidate()
@@ -0,0 +1,53 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+import pytest
+from app.app import app
+from app.models import db
+from app.migrations import (
+    find_full_scans,
+    get_migrations,
+    get_pending_migrations,
+    split_statements,
+)
+
+
+def test_migrations_are_applied():
+    """
+    Test that the test database is at the latest migration, i.e. that the schema files and
+    database/migrations describe the same schema.
+    """
+    with app.app_context():
+        assert get_migrations()
+        assert get_pending_migrations(db.engine) == []
+
+
+def test_split_migration_statements():
+    """
+    Test that comments and USE statements are left out of a migration script.
+    """
+    sql = (
+        "-- A comment\n"
+        "USE uni;\n"
+        "\n"
+        "CREATE INDEX a ON tblA (a);\n"
+        "-- A comment about b\n"
+        "ALTER TABLE tblB\n"
+        "  ADD CONSTRAINT b UNIQUE (b);\n"
+    )
+    assert split_statements(sql) == [
+        "CREATE INDEX a ON tblA (a)",
+        "ALTER TABLE tblB\n  ADD CONSTRAINT b UNIQUE (b)",
+    ]
+
+
+def test_hot_queries_use_indexes():
+    """
+    Test that none of the hot lookup queries scans a whole table.
+    """
+    with app.app_context():
+        assert find_full_scans(db.session.connection()) == []
@@ -11,6 +11,14 @@ import json
 import pytest
 from app.app import app
 from app.models import db, User, Project, Group, GroupMember
+from recommendations.recommend_students import (
+    get_reccomended_students,
+    load_student_model,
+    recommend_from_student_model,
+    remove_student_profile,
+    student_model,
+    upsert_student_profile,
+)
 
 
 @pytest.fixture
@@ -266,3 +274,204 @@ def test_returns_correct_recommended_students_multiple_students(client):
         delete_user(zID="5255999")
         delete_user(zID="5255910")
         delete_user(zID="1234569")
+
+
+def test_recommended_students_pagination(client):
+    """
+    Test paging through the recommended students with offset and limit.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="5255998")
+        delete_user(zID="5255999")
+        delete_user(zID="5255910")
+
+        user_data = {
+            "class": {
+                "student": {
+                    "major": "null",
+                    "program": "null",
+                    "transcript": "null",
+                    "skills": {"public speaking": 40},
+                    "knowledge": {"python": 70},
+                    "jobExperience": {},
+                }
+            }
+        }
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data=user_data,
+        )
+        add_dummy_user_to_db(
+            firstname="Jane",
+            lastname="Doe",
+            zID="5255999",
+            email="z5255999@ad.unsw.edu.au",
+            password="1amJane*",
+            verified=1,
+            user_data=user_data,
+        )
+        add_dummy_user_to_db(
+            firstname="John",
+            lastname="Doe",
+            zID="5255910",
+            email="z5255910@ad.unsw.edu.au",
+            password="1amJohn*",
+            verified=1,
+            user_data=user_data,
+        )
+
+        login_data = {"email": "z5255998@ad.unsw.edu.au", "password": "1amSammi*"}
+        response = client.post("/login", json=login_data)
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+
+        response = client.get(
+            f"/user/recommended-users?zID=5255998&limit=1", headers=headers
+        )
+        assert response.status_code == 200
+        first_page = response.get_json()
+        assert len(first_page["students"]) == 1
+        assert first_page["total"] >= 2
+
+        response = client.get(
+            f"/user/recommended-users?zID=5255998&offset=1&limit=1", headers=headers
+        )
+        assert response.status_code == 200
+        second_page = response.get_json()
+        assert len(second_page["students"]) == 1
+        assert second_page["students"][0]["zID"] != first_page["students"][0]["zID"]
+
+        response = client.get(
+            f"/user/recommended-users?zID=5255998&offset={first_page['total']}",
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.get_json()["students"] == []
+
+        response = client.get(
+            f"/user/recommended-users?zID=5255998&limit=0", headers=headers
+        )
+        assert response.status_code == 400
+
+        delete_user(zID="5255998")
+        delete_user(zID="5255999")
+        delete_user(zID="5255910")
+
+
+def test_recommended_students_skip_deleted_students(client):
+    """
+    Test that a student deleted after the recommendation model was refreshed is left out
+    of the recommended students instead of failing the request.
+
+    Args:
+    - client: Flask test client.
+    """
+    with app.app_context():
+        delete_user(zID="5255998")
+        delete_user(zID="5255999")
+
+        user_data = {
+            "class": {
+                "student": {
+                    "major": "null",
+                    "program": "null",
+                    "transcript": "null",
+                    "skills": {"public speaking": 40},
+                    "knowledge": {"python": 70},
+                    "jobExperience": {},
+                }
+            }
+        }
+        add_dummy_user_to_db(
+            firstname="Sammi",
+            lastname="AuYeung",
+            zID="5255998",
+            email="z5255998@ad.unsw.edu.au",
+            password="1amSammi*",
+            verified=1,
+            user_data=user_data,
+        )
+        add_dummy_user_to_db(
+            firstname="Jane",
+            lastname="Doe",
+            zID="5255999",
+            email="z5255999@ad.unsw.edu.au",
+            password="1amJane*",
+            verified=1,
+            user_data=user_data,
+        )
+
+        login_data = {"email": "z5255998@ad.unsw.edu.au", "password": "1amSammi*"}
+        response = client.post("/login", json=login_data)
+        access_token = response.get_json().get("token")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+
+        response = client.get("/user/recommended-users?zID=5255998", headers=headers)
+        assert response.status_code == 200
+        assert 5255999 in [
+            student["zID"] for student in response.get_json()["students"]
+        ]
+
+        # Deleted without the ORM session, so the model still ranks the student
+        with db.engine.begin() as connection:
+            connection.execute(User.__table__.delete().where(User.zID == 5255999))
+
+        response = client.get("/user/recommended-users?zID=5255998", headers=headers)
+        assert response.status_code == 200
+        assert 5255999 not in [
+            student["zID"] for student in response.get_json()["students"]
+        ]
+
+        delete_user(zID="5255998")
+
+
+def test_student_model_edited_in_place(client):
+    """
+    Test that profile writes edit the persisted cohort model's matrices in place, and that
+    it ranks students as a model built from scratch would.
+
+    Args:
+    - client: Flask test client.
+    """
+    profiles = {
+        5255900 + number: {f"skill {number % 4}": 10 * number, "python": 50}
+        for number in range(12)
+    }
+    try:
+        load_student_model(profiles)
+        recommend_from_student_model(5255900)
+        matrix = student_model["matrix"]
+
+        upsert_student_profile(5255901, {"skill 3": 40, "new skill": 20})
+        remove_student_profile(5255902)
+        upsert_student_profile(5255999, {"new skill": 60})
+        # Edited, not dropped to be rebuilt
+        assert student_model["matrix"] is not None
+        assert student_model["matrix"] is not matrix
+
+        profiles[5255901] = {"skill 3": 40, "new skill": 20}
+        del profiles[5255902]
+        profiles[5255999] = {"new skill": 60}
+        expected = get_reccomended_students(profiles, 5255901)
+        assert recommend_from_student_model(5255901) == (expected, len(profiles) - 1)
+        assert recommend_from_student_model(5255901, 2, 3) == (
+            expected[2:5],
+            len(profiles) - 1,
+        )
+    finally:
+        # Rebuilt from the database on next use
+        student_model.invalidate()
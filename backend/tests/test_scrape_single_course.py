@@ -0,0 +1,83 @@
+import sys
+import os
+
+current_directory = os.getcwd()
+# Get the parent directory
+parent_directory = os.path.dirname(current_directory)
+sys.path.append(parent_directory)
+from webscraping.scrape_single_course import extract_typed_skills
+
+# The skill database entries SkillNer types the matches with
+SKILLS_DB = {
+    "KS_HARD_PYTHON": {"skill_type": "Hard Skill"},
+    "KS_HARD_ML": {"skill_type": "Hard Skill"},
+    "KS_SOFT_COMMUNICATION": {"skill_type": "Soft Skill"},
+    "KS_SOFT_TEAMWORK": {"skill_type": "Soft Skill"},
+    "KS_CERTIFICATION": {"skill_type": "Certification"},
+}
+
+# The result of SkillExtractor.annotate for a short course outline
+ANNOTATIONS = {
+    "text": "python programming and machine learning with communication and teamwork",
+    "results": {
+        "full_matches": [
+            {
+                "skill_id": "KS_SOFT_TEAMWORK",
+                "doc_node_value": "teamwork",
+                "score": 1,
+                "doc_node_id": [7],
+            },
+            {
+                "skill_id": "KS_HARD_ML",
+                "doc_node_value": "machine learning",
+                "score": 1,
+                "doc_node_id": [3, 4],
+            },
+        ],
+        "ngram_scored": [
+            {
+                "skill_id": "KS_HARD_PYTHON",
+                "doc_node_value": "python\nprogramming",
+                "score": 0.92,
+                "doc_node_id": [0, 1],
+            },
+            {
+                "skill_id": "KS_SOFT_COMMUNICATION",
+                "doc_node_value": "communication ",
+                "score": 0.88,
+                "doc_node_id": [3, 4],
+            },
+            {
+                "skill_id": "KS_CERTIFICATION",
+                "doc_node_value": "aws certified",
+                "score": 0.9,
+                "doc_node_id": [9, 10],
+            },
+            {
+                "skill_id": "KS_HARD_PYTHON",
+                "doc_node_value": "  ",
+                "score": 0.5,
+                "doc_node_id": [12],
+            },
+        ],
+    },
+}
+
+
+def test_extract_typed_skills():
+    """
+    Test that the annotated skills are split into soft and hard skills in text order, full
+    matches before n-gram matches at the same position, keeping the first line of each
+    match and leaving out blank matches and other skill types.
+    """
+    soft_skills, hard_skills = extract_typed_skills(ANNOTATIONS, SKILLS_DB)
+    assert soft_skills == ["communication", "teamwork"]
+    assert hard_skills == ["python", "machine learning"]
+
+
+def test_extract_typed_skills_without_matches():
+    """
+    Test that an outline without any skill gives empty lists.
+    """
+    annotations = {"text": "", "results": {"full_matches": [], "ngram_scored": []}}
+    assert extract_typed_skills(annotations, SKILLS_DB) == ([], [])
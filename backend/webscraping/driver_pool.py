@@ -0,0 +1,182 @@
+'''
+A bounded pool of long-lived headless Chrome WebDrivers shared by the course scrapers.
+
+Starting Chrome takes several seconds, so instead of launching a browser per URL the
+scrapers check a warm driver out of this pool, use it, and hand it back. At most
+SCRAPER_DRIVER_POOL_SIZE drivers exist at once; further callers wait for one to be
+returned. A driver is health-checked before it is handed out and is recycled (quit and
+replaced) once it has loaded SCRAPER_PAGES_PER_DRIVER pages, which keeps Chrome's memory
+growth in check.
+'''
+
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+POOL_SIZE = int(os.environ.get("SCRAPER_DRIVER_POOL_SIZE", 2))
+PAGES_PER_DRIVER = int(os.environ.get("SCRAPER_PAGES_PER_DRIVER", 50))
+ACQUIRE_TIMEOUT = int(os.environ.get("SCRAPER_DRIVER_ACQUIRE_TIMEOUT", 600))
+
+idle_drivers = queue.LifoQueue()
+driver_slots = threading.BoundedSemaphore(POOL_SIZE)
+pages_loaded = {}
+pages_loaded_lock = threading.Lock()
+
+
+def create_driver():
+    '''
+    This function starts a new headless Chrome WebDriver.
+
+    Returns:
+    - WebDriver: The new driver.
+    '''
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(options=chrome_options)
+    with pages_loaded_lock:
+        pages_loaded[id(driver)] = 0
+    return driver
+
+
+def quit_driver(driver):
+    '''
+    This function shuts a driver down, ignoring a browser that has already died.
+
+    Parameters:
+    - driver (WebDriver): The driver to quit.
+    '''
+    with pages_loaded_lock:
+        pages_loaded.pop(id(driver), None)
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+
+def is_healthy(driver):
+    '''
+    This function checks that a driver's browser session is still responsive.
+
+    Parameters:
+    - driver (WebDriver): The driver to check.
+
+    Returns:
+    - bool: True if the driver can still be used.
+    '''
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+def is_worn_out(driver):
+    '''
+    This function checks whether a driver has loaded enough pages to be recycled.
+
+    Parameters:
+    - driver (WebDriver): The driver to check.
+
+    Returns:
+    - bool: True if the driver should be replaced.
+    '''
+    with pages_loaded_lock:
+        return pages_loaded.get(id(driver), 0) >= PAGES_PER_DRIVER
+
+
+def load_page(driver, url):
+    '''
+    This function navigates a pooled driver to a URL and counts the page towards the
+    driver's recycling limit.
+
+    Parameters:
+    - driver (WebDriver): A driver checked out of the pool.
+    - url (str): The URL to load.
+    '''
+    with pages_loaded_lock:
+        pages_loaded[id(driver)] = pages_loaded.get(id(driver), 0) + 1
+    driver.get(url)
+
+
+def acquire_driver():
+    '''
+    This function checks a warm, healthy driver out of the pool, starting a new one if no
+    idle driver is available. It blocks while all POOL_SIZE drivers are in use.
+
+    Returns:
+    - WebDriver: A driver that must be handed back with release_driver.
+    '''
+    if not driver_slots.acquire(timeout=ACQUIRE_TIMEOUT):
+        raise TimeoutError("No WebDriver became available in the scraper pool.")
+    try:
+        while True:
+            try:
+                driver = idle_drivers.get_nowait()
+            except queue.Empty:
+                return create_driver()
+            if is_healthy(driver) and not is_worn_out(driver):
+                return driver
+            quit_driver(driver)
+    except BaseException:
+        driver_slots.release()
+        raise
+
+
+def release_driver(driver):
+    '''
+    This function hands a driver back to the pool, or quits it if it is broken or has
+    reached its page limit.
+
+    Parameters:
+    - driver (WebDriver): A driver returned by acquire_driver.
+    '''
+    try:
+        if is_healthy(driver) and not is_worn_out(driver):
+            try:
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+                idle_drivers.put(driver)
+                return
+            except WebDriverException:
+                pass
+        quit_driver(driver)
+    finally:
+        driver_slots.release()
+
+
+@contextmanager
+def pooled_driver():
+    '''
+    This context manager checks a driver out of the pool for the duration of a block.
+
+    Example:
+    with pooled_driver() as driver:
+        load_page(driver, url)
+    '''
+    driver = acquire_driver()
+    try:
+        yield driver
+    finally:
+        release_driver(driver)
+
+
+def close_driver_pool():
+    '''
+    This function quits every idle driver in the pool.
+    '''
+    while True:
+        try:
+            quit_driver(idle_drivers.get_nowait())
+        except queue.Empty:
+            return
+
+
+atexit.register(close_driver_pool)
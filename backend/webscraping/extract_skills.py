@@ -3,21 +3,45 @@ This module will extract skills from given text and return those
 skills in form of a dictionary where the keys are the skills
 and the value is the percentage that this skills holds in 
 the list of skills.
+
+Run it as a script to add "Skills" and "Knowledge" columns to the course CSVs:
+
+    python extract_skills.py comp_courses.csv undergrad_courses.csv postgrad_courses.csv
+
+Courses are annotated in chunks across a pool of worker processes, each holding its own
+SkillNer extractor, and every result is appended to the output CSV as soon as it arrives.
+The output CSV doubles as the checkpoint: a rerun skips the courses it already contains.
 '''
 # imports
+import argparse
+import csv
 from collections import Counter
+import multiprocessing
 import os
+import sys
 import pandas as pd
-import spacy
-from spacy.matcher import PhraseMatcher
-from skillNer.general_params import SKILL_DB
-from skillNer.skill_extractor_class import SkillExtractor
-from bs4 import BeautifulSoup
 from fuzzywuzzy import fuzz
 
-
-nlp = spacy.load("en_core_web_lg")
-skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+# Make the backend packages importable when run as a script from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from language_models.registry import get_skill_extractor
+
+try:
+    from webscraping.scrape_single_course import extract_typed_skills
+except ImportError:
+    from scrape_single_course import extract_typed_skills
+
+# Columns joined into the text that is annotated, in order. The scraped outlines
+# (comp_courses.csv) have the first five, the handbook lists (undergrad_courses.csv and
+# postgrad_courses.csv) only have a summary.
+COURSE_TEXT_COLUMNS = [
+    "Course Description",
+    "Course Aims",
+    "Course Outcomes",
+    "Course Schedule",
+    "Course General Schedule",
+    "Course Summary",
+]
 
 remove_list = [
     "cse",
@@ -194,97 +218,18 @@ def normalize_counts_to_percentages(data):
     return data
 
 
-# Driver code to extract all skills and knowledge from a "comp_courses.csv"
-# and put those skills and knowledge as a column in the csv
-# Output csv is called "comp_courses_with_skills.csv"
-# Read the CSV file into a DataFrame
-df = pd.read_csv("comp_courses.csv")
-
-# Drop rows with empty 'hello' column
-df.dropna(subset=["Course Description"], inplace=True)
-
-decription = df["Course Description"].fillna("")
-aim = df["Course Aims"].fillna("")
-outline = df["Course Outcomes"].fillna("")
-schedule = df["Course Schedule"].fillna("")
-general = df["Course General Schedule"].fillna("")
-
-# Create a new column by joining 'hello' and 'goodbye'
-df["Combined Course Information"] = (
-    decription + " " + aim + " " + outline + " " + schedule + " " + general
-)
-
-soft_skills_column = []
-hard_skills_column = []
-
-for index, row in df.iterrows():
-    course_outline = row["Combined Course Information"]
-    skills_and_knowledge = skill_extractor.annotate(course_outline)
-
-    full_matches = skills_and_knowledge["results"]["full_matches"]
-    ngram_scored = skills_and_knowledge["results"]["ngram_scored"]
-
-    full_match_skills = [match["doc_node_value"] for match in full_matches]
-    ngram_scored_skills = [ngram["doc_node_value"] for ngram in ngram_scored]
-
-    all_skills = full_match_skills + ngram_scored_skills
-
-    html_output = skill_extractor.describe(skills_and_knowledge)
-    html_string = html_output.data
-
-    # # Parse the HTML content
-    soup = BeautifulSoup(html_string, "html.parser")
-
-    # Find all spans with class 'text-xs text-white font-bold'
-    skill_spans = soup.find_all("span", class_="text-xs text-white font-bold")
-
-    # Open a file in write mode to save the results
-    with open("output.txt", "w", encoding="utf-8") as output_file:
-        for skill_span in skill_spans:
-            # Extract the skill word and its type (e.g., Hard Skill or Soft Skill)
-            skill_text = skill_span.parent.text.strip()  # Extract the full text
-            skill_type = (
-                skill_span.text.strip()
-            )  # Extract the skill type (Hard Skill or Soft Skill)
-
-            # Write the skill word and its type to the file
-            output_file.write("Skill Word: {}\n".format(skill_text))
-            output_file.write("Skill Type: {}\n\n".format(skill_type))
-
-    # Read the text from a file
-    with open("output.txt", "r") as file:
-        text = file.readlines()
-
-    # Use a loop to check each line for trailing spaces
-    results = []
-    for line in text:
-        if not line.startswith(" "):
-            results.append(line)
-
-    filtered_lines = [line.strip() for line in results if line.strip()]
-
-    # Initialize an empty list to store tuples
-    result = []
-
-    # Iterate through the list two items at a time and create tuples
-    for i in range(0, len(filtered_lines), 2):
-        if i + 1 < len(filtered_lines):
-            item1 = filtered_lines[i]
-            item2 = filtered_lines[i + 1]
-            result.append((item1, item2))
-
-    soft_skills = []
-    hard_skills = []
-
-    for skill_word, skill_type in result:
-        # Remove 'Skill Word' from skill descriptions
-        skill_word = skill_word.replace("Skill Word: ", "")
+def clean_skills(soft_skills, hard_skills):
+    """
+    Cleans the raw soft and hard skills found in a course and weights them.
 
-        if "Soft Skill" in skill_type:
-            soft_skills.append(skill_word)
-        elif "Hard Skill" in skill_type:
-            hard_skills.append(skill_word)
+    Parameters:
+    - soft_skills (list): The soft skill words, in the order they were found.
+    - hard_skills (list): The hard skill words, in the order they were found.
 
+    Returns:
+    - tuple: The soft skills and the hard skills, each as a dict mapping the skill to its
+    percentage weight.
+    """
     soft_skills = convert_similar_to_exact_soft_skills(soft_skills, remove_list)
     hard_skills = convert_similar_to_exact_soft_skills(hard_skills, remove_list)
 
@@ -323,15 +268,174 @@ for index, row in df.iterrows():
     hard_skills_cleaned = normalize_counts_to_percentages(hard_skills_cleaned)
     hard_skills_cleaned = {item["name"]: item["weight"] for item in hard_skills_cleaned}
 
-    # Append the cleaned soft and hard skills to the respective lists
-    soft_skills_column.append(soft_skills_cleaned)
-    hard_skills_column.append(hard_skills_cleaned)
+    return soft_skills_cleaned, hard_skills_cleaned
+
+
+def extract_course_skills(course_information):
+    """
+    Extracts the weighted skills and knowledge of a single course.
+
+    Parameters:
+    - course_information (str): The combined text of the course.
+
+    Returns:
+    - tuple: The soft skills (skills) and the hard skills (knowledge) as dicts.
+    """
+    skill_extractor = get_skill_extractor()
+    skills_and_knowledge = skill_extractor.annotate(course_information)
+    soft_skills, hard_skills = extract_typed_skills(
+        skills_and_knowledge, skill_extractor.skills_db
+    )
+    return clean_skills(soft_skills, hard_skills)
+
+
+def load_worker_models():
+    """
+    Loads the SkillNer extractor once when a worker process starts.
+    """
+    get_skill_extractor()
+
+
+def read_courses(input_path):
+    """
+    Reads a course CSV and combines its text columns.
+
+    Parameters:
+    - input_path (str): The course CSV, e.g. "comp_courses.csv".
+
+    Returns:
+    - DataFrame: The courses with text, with an added "Combined Course Information" column.
+    """
+    df = pd.read_csv(input_path)
+    text_columns = [column for column in COURSE_TEXT_COLUMNS if column in df.columns]
+    if not text_columns:
+        raise ValueError(f"{input_path} has none of the columns {COURSE_TEXT_COLUMNS}.")
+
+    # Skip courses without any description
+    df.dropna(subset=text_columns[:1], inplace=True)
+    df["Combined Course Information"] = (
+        df[text_columns].fillna("").astype(str).agg(" ".join, axis=1)
+    )
+    return df
+
+
+def count_processed_courses(output_path, header):
+    """
+    Counts the courses already written to an output CSV by a previous run.
+
+    Parameters:
+    - output_path (str): The output CSV.
+    - header (list): The header the output CSV is expected to have.
+
+    Returns:
+    - int: The number of courses to skip, 0 if the output does not exist yet.
+    """
+    if not os.path.exists(output_path):
+        return 0
+    with open(output_path, "r", newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        if next(reader, None) != header:
+            raise ValueError(
+                f"{output_path} was written from a different input, remove it to start over."
+            )
+        return sum(1 for _ in reader)
+
+
+def extract_skills_from_csv(pool, input_path, output_path, chunk_size, resume=True):
+    """
+    Adds "Skills" and "Knowledge" columns to a course CSV, writing each course to the
+    output CSV as soon as its skills are extracted.
+
+    Parameters:
+    - pool (Pool): The worker processes to annotate the courses with.
+    - input_path (str): The course CSV.
+    - output_path (str): The CSV to write, e.g. "comp_courses_with_skills.csv".
+    - chunk_size (int): The number of courses sent to a worker at a time.
+    - resume (bool): Skip the courses already in output_path instead of starting over.
+
+    Returns:
+    - int: The number of courses processed in this run.
+    """
+    df = read_courses(input_path)
+    header = list(df.columns) + ["Skills", "Knowledge"]
+    processed = count_processed_courses(output_path, header) if resume else 0
+    remaining = df.iloc[processed:]
+
+    mode = "a" if processed else "w"
+    with open(output_path, mode, newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        if not processed:
+            writer.writerow(header)
+
+        results = pool.imap(
+            extract_course_skills,
+            remaining["Combined Course Information"],
+            chunksize=chunk_size,
+        )
+        for count, (row, (skills, knowledge)) in enumerate(
+            zip(remaining.itertuples(index=False), results), start=1
+        ):
+            values = ["" if pd.isna(value) else value for value in row]
+            writer.writerow(values + [skills, knowledge])
+            if count % chunk_size == 0:
+                csvfile.flush()
+                print(f"{input_path}: {processed + count}/{len(df)} courses")
+
+    return len(remaining)
+
+
+def get_output_path(input_path):
+    """
+    Returns the default output CSV of a course CSV, e.g. "comp_courses_with_skills.csv".
+    """
+    root, extension = os.path.splitext(input_path)
+    return f"{root}_with_skills{extension or '.csv'}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract the skills and knowledge of every course in course CSVs."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["comp_courses.csv"],
+        help="Course CSVs to process (default: comp_courses.csv).",
+    )
+    parser.add_argument(
+        "--output",
+        help="Output CSV, only when processing a single input "
+        "(default: <input>_with_skills.csv).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: one per core).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=8,
+        help="Courses sent to a worker at a time, and written between checkpoints.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore existing output and process every course again.",
+    )
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output can only be used with a single input.")
 
+    with multiprocessing.Pool(args.workers, initializer=load_worker_models) as pool:
+        for input_path in args.inputs:
+            output_path = args.output or get_output_path(input_path)
+            count = extract_skills_from_csv(
+                pool, input_path, output_path, args.chunk_size, resume=not args.restart
+            )
+            print(f"{input_path}: {count} courses written to {output_path}")
 
-# Add the soft and hard skills columns to the DataFrame
-df["Skills"] = soft_skills_column
-df["Knowledge"] = hard_skills_column
 
-# Save the DataFrame with the added columns to a new CSV
-df.to_csv("comp_courses_with_skills.csv", index=False)
-os.remove("output.txt")
+if __name__ == "__main__":
+    main()
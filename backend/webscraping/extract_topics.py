@@ -8,13 +8,13 @@ import string
 import pandas as pd
 import spacy
 from fuzzywuzzy import fuzz
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
 from fuzzywuzzy import fuzz
 
+try:
+    from webscraping.stop_phrases import match_stop_phrases
+except ImportError:
+    from stop_phrases import match_stop_phrases
+
 
 def get_topics(text):
     """
@@ -105,22 +105,6 @@ words_to_remove = set(
 )
 
 
-def preprocess_text(text):
-    """
-    Preprocesses a given text by tokenizing, converting to lowercase, and removing stopwords.
-
-    Parameters:
-    - text (str): The input text to be preprocessed.
-
-    Returns:
-    - str: The preprocessed text.
-    """
-    tokens = word_tokenize(text)
-    tokens = [word.lower() for word in tokens if word.isalnum()]
-    tokens = [word for word in tokens if word not in stopwords.words("english")]
-    return " ".join(tokens)
-
-
 def is_similar(phrase):
     """
     Determines if a given phrase is similar to a predefined set of phrases.
@@ -131,20 +115,7 @@ def is_similar(phrase):
     Returns:
     - bool: True if the phrase is similar, False otherwise.
     """
-    processed_phrase = preprocess_text(phrase)
-
-    for word in words_to_remove:
-        processed_word = preprocess_text(word)
-
-        tfidf_vectorizer = TfidfVectorizer()
-        tfidf_matrix = tfidf_vectorizer.fit_transform(
-            [processed_phrase, processed_word]
-        )
-
-        cosine_sim = linear_kernel(tfidf_matrix, tfidf_matrix)[0][1]
-        if cosine_sim > 0.3:
-            return True
-    return False
+    return match_stop_phrases([phrase], words_to_remove)[0]
 
 
 def remove_punctuation(text):
@@ -188,8 +159,9 @@ def get_topics_from_schedule(text):
             line = "\n".join(lecture_content[1:])
     filtered_lines = []
 
-    for line in lines:
-        if not is_similar(line) or len(line) < 80:
+    similar_lines = match_stop_phrases(lines, words_to_remove)
+    for line, similar in zip(lines, similar_lines):
+        if not similar or len(line) < 80:
             filtered_lines.append(line)
 
     filtered_lines = [re.sub(r"\[.*?\]", "", item) for item in filtered_lines]
@@ -329,7 +301,7 @@ for index, row in df.iterrows():
     topics = [re.sub(r"Lab\d+\s", "", s) for s in filtered_topics]
     topics = [line for line in topics if "exam" not in line]
 
-    cleaned_topics = []
+    lines = []
     for line in topics:
         line = line.strip()
         line = str(line)
@@ -339,7 +311,11 @@ for index, row in df.iterrows():
             line = line.split(":", 1)[1].strip()
         ch_pattern = r"\bCh \d+\s*"
         line = re.sub(ch_pattern, "", line)
-        if len(line) > 80 or is_similar(line) or line.isdigit():
+        lines.append(line)
+
+    cleaned_topics = []
+    for line, similar in zip(lines, match_stop_phrases(lines, words_to_remove)):
+        if len(line) > 80 or similar or line.isdigit():
             line = ""
         cleaned_topics.append(line)
 
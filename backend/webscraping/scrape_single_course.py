@@ -5,6 +5,7 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor
 import csv
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs
@@ -13,21 +14,19 @@ import difflib
 import os
 import pandas as pd
 import spacy
-from spacy.matcher import PhraseMatcher
-from skillNer.general_params import SKILL_DB
 from skillNer.skill_extractor_class import SkillExtractor
-from IPython.core.display import HTML
-from bs4 import BeautifulSoup
 from fuzzywuzzy import fuzz, process
 import re
 import string
-import pandas as pd
-import spacy
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
+
+from language_models.registry import get_skill_extractor
+
+try:
+    from webscraping.driver_pool import pooled_driver, load_page, POOL_SIZE
+    from webscraping.stop_phrases import match_stop_phrases
+except ImportError:
+    from driver_pool import pooled_driver, load_page, POOL_SIZE
+    from stop_phrases import match_stop_phrases
 
 schools = [
     "Australian Graduate School of Management",
@@ -101,24 +100,23 @@ def get_single_paragraph(path, driver):
         pass
 
 
-def get_school(url):
+def get_school(url, driver_course=None):
     '''
-    This function retrieves the text content of a single paragraph identified by its XPath on a webpage using a Selenium WebDriver.
+    This function retrieves the school offering a course from the UNSW course outline search page.
 
     Parameters:
-    - path (str): XPath expression to locate the paragraph element on the webpage.
-    - driver (WebDriver): An instance of the Selenium WebDriver used for web scraping.
+    - url (str): The course outline search URL for the course.
+    - driver_course (WebDriver, optional): A pooled WebDriver to reuse. When omitted, one is
+    checked out of the driver pool for the lookup.
 
     Returns:
-    - str: The text content of the identified paragraph.
+    - str: The name of the school as shown on the search page.
     '''
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    driver_course = webdriver.Chrome(options=chrome_options)
+    if driver_course is None:
+        with pooled_driver() as driver:
+            return get_school(url, driver)
 
-    driver_course.get(url)
+    load_page(driver_course, url)
 
     # Course School
     course_school = ""
@@ -139,7 +137,8 @@ def get_school(url):
 def scrape_raw_course_data(url):
     '''
     This function performs web scraping to extract raw course data from a given URL.
-    It uses Selenium with Chrome WebDriver in headless mode to interact with the webpage.
+    It uses a headless Chrome WebDriver checked out of the shared driver pool to interact
+    with the webpage.
 
     Parameters:
     - url (str): The URL of the course outline page.
@@ -149,13 +148,23 @@ def scrape_raw_course_data(url):
     including course code, name, school, type, description, aims, outcomes,
     schedules, year, term, and scraping timestamp.
     '''
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(options=chrome_options)
+    with pooled_driver() as driver:
+        return scrape_course_page(url, driver)
+
+
+def scrape_course_page(url, driver):
+    '''
+    This function extracts raw course data from a course outline page using the given WebDriver.
+    The same driver is then used to look up the course's school.
 
-    driver.get(url)
+    Parameters:
+    - url (str): The URL of the course outline page.
+    - driver (WebDriver): A pooled WebDriver.
+
+    Returns:
+    - dict: The raw course data described in scrape_raw_course_data.
+    '''
+    load_page(driver, url)
 
     try:
         button = driver.find_element(
@@ -420,7 +429,7 @@ def scrape_raw_course_data(url):
 
     search_link = f"https://www.unsw.edu.au/course-outlines#search={course_code.strip()}&filters=year%3A{year}&sort=relevance&startRank=1&numRanks=10"
 
-    course_school = get_school(search_link)
+    course_school = get_school(search_link, driver)
 
     all_info = {
         "course": course_code,
@@ -437,7 +446,6 @@ def scrape_raw_course_data(url):
         "course_scraped": formatted_datetime,
     }
 
-    driver.quit()
     return all_info
 
 
@@ -615,82 +623,60 @@ def normalize_counts_to_percentages(data):
     return data
 
 
-def get_skills_and_knowledge(course_outline):
-    '''
-    Extract all skills and knowledge from a 'comp_courses.csv' and put 
-    those skills and knowledge as seperate columns in a csv called 
-    'comp_courses_with_skills.csv'
-
+def extract_typed_skills(annotations, skills_db):
     '''
+    Split the skills found by SkillExtractor.annotate into soft and hard skills.
 
-    nlp = spacy.load("en_core_web_lg")
-    skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
-    skills_and_knowledge = skill_extractor.annotate(course_outline)
-
-    full_matches = skills_and_knowledge["results"]["full_matches"]
-    ngram_scored = skills_and_knowledge["results"]["ngram_scored"]
-
-    full_match_skills = [match["doc_node_value"] for match in full_matches]
-    ngram_scored_skills = [ngram["doc_node_value"] for ngram in ngram_scored]
-
-    all_skills = full_match_skills + ngram_scored_skills
+    The skills are read straight from the annotation results, in the order SkillNer's
+    describe() would render them (by position in the text, full matches before n-gram
+    matches at the same position), and typed with the skill database metadata.
 
-    html_output = skill_extractor.describe(skills_and_knowledge)
-    html_string = html_output.data
-
-    # # Parse the HTML content
-    soup = BeautifulSoup(html_string, "html.parser")
-
-    # Find all spans with class 'text-xs text-white font-bold'
-    skill_spans = soup.find_all("span", class_="text-xs text-white font-bold")
-
-    # Open a file in write mode to save the results
-    with open("output.txt", "w", encoding="utf-8") as output_file:
-        for skill_span in skill_spans:
-            # Extract the skill word and its type (e.g., Hard Skill or Soft Skill)
-            skill_text = skill_span.parent.text.strip()  # Extract the full text
-            skill_type = (
-                skill_span.text.strip()
-            )  # Extract the skill type (Hard Skill or Soft Skill)
-
-            # Write the skill word and its type to the file
-            output_file.write("Skill Word: {}\n".format(skill_text))
-            output_file.write("Skill Type: {}\n\n".format(skill_type))
-
-    # Read the text from a file
-    with open("output.txt", "r") as file:
-        text = file.readlines()
-
-    # Use a loop to check each line for trailing spaces
-    results = []
-    for line in text:
-        if not line.startswith(" "):
-            results.append(line)
-
-    filtered_lines = [line.strip() for line in results if line.strip()]
-
-    # Initialize an empty list to store tuples
-    result = []
+    Parameters:
+    - annotations (dict): The result of SkillExtractor.annotate.
+    - skills_db (dict): The skill database the extractor was built with.
 
-    # Iterate through the list two items at a time and create tuples
-    for i in range(0, len(filtered_lines), 2):
-        if i + 1 < len(filtered_lines):
-            item1 = filtered_lines[i]
-            item2 = filtered_lines[i + 1]
-            result.append((item1, item2))
+    Returns:
+    - tuple: The soft skill words and the hard skill words found in the text, as lists.
+    '''
+    matches = []
+    for match_type in annotations["results"].values():
+        matches.extend(match_type)
+    matches.sort(key=lambda match: match["doc_node_id"][0])
 
     soft_skills = []
     hard_skills = []
-
-    for skill_word, skill_type in result:
-        # Remove 'Skill Word' from skill descriptions
-        skill_word = skill_word.replace("Skill Word: ", "")
-
+    for match in matches:
+        skill_word = match["doc_node_value"].strip()
+        skill_word = skill_word.split("\n")[0].strip()
+        skill_type = skills_db[match["skill_id"]]["skill_type"]
+        if not skill_word:
+            continue
         if "Soft Skill" in skill_type:
             soft_skills.append(skill_word)
         elif "Hard Skill" in skill_type:
             hard_skills.append(skill_word)
 
+    return soft_skills, hard_skills
+
+
+def get_skills_and_knowledge(course_outline):
+    '''
+    Extract the soft skills (skills) and hard skills (knowledge) taught by a course.
+
+    Parameters:
+    - course_outline (str): The course outline text.
+
+    Returns:
+    - tuple: The soft skills and the hard skills, each as a dict mapping the skill to its
+    percentage weight.
+    '''
+
+    skill_extractor = get_skill_extractor()
+    skills_and_knowledge = skill_extractor.annotate(course_outline)
+    soft_skills, hard_skills = extract_typed_skills(
+        skills_and_knowledge, skill_extractor.skills_db
+    )
+
     soft_skills = convert_similar_to_exact_soft_skills(soft_skills, remove_list)
     hard_skills = convert_similar_to_exact_soft_skills(hard_skills, remove_list)
 
@@ -729,7 +715,6 @@ def get_skills_and_knowledge(course_outline):
     hard_skills_cleaned = normalize_counts_to_percentages(hard_skills_cleaned)
     hard_skills_cleaned = {item["name"]: item["weight"] for item in hard_skills_cleaned}
 
-    os.remove("output.txt")
     return soft_skills_cleaned, hard_skills_cleaned
 
 
@@ -824,22 +809,6 @@ words_to_remove = set(
 )
 
 
-def preprocess_text(text):
-    """
-    Preprocesses a given text by tokenizing, converting to lowercase, and removing stopwords.
-
-    Parameters:
-    - text (str): The input text to be preprocessed.
-
-    Returns:
-    - str: The preprocessed text.
-    """
-    tokens = word_tokenize(text)
-    tokens = [word.lower() for word in tokens if word.isalnum()]
-    tokens = [word for word in tokens if word not in stopwords.words("english")]
-    return " ".join(tokens)
-
-
 def is_similar(phrase):
     """
     Determines if a given phrase is similar to a predefined set of phrases.
@@ -850,20 +819,7 @@ def is_similar(phrase):
     Returns:
     - bool: True if the phrase is similar, False otherwise.
     """
-    processed_phrase = preprocess_text(phrase)
-
-    for word in words_to_remove:
-        processed_word = preprocess_text(word)
-
-        tfidf_vectorizer = TfidfVectorizer()
-        tfidf_matrix = tfidf_vectorizer.fit_transform(
-            [processed_phrase, processed_word]
-        )
-
-        cosine_sim = linear_kernel(tfidf_matrix, tfidf_matrix)[0][1]
-        if cosine_sim > 0.3:
-            return True
-    return False
+    return match_stop_phrases([phrase], words_to_remove)[0]
 
 
 def remove_punctuation(text):
@@ -915,8 +871,9 @@ def get_topics_from_schedule(text):
 
     filtered_lines = []
 
-    for line in lines:
-        if not is_similar(line) or len(line) < 80:
+    similar_lines = match_stop_phrases(lines, words_to_remove)
+    for line, similar in zip(lines, similar_lines):
+        if not similar or len(line) < 80:
             filtered_lines.append(line)
 
     filtered_lines = [re.sub(r"\[.*?\]", "", item) for item in filtered_lines]
@@ -1052,7 +1009,7 @@ def get_course_topics(course_info):
     topics = [re.sub(r"Lab\d+\s", "", s) for s in filtered_topics]
     topics = [line for line in topics if "exam" not in line]
 
-    cleaned_topics = []
+    lines = []
     for line in topics:
         line = line.strip()
         line = str(line)
@@ -1064,9 +1021,14 @@ def get_course_topics(course_info):
         line = re.sub(ch_pattern, "", line)
         pattern_program = r"Program \d+ .*?"
         line = re.sub(pattern_program, "", line)
+        lines.append(line)
+
+    # Score every candidate against the stop phrases at once
+    cleaned_topics = []
+    for line, similar in zip(lines, match_stop_phrases(lines, words_to_remove)):
         if (
             len(line) > 80
-            or is_similar(line)
+            or similar
             or line.isdigit()
             or line.startswith("COMP")
         ):
@@ -1114,3 +1076,27 @@ def get_single_course_information(url):
     raw_scraped_data["course_topics"] = course_topics
 
     return raw_scraped_data
+
+
+def scrape_courses(urls, workers=POOL_SIZE):
+    '''
+    This function scrapes many course outlines, e.g. when re-scraping a whole faculty, running
+    as many scrapes at once as there are drivers in the pool.
+
+    Parameters:
+    - urls (list): The URLs of the course outline pages.
+    - workers (int, optional): The number of concurrent scrapes. Defaults to the pool size.
+
+    Returns:
+    - list: One (url, course information or None, exception or None) tuple per URL, in the
+    order given.
+    '''
+
+    def scrape(url):
+        try:
+            return url, get_single_course_information(url), None
+        except Exception as e:
+            return url, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(scrape, urls))
@@ -0,0 +1,198 @@
+'''
+A precompiled matcher for the stop phrases (e.g. "Exam Revision", "Public holiday") used to
+drop schedule lines that are not course topics.
+
+A line matches a stop phrase when the TF-IDF cosine similarity of the two, with the
+vectorizer fitted on just that pair, is above SIMILARITY_THRESHOLD. Fitting a TfidfVectorizer
+per pair gives every term both texts share an idf of 1 and every other term an idf of
+1 + ln(3/2), so the similarity only depends on the raw term counts and on which terms are
+shared. Those are worked out for all pairs at once with three sparse products against the
+stop phrase counts, which are tokenized and stored once per phrase list.
+'''
+
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+from scipy.sparse import csr_matrix
+
+SIMILARITY_THRESHOLD = 0.3
+
+# idf of a term only one of the two texts contains: ln((1 + 2) / (1 + 1)) + 1
+UNSHARED_IDF = math.log(3 / 2) + 1
+
+# Same tokens as the default TfidfVectorizer analyzer
+token_pattern = re.compile(r"(?u)\b\w\w+\b")
+
+english_stopwords = {}
+compiled_stop_phrases = {}
+stop_phrases_lock = threading.Lock()
+
+
+def get_english_stopwords():
+    '''
+    This function loads the NLTK English stopwords once per process.
+
+    Returns:
+    - frozenset: The stopwords.
+    '''
+    if "words" not in english_stopwords:
+        english_stopwords["words"] = frozenset(stopwords.words("english"))
+    return english_stopwords["words"]
+
+
+def preprocess_text(text):
+    """
+    Preprocesses a given text by tokenizing, converting to lowercase, and removing stopwords.
+
+    Parameters:
+    - text (str): The input text to be preprocessed.
+
+    Returns:
+    - str: The preprocessed text.
+    """
+    english = get_english_stopwords()
+    tokens = word_tokenize(text)
+    tokens = [word.lower() for word in tokens if word.isalnum()]
+    tokens = [word for word in tokens if word not in english]
+    return " ".join(tokens)
+
+
+def count_terms(text):
+    '''
+    This function preprocesses a text and counts its TF-IDF terms.
+
+    Parameters:
+    - text (str): The text to count.
+
+    Returns:
+    - Counter: The raw count of every term.
+    '''
+    return Counter(token_pattern.findall(preprocess_text(text).lower()))
+
+
+def compile_stop_phrases(phrases):
+    '''
+    This function tokenizes a list of stop phrases into the sparse matrices used to match
+    lines against them.
+
+    Parameters:
+    - phrases (iterable): The stop phrases.
+
+    Returns:
+    - dict: The term columns ("vocabulary"), the phrase-by-term counts ("counts"), their
+    squares ("squared"), which terms each phrase has ("presence") and the squared length of
+    each phrase's counts ("lengths").
+    '''
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for phrase in phrases:
+        for term, count in count_terms(phrase).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+
+    shape = (len(indptr) - 1, len(vocabulary))
+    data = np.asarray(data, dtype=np.float64)
+    counts = csr_matrix((data, indices, indptr), shape=shape)
+    return {
+        "vocabulary": vocabulary,
+        "counts": counts,
+        "squared": csr_matrix((data**2, indices, indptr), shape=shape),
+        "presence": csr_matrix((np.ones(len(data)), indices, indptr), shape=shape),
+        "lengths": np.asarray(counts.multiply(counts).sum(axis=1)).ravel(),
+    }
+
+
+def get_stop_phrases(phrases):
+    '''
+    This function returns the compiled form of a stop phrase list, compiling it on first use.
+
+    Parameters:
+    - phrases (iterable): The stop phrases.
+
+    Returns:
+    - dict: The matrices returned by compile_stop_phrases.
+    '''
+    key = frozenset(phrases)
+    compiled = compiled_stop_phrases.get(key)
+    if compiled is None:
+        with stop_phrases_lock:
+            if key not in compiled_stop_phrases:
+                compiled_stop_phrases[key] = compile_stop_phrases(key)
+            compiled = compiled_stop_phrases[key]
+    return compiled
+
+
+def score_lines(lines, phrases):
+    '''
+    This function scores lines against every stop phrase.
+
+    Parameters:
+    - lines (list): The lines to score.
+    - phrases (iterable): The stop phrases.
+
+    Returns:
+    - ndarray: The line-by-phrase TF-IDF cosine similarities.
+    '''
+    compiled = get_stop_phrases(phrases)
+    vocabulary = compiled["vocabulary"]
+    phrase_lengths = compiled["lengths"]
+
+    indptr = [0]
+    indices = []
+    data = []
+    line_lengths = np.zeros(len(lines))
+    for row, line in enumerate(lines):
+        for term, count in count_terms(line).items():
+            line_lengths[row] += count**2
+            if term in vocabulary:
+                indices.append(vocabulary[term])
+                data.append(count)
+        indptr.append(len(indices))
+
+    shape = (len(lines), len(vocabulary))
+    data = np.asarray(data, dtype=np.float64)
+    counts = csr_matrix((data, indices, indptr), shape=shape)
+    squared = csr_matrix((data**2, indices, indptr), shape=shape)
+    presence = csr_matrix((np.ones(len(data)), indices, indptr), shape=shape)
+
+    # Shared terms keep an idf of 1, so only their counts enter the dot product, and they
+    # lower each text's length from UNSHARED_IDF times its raw length
+    dots = (counts @ compiled["counts"].T).toarray()
+    line_shared = (squared @ compiled["presence"].T).toarray()
+    phrase_shared = (presence @ compiled["squared"].T).toarray()
+    line_norms = UNSHARED_IDF**2 * line_lengths[:, np.newaxis] - (
+        UNSHARED_IDF**2 - 1
+    ) * line_shared
+    phrase_norms = UNSHARED_IDF**2 * phrase_lengths[np.newaxis, :] - (
+        UNSHARED_IDF**2 - 1
+    ) * phrase_shared
+
+    norms = np.sqrt(line_norms * phrase_norms)
+    similarities = np.zeros(dots.shape)
+    np.divide(dots, norms, out=similarities, where=norms > 0)
+    return similarities
+
+
+def match_stop_phrases(lines, phrases):
+    '''
+    This function checks which lines are similar to any stop phrase.
+
+    Parameters:
+    - lines (list): The lines to check.
+    - phrases (iterable): The stop phrases.
+
+    Returns:
+    - list: One bool per line, True if the line is similar to a stop phrase.
+    '''
+    if not lines:
+        return []
+    similarities = score_lines(list(lines), phrases)
+    return (similarities > SIMILARITY_THRESHOLD).any(axis=1).tolist()
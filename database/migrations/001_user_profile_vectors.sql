@@ -0,0 +1,23 @@
+-- Materialized user roles and skill/knowledge weights (tblUserClass, tblUserProfileTerm).
+-- The server backfills both tables from tblUser.metadataJson when it starts, see
+-- backfill_derived_rows in backend/app/migrations.py.
+USE uni;
+
+CREATE TABLE IF NOT EXISTS tblUserClass(
+  user INT(7),
+  role VARCHAR(25),
+  PRIMARY KEY (user, role),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS tblUserProfileTerm(
+  ID INT AUTO_INCREMENT,
+  user INT(7),
+  role VARCHAR(25),
+  term TEXT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  INDEX user_role (user, role),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE
+);
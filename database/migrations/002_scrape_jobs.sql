@@ -0,0 +1,22 @@
+-- Durable queue of course scraping jobs (tblScrapeJob). Running jobs left behind by a
+-- stopped backend are put back in the queue, see 006_scrape_job_leases.sql.
+USE uni;
+
+CREATE TABLE IF NOT EXISTS tblScrapeJob(
+  ID INT AUTO_INCREMENT,
+  jobType VARCHAR(10),
+  payload LONGTEXT,
+  payloadHash CHAR(64),
+  user INT(7),
+  status VARCHAR(10),
+  progress INT,
+  attempts INT,
+  error TEXT,
+  createdAt DATETIME,
+  startedAt DATETIME,
+  finishedAt DATETIME,
+  PRIMARY KEY (ID),
+  INDEX status_id (status, ID),
+  INDEX user_payload (user, payloadHash),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE
+);
@@ -0,0 +1,60 @@
+-- Normalized skill/knowledge weights: a tblTerm dictionary of terms and the weights of
+-- every course (tblCourseTerm), project (tblProjectTerm) and user role (tblUserProfileTerm)
+-- against it. The JSON columns stay the source of truth. The server backfills
+-- tblCourseTerm and tblProjectTerm from courseSkills/courseKnowledge and
+-- skills/knowledge when it starts, see backfill_derived_rows in backend/app/migrations.py.
+USE uni;
+
+CREATE TABLE IF NOT EXISTS tblTerm(
+  ID INT AUTO_INCREMENT,
+  term VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX term (term)
+);
+
+CREATE TABLE IF NOT EXISTS tblCourseTerm(
+  ID INT AUTO_INCREMENT,
+  course INT,
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX course_term (course, termID),
+  INDEX termID (termID),
+  FOREIGN KEY (course) REFERENCES tblCourse(ID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
+CREATE TABLE IF NOT EXISTS tblProjectTerm(
+  ID INT AUTO_INCREMENT,
+  project INT,
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX project_term (project, termID),
+  INDEX termID (termID),
+  FOREIGN KEY (project) REFERENCES tblProject(ID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
+-- tblUserProfileTerm now points at tblTerm instead of storing the term text. Its rows are
+-- derived from tblUser.metadataJson, so it is recreated empty and tblUserClass is cleared,
+-- which makes the server rebuild both when it starts.
+DROP TABLE IF EXISTS tblUserProfileTerm;
+
+CREATE TABLE tblUserProfileTerm(
+  ID INT AUTO_INCREMENT,
+  user INT(7),
+  role VARCHAR(25),
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  INDEX user_role (user, role),
+  INDEX termID (termID),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
+DELETE FROM tblUserClass;
@@ -0,0 +1,19 @@
+-- Indexes for the hot lookup paths: users by email, enrolments by user and role, group
+-- membership and projects by creator. tblCourse(courseCode, yearDate, term) and
+-- tblCourseArchive.courseID are already covered by unique_course_revision and the index of
+-- the courseID foreign key.
+USE uni;
+
+-- Unverified accounts may share an email, so the email index is not unique
+CREATE INDEX email_verified ON tblUser (email, verified);
+
+CREATE INDEX user_role_course ON tblCourseEnrolment (user, courseRole, course);
+
+-- A student joins a group at most once: drop the repeated memberships, keeping the first
+-- row of each, before adding the constraint
+DELETE gm FROM tblGroupMember gm
+JOIN tblGroupMember kept
+  ON kept.groupID = gm.groupID AND kept.student = gm.student AND kept.ID < gm.ID;
+ALTER TABLE tblGroupMember ADD CONSTRAINT group_student UNIQUE (groupID, student);
+
+CREATE INDEX creatorZId ON tblProject (creatorZId);
@@ -0,0 +1,24 @@
+-- Store the academic type ("academic", "casual academic" or "course admin") of each role
+-- next to it in tblUserClass, so the admin dashboard counts users with GROUP BY instead of
+-- decoding every metadataJson. The existing rows are filled in from the "type" of the role
+-- in metadataJson, as the backend does when it writes a user: only a string type is kept,
+-- cut to the width of the column.
+USE uni;
+
+ALTER TABLE tblUserClass
+  ADD COLUMN roleType VARCHAR(50),
+  ADD INDEX role_type (role, roleType);
+
+UPDATE tblUserClass uc
+JOIN tblUser u ON u.zID = uc.user
+SET uc.roleType = CASE
+  WHEN NOT JSON_VALID(u.metadataJson) THEN NULL
+  WHEN JSON_TYPE(
+    JSON_EXTRACT(u.metadataJson, CONCAT('$.class.', JSON_QUOTE(uc.role), '.type'))
+  ) = 'STRING' THEN LEFT(
+    JSON_UNQUOTE(
+      JSON_EXTRACT(u.metadataJson, CONCAT('$.class.', JSON_QUOTE(uc.role), '.type'))
+    ),
+    50
+  )
+END;
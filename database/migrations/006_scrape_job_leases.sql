@@ -0,0 +1,10 @@
+-- Owner and lease of every running scrape job (tblScrapeJob.claimedBy, heartbeatAt). A worker
+-- records its process in claimedBy when it claims a job and renews heartbeatAt while the job
+-- runs. A running job whose heartbeat is older than SCRAPE_JOB_LEASE seconds belongs to a
+-- process that stopped, and is put back in the queue. Jobs running before this migration
+-- have no heartbeat, so they are requeued once.
+USE uni;
+
+ALTER TABLE tblScrapeJob
+  ADD COLUMN claimedBy VARCHAR(100),
+  ADD COLUMN heartbeatAt DATETIME;
@@ -0,0 +1,20 @@
+-- Terms of any length in tblTerm. term was a VARCHAR(255) with a unique index, so longer
+-- skills and knowledge were left out of the weight tables. term is now TEXT, and terms are
+-- looked up by termHash, the SHA-256 of the term. The weight rows are cleared so the server
+-- backfills them, long terms included, when it starts.
+USE uni;
+
+ALTER TABLE tblTerm
+  DROP INDEX term,
+  MODIFY term TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+  ADD COLUMN termHash CHAR(64);
+
+UPDATE tblTerm SET termHash = SHA2(term, 256);
+
+ALTER TABLE tblTerm
+  MODIFY termHash CHAR(64) NOT NULL,
+  ADD UNIQUE INDEX termHash (termHash);
+
+DELETE FROM tblCourseTerm;
+DELETE FROM tblProjectTerm;
+DELETE FROM tblUserProfileTerm;
@@ -0,0 +1,14 @@
+-- Keys of the recommendation models (course codes, zIDs, project IDs) written by each
+-- transaction, so every server process can bring its own copy of the models in line with
+-- the writes of the others. Rows older than MODEL_CHANGE_RETENTION seconds are deleted.
+USE uni;
+
+CREATE TABLE tblModelChange(
+  ID BIGINT AUTO_INCREMENT,
+  model VARCHAR(20),
+  itemKey VARCHAR(255),
+  changedAt DATETIME,
+  PRIMARY KEY (ID),
+  INDEX model_id (model, ID),
+  INDEX changedAt (changedAt)
+);
@@ -108,7 +108,7 @@ CREATE TABLE `tblCourseEnrolment` (
   `courseRole` varchar(255) DEFAULT NULL,
   PRIMARY KEY (`ID`),
   KEY `course` (`course`),
-  KEY `user` (`user`),
+  KEY `user_role_course` (`user`,`courseRole`,`course`),
   CONSTRAINT `tblCourseEnrolment_ibfk_1` FOREIGN KEY (`course`) REFERENCES `tblCourse` (`ID`),
   CONSTRAINT `tblCourseEnrolment_ibfk_2` FOREIGN KEY (`user`) REFERENCES `tblUser` (`zID`)
 ) ENGINE=InnoDB AUTO_INCREMENT=10 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -149,6 +149,27 @@ LOCK TABLES `tblCourseRole` WRITE;
 /*!40000 ALTER TABLE `tblCourseRole` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tblCourseTerm`
+--
+
+DROP TABLE IF EXISTS `tblCourseTerm`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblCourseTerm` (
+  `ID` int NOT NULL AUTO_INCREMENT,
+  `course` int DEFAULT NULL,
+  `termID` int DEFAULT NULL,
+  `skillWeight` double DEFAULT NULL,
+  `knowledgeWeight` double DEFAULT NULL,
+  PRIMARY KEY (`ID`),
+  UNIQUE KEY `course_term` (`course`,`termID`),
+  KEY `termID` (`termID`),
+  CONSTRAINT `tblCourseTerm_ibfk_1` FOREIGN KEY (`course`) REFERENCES `tblCourse` (`ID`) ON DELETE CASCADE,
+  CONSTRAINT `tblCourseTerm_ibfk_2` FOREIGN KEY (`termID`) REFERENCES `tblTerm` (`ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tblGroup`
 --
@@ -188,7 +209,7 @@ CREATE TABLE `tblGroupMember` (
   `groupID` int DEFAULT NULL,
   `student` int DEFAULT NULL,
   PRIMARY KEY (`ID`),
-  KEY `groupID` (`groupID`),
+  UNIQUE KEY `group_student` (`groupID`,`student`),
   KEY `student` (`student`),
   CONSTRAINT `tblGroupMember_ibfk_1` FOREIGN KEY (`groupID`) REFERENCES `tblGroup` (`ID`),
   CONSTRAINT `tblGroupMember_ibfk_2` FOREIGN KEY (`student`) REFERENCES `tblUser` (`zID`)
@@ -231,6 +252,24 @@ LOCK TABLES `tblMajor` WRITE;
 /*!40000 ALTER TABLE `tblMajor` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tblModelChange`
+--
+
+DROP TABLE IF EXISTS `tblModelChange`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblModelChange` (
+  `ID` bigint NOT NULL AUTO_INCREMENT,
+  `model` varchar(20) DEFAULT NULL,
+  `itemKey` varchar(255) DEFAULT NULL,
+  `changedAt` datetime DEFAULT NULL,
+  PRIMARY KEY (`ID`),
+  KEY `model_id` (`model`,`ID`),
+  KEY `changedAt` (`changedAt`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tblProgram`
 --
@@ -279,6 +318,7 @@ CREATE TABLE `tblProject` (
   `outcomes` text,
   PRIMARY KEY (`ID`),
   KEY `course` (`course`),
+  KEY `creatorZId` (`creatorZId`),
   CONSTRAINT `tblProject_ibfk_1` FOREIGN KEY (`course`) REFERENCES `tblCourse` (`ID`)
 ) ENGINE=InnoDB AUTO_INCREMENT=4 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -293,6 +333,52 @@ INSERT INTO `tblProject` VALUES (1,NULL,'Fitness Tracker','Jane Doe',1234561,'{\
 /*!40000 ALTER TABLE `tblProject` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tblProjectTerm`
+--
+
+DROP TABLE IF EXISTS `tblProjectTerm`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblProjectTerm` (
+  `ID` int NOT NULL AUTO_INCREMENT,
+  `project` int DEFAULT NULL,
+  `termID` int DEFAULT NULL,
+  `skillWeight` double DEFAULT NULL,
+  `knowledgeWeight` double DEFAULT NULL,
+  PRIMARY KEY (`ID`),
+  UNIQUE KEY `project_term` (`project`,`termID`),
+  KEY `termID` (`termID`),
+  CONSTRAINT `tblProjectTerm_ibfk_1` FOREIGN KEY (`project`) REFERENCES `tblProject` (`ID`) ON DELETE CASCADE,
+  CONSTRAINT `tblProjectTerm_ibfk_2` FOREIGN KEY (`termID`) REFERENCES `tblTerm` (`ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tblSchemaVersion`
+--
+
+DROP TABLE IF EXISTS `tblSchemaVersion`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblSchemaVersion` (
+  `version` int NOT NULL,
+  `name` varchar(255) DEFAULT NULL,
+  `appliedAt` datetime DEFAULT NULL,
+  PRIMARY KEY (`version`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `tblSchemaVersion`
+--
+
+LOCK TABLES `tblSchemaVersion` WRITE;
+/*!40000 ALTER TABLE `tblSchemaVersion` DISABLE KEYS */;
+INSERT INTO `tblSchemaVersion` VALUES (1,'user_profile_vectors',NOW()),(2,'scrape_jobs',NOW()),(3,'term_weights',NOW()),(4,'lookup_indexes',NOW()),(5,'user_role_types',NOW()),(6,'scrape_job_leases',NOW()),(7,'long_terms',NOW()),(8,'model_changes',NOW());
+/*!40000 ALTER TABLE `tblSchemaVersion` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `tblSchool`
 --
@@ -316,6 +402,51 @@ INSERT INTO `tblSchool` VALUES ('Australian Graduate School of Management'),('Gr
 /*!40000 ALTER TABLE `tblSchool` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `tblScrapeJob`
+--
+
+DROP TABLE IF EXISTS `tblScrapeJob`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblScrapeJob` (
+  `ID` int NOT NULL AUTO_INCREMENT,
+  `jobType` varchar(10) DEFAULT NULL,
+  `payload` longtext,
+  `payloadHash` char(64) DEFAULT NULL,
+  `user` int DEFAULT NULL,
+  `status` varchar(10) DEFAULT NULL,
+  `progress` int DEFAULT NULL,
+  `attempts` int DEFAULT NULL,
+  `error` text,
+  `createdAt` datetime DEFAULT NULL,
+  `startedAt` datetime DEFAULT NULL,
+  `finishedAt` datetime DEFAULT NULL,
+  `claimedBy` varchar(100) DEFAULT NULL,
+  `heartbeatAt` datetime DEFAULT NULL,
+  PRIMARY KEY (`ID`),
+  KEY `status_id` (`status`,`ID`),
+  KEY `user_payload` (`user`,`payloadHash`),
+  CONSTRAINT `tblScrapeJob_ibfk_1` FOREIGN KEY (`user`) REFERENCES `tblUser` (`zID`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tblTerm`
+--
+
+DROP TABLE IF EXISTS `tblTerm`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblTerm` (
+  `ID` int NOT NULL AUTO_INCREMENT,
+  `term` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+  `termHash` char(64) NOT NULL,
+  PRIMARY KEY (`ID`),
+  UNIQUE KEY `termHash` (`termHash`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tblUser`
 --
@@ -337,7 +468,8 @@ CREATE TABLE `tblUser` (
   `headline` varchar(255) CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci DEFAULT NULL,
   `imageURL` text,
   `privacy` bit(1) DEFAULT NULL,
-  PRIMARY KEY (`zID`)
+  PRIMARY KEY (`zID`),
+  KEY `email_verified` (`email`,`verified`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -375,6 +507,45 @@ LOCK TABLES `tblUserCode` WRITE;
 /*!40000 ALTER TABLE `tblUserCode` DISABLE KEYS */;
 /*!40000 ALTER TABLE `tblUserCode` ENABLE KEYS */;
 UNLOCK TABLES;
+
+--
+-- Table structure for table `tblUserClass`
+--
+
+DROP TABLE IF EXISTS `tblUserClass`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblUserClass` (
+  `user` int NOT NULL,
+  `role` varchar(25) NOT NULL,
+  `roleType` varchar(50) DEFAULT NULL,
+  PRIMARY KEY (`user`,`role`),
+  KEY `role_type` (`role`,`roleType`),
+  CONSTRAINT `tblUserClass_ibfk_1` FOREIGN KEY (`user`) REFERENCES `tblUser` (`zID`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `tblUserProfileTerm`
+--
+
+DROP TABLE IF EXISTS `tblUserProfileTerm`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `tblUserProfileTerm` (
+  `ID` int NOT NULL AUTO_INCREMENT,
+  `user` int DEFAULT NULL,
+  `role` varchar(25) DEFAULT NULL,
+  `termID` int DEFAULT NULL,
+  `skillWeight` double DEFAULT NULL,
+  `knowledgeWeight` double DEFAULT NULL,
+  PRIMARY KEY (`ID`),
+  KEY `user_role` (`user`,`role`),
+  KEY `termID` (`termID`),
+  CONSTRAINT `tblUserProfileTerm_ibfk_1` FOREIGN KEY (`user`) REFERENCES `tblUser` (`zID`) ON DELETE CASCADE,
+  CONSTRAINT `tblUserProfileTerm_ibfk_2` FOREIGN KEY (`termID`) REFERENCES `tblTerm` (`ID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
@@ -1,6 +1,25 @@
 CREATE DATABASE uni;
 USE uni;
 
+-- Versions of database/migrations already reflected in this schema
+CREATE TABLE tblSchemaVersion(
+  version INT,
+  name VARCHAR(255),
+  appliedAt DATETIME,
+  PRIMARY KEY (version)
+);
+
+INSERT INTO tblSchemaVersion(version, name, appliedAt)
+VALUES
+(1, 'user_profile_vectors', NOW()),
+(2, 'scrape_jobs', NOW()),
+(3, 'term_weights', NOW()),
+(4, 'lookup_indexes', NOW()),
+(5, 'user_role_types', NOW()),
+(6, 'scrape_job_leases', NOW()),
+(7, 'long_terms', NOW()),
+(8, 'model_changes', NOW());
+
 -- Creation of roles and permissions
 -- CREATE TABLE tblUserRole(
 --   ID INT AUTO_INCREMENT, 
@@ -63,7 +82,8 @@ CREATE TABLE tblUser(
     headline NVARCHAR(255),
     imageURL TEXT,
     privacy BIT(1),
-    PRIMARY KEY (zID)
+    PRIMARY KEY (zID),
+    INDEX email_verified (email, verified)
 );
 
 CREATE TABLE tblUserCode(
@@ -73,6 +93,41 @@ CREATE TABLE tblUserCode(
   FOREIGN KEY (user) REFERENCES tblUser(zID)
 );
 
+-- Every skill and knowledge term, shared by the course, project and user weight tables,
+-- looked up by termHash, the SHA-256 of the term
+CREATE TABLE tblTerm(
+  ID INT AUTO_INCREMENT,
+  term TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_bin NOT NULL,
+  termHash CHAR(64) NOT NULL,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX termHash (termHash)
+);
+
+-- Roles held by each user and their skill/knowledge weights, materialized from
+-- tblUser.metadataJson by the backend
+CREATE TABLE tblUserClass(
+  user INT(7),
+  role VARCHAR(25),
+  roleType VARCHAR(50),
+  PRIMARY KEY (user, role),
+  INDEX role_type (role, roleType),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE
+);
+
+CREATE TABLE tblUserProfileTerm(
+  ID INT AUTO_INCREMENT,
+  user INT(7),
+  role VARCHAR(25),
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  INDEX user_role (user, role),
+  INDEX termID (termID),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
 -- CREATE TABLE tblAcademic(
 --     ID INT AUTO_INCREMENT,
 --     zID INT(7),
@@ -134,6 +189,21 @@ CREATE TABLE tblCourseArchive(
   CONSTRAINT unique_course_revision UNIQUE (courseCode, yearDate, term, revision)
 );
 
+-- Skill/knowledge weights of each course, materialized from courseSkills and
+-- courseKnowledge by the backend
+CREATE TABLE tblCourseTerm(
+  ID INT AUTO_INCREMENT,
+  course INT,
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX course_term (course, termID),
+  INDEX termID (termID),
+  FOREIGN KEY (course) REFERENCES tblCourse(ID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
 CREATE TABLE tblProject(
   ID INT AUTO_INCREMENT,
   course INT,
@@ -148,9 +218,25 @@ CREATE TABLE tblProject(
   topics TEXT,
   outcomes TEXT,
   FOREIGN KEY (course) REFERENCES tblCourse(ID),
+  INDEX creatorZId (creatorZId),
   PRIMARY KEY (ID)
 );
 
+-- Skill/knowledge weights of each project, materialized from skills and knowledge by the
+-- backend
+CREATE TABLE tblProjectTerm(
+  ID INT AUTO_INCREMENT,
+  project INT,
+  termID INT,
+  skillWeight DOUBLE,
+  knowledgeWeight DOUBLE,
+  PRIMARY KEY (ID),
+  UNIQUE INDEX project_term (project, termID),
+  INDEX termID (termID),
+  FOREIGN KEY (project) REFERENCES tblProject(ID) ON DELETE CASCADE,
+  FOREIGN KEY (termID) REFERENCES tblTerm(ID)
+);
+
 -- CREATE TABLE tblProjectArchive(
 --   ID INT AUTO_INCREMENT,
 --   revision INT,
@@ -193,6 +279,7 @@ CREATE TABLE tblCourseEnrolment(
   user INT(7),
   courseRole VARCHAR(255),
   PRIMARY KEY (ID),
+  INDEX user_role_course (user, courseRole, course),
   FOREIGN KEY (course) REFERENCES tblCourse(ID),
   FOREIGN KEY (user) REFERENCES tblUser(zID)
 );
@@ -223,11 +310,45 @@ CREATE TABLE tblGroupMember(
   groupID INT,
   student INT(7),
   PRIMARY KEY (ID),
+  CONSTRAINT group_student UNIQUE (groupID, student),
   FOREIGN KEY (groupID) REFERENCES tblGroup(ID),
   FOREIGN KEY (student) REFERENCES tblUser(zID)
 );
 -- End of creation of groups and users
 
+-- Course scraping jobs queued by /courses/url and /courses/pdf
+CREATE TABLE tblScrapeJob(
+  ID INT AUTO_INCREMENT,
+  jobType VARCHAR(10),
+  payload LONGTEXT,
+  payloadHash CHAR(64),
+  user INT(7),
+  status VARCHAR(10),
+  progress INT,
+  attempts INT,
+  error TEXT,
+  createdAt DATETIME,
+  startedAt DATETIME,
+  finishedAt DATETIME,
+  claimedBy VARCHAR(100),
+  heartbeatAt DATETIME,
+  PRIMARY KEY (ID),
+  INDEX status_id (status, ID),
+  INDEX user_payload (user, payloadHash),
+  FOREIGN KEY (user) REFERENCES tblUser(zID) ON DELETE CASCADE
+);
+
+-- Recommendation model keys written by each transaction, see backend/app/model_changes.py
+CREATE TABLE tblModelChange(
+  ID BIGINT AUTO_INCREMENT,
+  model VARCHAR(20),
+  itemKey VARCHAR(255),
+  changedAt DATETIME,
+  PRIMARY KEY (ID),
+  INDEX model_id (model, ID),
+  INDEX changedAt (changedAt)
+);
+
 -- -- Creation of courses' gained skills and knowledge
 -- CREATE TABLE tblCourseSkill(
 --   ID INT AUTO_INCREMENT,
@@ -11,7 +11,7 @@ import SchoolIcon from '@mui/icons-material/School';
 import AdminPanelSettingsIcon from '@mui/icons-material/AdminPanelSettings';
 import LoadingWidget from './LoadingWidget';
 import { useGlobalState } from './GlobalReloadProvider';
-import { apiCall } from '../helpers/helper';
+import { apiCall, apiCallAllPages, apiCallPage, downloadJson } from '../helpers/helper';
 
 export default function AdminActiveUsers() {
 
@@ -47,6 +47,8 @@ export default function AdminActiveUsers() {
     // Rows will be passed on my props.data in a json format
     const [ data, setData ] = React.useState([]);
     const [ filteredData, setFilteredData ] = React.useState(null);
+    // Cursor of the next page of the list, null once every page is loaded
+    const [ nextCursor, setNextCursor ] = React.useState(null);
 
     const { globalReload, setGlobalReload } = useGlobalState();
     const [ isLoading, setIsLoading ] = React.useState(true)
@@ -56,18 +58,22 @@ export default function AdminActiveUsers() {
     const [ selectedUsers, setSelectedUsers ] = React.useState(null)
 
 
+    function toRows(items, offset) {
+        return items.map((item, index) => {
+            const { zID, firstName, lastName, email, userType } = item;
+            const displayName = firstName + ' ' + lastName;
+            return createData(offset + index, zID, displayName, email, userType);
+        });
+    }
+
     React.useEffect(() => {
         async function getUsers() {
             try {
-                const response = await apiCall('GET', '/admin/all-users');
+                const response = await apiCallPage('/admin/all-users', null);
                 
                 if (!response.error) {
-                    setData(response?.users.map((item, index) => {
-                        const { zID, firstName, lastName, email, userType } = item;
-                        const displayName = firstName + ' ' + lastName;
-                        return createData(index, zID, displayName, email, userType);
-                        })
-                    )
+                    setData(toRows(response.users, 0))
+                    setNextCursor(response.nextCursor)
                     setIsLoading(false);
                 }
                 return response
@@ -79,6 +85,22 @@ export default function AdminActiveUsers() {
         getUsers()
     }, [ globalReload ])
 
+    async function onLoadMore() {
+        const response = await apiCallPage('/admin/all-users', nextCursor);
+        if (!response.error) {
+            setData([...data, ...toRows(response.users, data.length)])
+            setNextCursor(response.nextCursor)
+        }
+    }
+
+    // Exports hold every row, unlike the table, which loads one page at a time
+    async function onExport() {
+        const response = await apiCallAllPages('/admin/all-users', 'users');
+        if (!response.error) {
+            downloadJson('users.json', response.users)
+        }
+    }
+
     function onSelectedUser(index) {
         console.log(data[index])
         setOpenEdit(true);
@@ -159,6 +181,10 @@ export default function AdminActiveUsers() {
                             onDelete={handleDelete} 
                             onSearchFilter={handleSearchFilter} 
                             onHandleSearch={onHandleSearch} />
+                        <Box sx={{ display: 'flex', justifyContent: 'flex-end', gap: 1 }}>
+                            <Button onClick={onExport}>Export</Button>
+                            {nextCursor !== null && <Button onClick={onLoadMore}>Load More</Button>}
+                        </Box>
                     </Box>
                 </WidgetWrapper>
             }
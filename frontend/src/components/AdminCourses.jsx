@@ -8,7 +8,7 @@ import { useGlobalState } from './GlobalReloadProvider';
 import PopUpBox from './PopUpBox';
 import NavButton from './NavButton';
 import LoadingWidget from './LoadingWidget';
-import { apiCall } from '../helpers/helper';
+import { apiCall, apiCallAllPages, apiCallPage, downloadJson } from '../helpers/helper';
 
 export default function AdminCourses() {
 
@@ -49,6 +49,8 @@ export default function AdminCourses() {
     // Data
     const [ data, setData ] = React.useState([]);
     const [ filteredData, setFilteredData ] = React.useState(null);
+    // Cursor of the next page of the list, null once every page is loaded
+    const [ nextCursor, setNextCursor ] = React.useState(null);
 
     const { globalReload, setGlobalReload } = useGlobalState();
     const [ isLoading, setIsLoading ] = React.useState(true)
@@ -58,16 +60,20 @@ export default function AdminCourses() {
     const [ selectedCourses, setSelectedCourses ] = React.useState(null)
 
 
+    function toRows(items, offset) {
+        return items.map((item, index) => {
+            const { courseCode, courseName, yearDate, term, school } = item;
+            return createData(offset + index, courseCode, courseName, yearDate, term, school);
+        });
+    }
+
     React.useEffect(() => {
         async function getCourses() {
             try {
-                const response = await apiCall('GET', '/admin/all-courses');
+                const response = await apiCallPage('/admin/all-courses', null);
                 if (!response.error) {
-                    setData(response?.courses.map((item, index) => {
-                        const { courseCode, courseName, yearDate, term, school } = item;
-                        return createData(index, courseCode, courseName, yearDate, term, school);
-                        })
-                    )
+                    setData(toRows(response.courses, 0))
+                    setNextCursor(response.nextCursor)
                     setIsLoading(false);
                 }
                 return response
@@ -79,6 +85,22 @@ export default function AdminCourses() {
         getCourses()
     }, [openEdit, globalReload])
 
+    async function onLoadMore() {
+        const response = await apiCallPage('/admin/all-courses', nextCursor);
+        if (!response.error) {
+            setData([...data, ...toRows(response.courses, data.length)])
+            setNextCursor(response.nextCursor)
+        }
+    }
+
+    // Exports hold every row, unlike the table, which loads one page at a time
+    async function onExport() {
+        const response = await apiCallAllPages('/admin/all-courses', 'courses');
+        if (!response.error) {
+            downloadJson('courses.json', response.courses)
+        }
+    }
+
     function onSelectedCourse(index) {
         console.log(data[index])
         setOpenEdit(true);
@@ -164,6 +186,10 @@ export default function AdminCourses() {
                             onSearchFilter={handleSearchFilter} 
                             onHandleSearch={onHandleSearch}
                         />
+                        <Box sx={{ display: 'flex', justifyContent: 'flex-end', gap: 1 }}>
+                            <Button onClick={onExport}>Export</Button>
+                            {nextCursor !== null && <Button onClick={onLoadMore}>Load More</Button>}
+                        </Box>
                     </Box>
                 </WidgetWrapper>
             }
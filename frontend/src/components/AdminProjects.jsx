@@ -7,7 +7,7 @@ import { useGlobalState } from './GlobalReloadProvider';
 import PopUpBox from './PopUpBox';
 import NavButton from './NavButton';
 import LoadingWidget from './LoadingWidget';
-import { apiCall } from '../helpers/helper';
+import { apiCall, apiCallAllPages, apiCallPage, downloadJson } from '../helpers/helper';
 import DescriptionIcon from '@mui/icons-material/Description';
 
 
@@ -40,6 +40,8 @@ export default function AdminProjects() {
     // Rows will be passed on my props.data in a json format
     const [ data, setData ] = React.useState([]);
     const [ filteredData, setFilteredData ] = React.useState(null);
+    // Cursor of the next page of the list, null once every page is loaded
+    const [ nextCursor, setNextCursor ] = React.useState(null);
 
     const { globalReload, setGlobalReload } = useGlobalState();
     const [ isLoading, setIsLoading ] = React.useState(true)
@@ -48,17 +50,21 @@ export default function AdminProjects() {
     const [ project, setProject ] = React.useState(false);
     const [ selectedProjects, setSelectedProjects ] = React.useState(null)
 
+    function toRows(items, offset) {
+        return items.map((item, index) => {
+            const { id, projectName, client } = item;
+            return createData(offset + index, id, projectName, client);
+        });
+    }
+
     React.useEffect(() => {
         async function getProjects() {
             try {
-                const response = await apiCall('GET', '/admin/all-projects');
+                const response = await apiCallPage('/admin/all-projects', null);
 
                 if (!response.error) {
-                    setData(response?.projects.map((item, index) => {
-                        const { id, projectName, client } = item;
-                        return createData(index, id, projectName, client);
-                        })
-                    )
+                    setData(toRows(response.projects, 0))
+                    setNextCursor(response.nextCursor)
                     setIsLoading(false);
                 }
                 return response
@@ -70,6 +76,22 @@ export default function AdminProjects() {
         getProjects()
     }, [openEdit, globalReload])
 
+    async function onLoadMore() {
+        const response = await apiCallPage('/admin/all-projects', nextCursor);
+        if (!response.error) {
+            setData([...data, ...toRows(response.projects, data.length)])
+            setNextCursor(response.nextCursor)
+        }
+    }
+
+    // Exports hold every row, unlike the table, which loads one page at a time
+    async function onExport() {
+        const response = await apiCallAllPages('/admin/all-projects', 'projects');
+        if (!response.error) {
+            downloadJson('projects.json', response.projects)
+        }
+    }
+
     function onSelectedProject(index) {
         console.log(data[index])
         setOpenEdit(true);
@@ -152,6 +174,10 @@ export default function AdminProjects() {
                             onSearchFilter={handleSearchFilter} 
                             onHandleSearch={onHandleSearch}
                         />
+                        <Box sx={{ display: 'flex', justifyContent: 'flex-end', gap: 1 }}>
+                            <Button onClick={onExport}>Export</Button>
+                            {nextCursor !== null && <Button onClick={onLoadMore}>Load More</Button>}
+                        </Box>
                     </Box>
                 </WidgetWrapper>
             }
@@ -41,6 +41,12 @@ export default function DataTable(props) {
   const [rowsPerPage, setRowsPerPage] = React.useState(5);
   const [ isFiltered, setIsFiltered ] = React.useState(false);
 
+  // Show the rows of pages loaded after the first one
+  React.useEffect(() => {
+    setRows(props.data || []);
+    setIsFiltered(false);
+  }, [props.data]);
+
   function descendingComparator(a, b, orderBy) {
     if (b[orderBy] < a[orderBy]) {
       return -1;
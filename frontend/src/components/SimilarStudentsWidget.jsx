@@ -21,7 +21,7 @@ const SimilarStudentsWidget = (props) => {
     React.useEffect(() => {
         async function getData() {
             try {
-                const response = await apiCall('GET', `/user/recommended-users?zID=${props.zID}`)
+                const response = await apiCall('GET', `/user/recommended-users?zID=${props.zID}&limit=7`)
                 // const response = {}
                 if (!response.error) {
                     setStudentsData(response.students) 
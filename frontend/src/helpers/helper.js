@@ -25,6 +25,44 @@ export async function apiCall(method, path, data) {
     }
 }
 
+// Fetches one page of a paginated GET endpoint: the first one, or the one after a cursor
+// returned as nextCursor by the previous page
+export async function apiCallPage(path, after) {
+    if (after === null || after === undefined) {
+        return apiCall('GET', path);
+    }
+    const separator = path.includes('?') ? '&' : '?';
+    return apiCall('GET', `${path}${separator}after=${after}`);
+}
+
+// Fetches every page of a paginated GET endpoint and joins the lists held under key. Only
+// exports need every row, tables load one page at a time with apiCallPage
+export async function apiCallAllPages(path, key) {
+    const items = [];
+    let after = null;
+    do {
+        const response = await apiCallPage(path, after);
+        if (response.error) {
+            return response;
+        }
+        items.push(...response[key]);
+        after = response.nextCursor;
+    } while (after !== null && after !== undefined);
+    return { [key]: items };
+}
+
+// Saves data as a JSON file through the browser
+export function downloadJson(fileName, data) {
+    const url = URL.createObjectURL(
+        new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' })
+    );
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = fileName;
+    link.click();
+    URL.revokeObjectURL(url);
+}
+
 export async function runFetch (method, path, data) {
     try {
         const response = await fetch(
@@ -5,6 +5,7 @@ import PageHeading from '../components/PageHeading';
 import { Box } from '@mui/material';
 import Studentcard from '../components/StudentCard';
 import LoadingWidget from '../components/LoadingWidget';
+import SubmitButton from '../components/SubmitButton';
 import { useGlobalState } from '../components/GlobalReloadProvider';
 import { apiCall, getUserData, getUserType } from '../helpers/helper';
 import { useNavigate } from 'react-router-dom';
@@ -23,21 +24,25 @@ export default function SimilarStudentsPage() {
   
   const [studentsData, setStudentsData] = useState([])
 
+  const [totalStudents, setTotalStudents] = useState(0)
+
+  async function getData(offset) {
+      try {
+          const response = await apiCall('GET', `/user/recommended-users?zID=${getUserData().profileData.zID}&offset=${offset}`)
+          // const response = {}
+          if (!response.error) {
+              setStudentsData((previous) => offset === 0 ? response.students : [...previous, ...response.students])
+              setTotalStudents(response.total)
+              setIsLoading(false)
+          }
+          return response
+      } catch(e) {
+          //
+      }
+  }
+
   React.useEffect(() => {
-    async function getData() {
-        try {
-            const response = await apiCall('GET', `/user/recommended-users?zID=${getUserData().profileData.zID}`)
-            // const response = {}
-            if (!response.error) {
-                setStudentsData(response.students)
-                setIsLoading(false)
-            }
-            return response
-        } catch(e) {
-            //
-        }
-    }
-    getData()
+    getData(0)
   }, [globalReload])
 
   return (
@@ -71,6 +76,14 @@ export default function SimilarStudentsPage() {
               />
             ))
             }
+            {
+              studentsData.length < totalStudents
+              &&
+              <SubmitButton
+                onClick={() => getData(studentsData.length)}
+                label="Load More"
+              />
+            }
           </div>
         </Box>
       }